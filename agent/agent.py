@@ -1,14 +1,30 @@
 from typing import List, TypedDict
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from langchain_core.messages import HumanMessage
 
+from agent.metrics import timed_node
+from agent.pipeline import analyze_article, stream_pipeline_node
+from agent.state import load_article, save_article
 from agent.scoring.relevance import relevance_scoring_node
 from agent.scraping.webscrape import web_scrape_node
 from agent.identification.bei import business_entity_identification_node
 from agent.identification.opportunity import opportunity_identification_node
 from agent.outreach.email import email_outreach_node
 from agent.summary.summary import summary_node
-from agent.templates import GraphState
+from agent.templates import ArticleTask, GraphState, RunContext
+
+# State keys every per-article task needs from the parent graph
+ARTICLE_TASK_KEYS = (
+    "model",
+    "stage_models",
+    "escalation_threshold",
+    "usage",
+    "analysis_text",
+    "spice_context",
+    "slim_state",
+    "article_db",
+)
 
 
 def handle_unrelated_content(state):
@@ -36,19 +52,101 @@ def handle_no_relevant_articles(state: GraphState) -> GraphState:
     return state
 
 
-def build_graph():
-    workflow = StateGraph(GraphState)
+def any_relevant(state: GraphState) -> bool:
+    return any(article.is_relevant for article in state["articles"])
+
+
+# === Per-article fan-out ===
+def fan_out_articles(state: GraphState):
+    """
+    Send every scraped article to its own `article_pipeline` task, or route
+    to handle_no_articles when nothing was scraped.
+    """
+    articles = state["articles"]
+    if not articles:
+        return "handle_no_articles"
+
+    shared = {key: state[key] for key in ARTICLE_TASK_KEYS if key in state}
+    return [
+        Send(
+            "article_pipeline",
+            {**shared, "article": article, "index": i, "total": len(articles)},
+        )
+        for i, article in enumerate(articles)
+    ]
+
+
+def article_pipeline_node(task: ArticleTask) -> dict:
+    """
+    Runs one article through relevance → summary → bei → opportunity →
+    email on its own, so a slow article never holds up the others. Model
+    calls are attributed to the same stage names as in the staged graph.
+    """
+    article = load_article(task, task["article"])
+    label = f"[{task['index'] + 1}/{task['total']}]"
+    analyze_article(task, article, task["index"], label)
+    return {"completed_articles": [(task["index"], save_article(task, article))]}
+
+
+def route_streamed_articles(state: GraphState) -> str:
+    """Where a streaming run goes once its articles are scraped and analyzed."""
+    if not state["articles"]:
+        return "handle_no_articles"
+    return END if any_relevant(state) else "handle_no_relevant_articles"
+
+
+def collect_articles(state: GraphState) -> dict:
+    """Reduce the fan-out results back into `articles`, in scrape order."""
+    return {"articles": [article for _, article in state["completed_articles"]]}
+
+
+def build_graph(fan_out: bool = False, stream: bool = False):
+    """
+    Build the SPICE workflow.
+
+    By default every stage processes the whole batch before the next one
+    starts. With `fan_out=True`, each scraped article flows through its own
+    relevance → summary → bei → opportunity → email pipeline (via `Send`),
+    so stages overlap across articles; results are collected back into
+    `articles` at the end. Pass `max_concurrency` in the run config to cap
+    how many articles are processed at once. With `stream=True`, articles
+    go into that pipeline as soon as their bodies are extracted, while the
+    rest of the listing is still being scraped (see agent/pipeline.py).
+
+    Every node is wrapped in `timed_node`, so runs given a `RunMetrics` in
+    their context record each node's wall time.
+    """
+    if stream:
+        return build_stream_graph()
+    if fan_out:
+        return build_fan_out_graph()
+
+    workflow = StateGraph(GraphState, context_schema=RunContext)
 
     # Nodes
-    workflow.add_node("web_scrape", web_scrape_node)
-    workflow.add_node("summary", summary_node)
-    workflow.add_node("relevance_score", relevance_scoring_node)
-    workflow.add_node("bei", business_entity_identification_node)
-    workflow.add_node("opportunity_identification", opportunity_identification_node)
-    workflow.add_node("email_outreach", email_outreach_node)
-    workflow.add_node("out_of_scope", handle_unrelated_content)
-    workflow.add_node("handle_no_articles", handle_no_articles)
-    workflow.add_node("handle_no_relevant_articles", handle_no_relevant_articles)
+    workflow.add_node("web_scrape", timed_node("web_scrape", web_scrape_node))
+    workflow.add_node("summary", timed_node("summary", summary_node))
+    workflow.add_node(
+        "relevance_score", timed_node("relevance_score", relevance_scoring_node)
+    )
+    workflow.add_node("bei", timed_node("bei", business_entity_identification_node))
+    workflow.add_node(
+        "opportunity_identification",
+        timed_node("opportunity_identification", opportunity_identification_node),
+    )
+    workflow.add_node(
+        "email_outreach", timed_node("email_outreach", email_outreach_node)
+    )
+    workflow.add_node(
+        "out_of_scope", timed_node("out_of_scope", handle_unrelated_content)
+    )
+    workflow.add_node(
+        "handle_no_articles", timed_node("handle_no_articles", handle_no_articles)
+    )
+    workflow.add_node(
+        "handle_no_relevant_articles",
+        timed_node("handle_no_relevant_articles", handle_no_relevant_articles),
+    )
 
     workflow.add_edge(START, "web_scrape")
 
@@ -57,23 +155,22 @@ def build_graph():
         lambda state: len(state["articles"]) == 0,
         {
             True: "handle_no_articles",
-            False: "summary",
+            False: "relevance_score",
         },
     )
 
-    workflow.add_edge("summary", "relevance_score")
-
+    # Relevance runs on the raw lead first so only relevant articles pay
+    # for a summary
     workflow.add_conditional_edges(
         "relevance_score",
-        lambda state: any(
-            [article.relevance.is_relevant for article in state["articles"]]
-        ),
+        any_relevant,
         {
-            True: "bei",
+            True: "summary",
             False: "handle_no_relevant_articles",
         },
     )
 
+    workflow.add_edge("summary", "bei")
     workflow.add_edge("bei", "opportunity_identification")
     workflow.add_edge("opportunity_identification", "email_outreach")
     workflow.add_edge("email_outreach", END)
@@ -82,3 +179,85 @@ def build_graph():
     workflow.add_edge("out_of_scope", END)
 
     return workflow
+
+
+def build_article_graph():
+    """
+    Just the per-article pipeline, for one article at a time (a worker
+    fleet's article task). Invoke it with an `ArticleTask` and a
+    `RunContext`; results are written to the task's article.
+    """
+    workflow = StateGraph(ArticleTask, context_schema=RunContext)
+    workflow.add_node(
+        "article_pipeline", timed_node("article_pipeline", article_pipeline_node)
+    )
+    workflow.add_edge(START, "article_pipeline")
+    workflow.add_edge("article_pipeline", END)
+    return workflow
+
+
+def build_fan_out_graph():
+    workflow = StateGraph(GraphState, context_schema=RunContext)
+
+    # Nodes
+    workflow.add_node("web_scrape", timed_node("web_scrape", web_scrape_node))
+    workflow.add_node(
+        "article_pipeline", timed_node("article_pipeline", article_pipeline_node)
+    )
+    workflow.add_node(
+        "collect_articles", timed_node("collect_articles", collect_articles)
+    )
+    workflow.add_node(
+        "handle_no_articles", timed_node("handle_no_articles", handle_no_articles)
+    )
+    workflow.add_node(
+        "handle_no_relevant_articles",
+        timed_node("handle_no_relevant_articles", handle_no_relevant_articles),
+    )
+
+    workflow.add_edge(START, "web_scrape")
+    workflow.add_conditional_edges(
+        "web_scrape",
+        fan_out_articles,
+        ["article_pipeline", "handle_no_articles"],
+    )
+    workflow.add_edge("article_pipeline", "collect_articles")
+    workflow.add_conditional_edges(
+        "collect_articles",
+        any_relevant,
+        {
+            True: END,
+            False: "handle_no_relevant_articles",
+        },
+    )
+    workflow.add_edge("handle_no_relevant_articles", END)
+    workflow.add_edge("handle_no_articles", END)
+
+    return workflow
+
+
+def build_stream_graph():
+    workflow = StateGraph(GraphState, context_schema=RunContext)
+
+    # Nodes
+    workflow.add_node(
+        "stream_pipeline", timed_node("stream_pipeline", stream_pipeline_node)
+    )
+    workflow.add_node(
+        "handle_no_articles", timed_node("handle_no_articles", handle_no_articles)
+    )
+    workflow.add_node(
+        "handle_no_relevant_articles",
+        timed_node("handle_no_relevant_articles", handle_no_relevant_articles),
+    )
+
+    workflow.add_edge(START, "stream_pipeline")
+    workflow.add_conditional_edges(
+        "stream_pipeline",
+        route_streamed_articles,
+        ["handle_no_articles", "handle_no_relevant_articles", END],
+    )
+    workflow.add_edge("handle_no_relevant_articles", END)
+    workflow.add_edge("handle_no_articles", END)
+
+    return workflow
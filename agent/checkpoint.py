@@ -0,0 +1,145 @@
+"""Durable checkpoints and per-article progress markers for resumable runs."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.config import get_config
+from langgraph.runtime import get_runtime
+
+from agent.templates import NewsArticle
+
+# Set up logger for this module
+logger = logging.getLogger("spice.checkpoint")
+
+CHECKPOINT_DB = os.getenv("SPICE_CHECKPOINT_DB", "checkpoints.sqlite")
+
+# Our own types that may appear in checkpointed state
+CHECKPOINT_TYPES = [
+    ("agent.templates", name)
+    for name in (
+        "NewsArticle",
+        "ArticleRef",
+        "NewsLink",
+        "RelevanceScore",
+        "BusinessEntityItem",
+        "Opportunity",
+    )
+]
+
+
+def open_checkpointer(path: str = CHECKPOINT_DB) -> SqliteSaver:
+    """SQLite-backed LangGraph checkpointer, shareable across threads."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    serde = JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+    return SqliteSaver(conn, serde=serde)
+
+
+class ProgressLog:
+    """
+    Records, per run (thread) and stage, the state of each article right
+    after the stage finished for it. LangGraph only checkpoints at node
+    boundaries; these markers let a resumed node skip the articles it had
+    already processed before the failure.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS article_progress (
+                    thread_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, stage, url)
+                )
+                """)
+
+    def get(self, thread_id: str, stage: str, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT article FROM article_progress "
+                "WHERE thread_id = ? AND stage = ? AND url = ?",
+                (thread_id, stage, url),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, thread_id: str, stage: str, article: NewsArticle) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO article_progress VALUES (?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    stage,
+                    article.url,
+                    article.model_dump_json(),
+                    datetime.now().isoformat(),
+                ),
+            )
+
+    def clear(self, thread_id: str) -> None:
+        """Drop the markers of a run once it has completed."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM article_progress WHERE thread_id = ?", (thread_id,)
+            )
+
+
+@lru_cache(maxsize=None)
+def get_checkpointer(path: str = CHECKPOINT_DB) -> SqliteSaver:
+    """Process-wide checkpointer per database file."""
+    return open_checkpointer(path)
+
+
+@lru_cache(maxsize=None)
+def get_progress_log(path: str = CHECKPOINT_DB) -> ProgressLog:
+    """Process-wide progress log, stored next to the checkpoints."""
+    return ProgressLog(path)
+
+
+def _current_progress():
+    """(ProgressLog, thread_id) of the running graph, or (None, None)."""
+    try:
+        progress = getattr(get_runtime().context, "progress", None)
+        thread_id = get_config()["configurable"].get("thread_id")
+    except RuntimeError:
+        return None, None
+    if progress is None or thread_id is None:
+        return None, None
+    return progress, thread_id
+
+
+def restore_article_stage(stage: str, article: NewsArticle) -> bool:
+    """
+    If an earlier attempt of this run already completed `stage` for
+    `article`, copy the saved results onto it and return True.
+    """
+    progress, thread_id = _current_progress()
+    if progress is None:
+        return False
+    saved = progress.get(thread_id, stage, article.url)
+    if saved is None:
+        return False
+
+    restored = NewsArticle.model_validate(saved)
+    for name in NewsArticle.model_fields:
+        setattr(article, name, getattr(restored, name))
+    logger.info("Restored %s for %.60s... from checkpoint", stage, article.title)
+    return True
+
+
+def save_article_stage(stage: str, article: NewsArticle) -> None:
+    """Mark `stage` as completed for `article` in the current run."""
+    progress, thread_id = _current_progress()
+    if progress is not None:
+        progress.put(thread_id, stage, article)
@@ -0,0 +1,385 @@
+"""
+Headless batch runs of the analysis pipeline, e.g. from cron:
+
+    python -m agent NEA PUB --concurrency 2 --max-results 5
+    python -m agent --all --browser chromium
+
+Results go to the same stores the Streamlit app reads (history, scraped
+links, checkpoints). Exits non-zero if any agency fails.
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from agent.context.agencies import DEFAULT_WEBSITES
+from agent.llm.usage import MODEL_PRICING
+
+# Set up logger for this module
+logger = logging.getLogger("spice.cli")
+
+BROWSERS = ("firefox", "chromium", "webkit")
+
+
+class StageTimer:
+    """
+    Wall-clock time spent in each graph node, from the run's "tasks" stream
+    events. Fanned-out nodes run several tasks at once, so their total can
+    exceed the elapsed time of the run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Dict[str, float] = {}
+        self.stages: Dict[str, dict] = defaultdict(
+            lambda: {"tasks": 0, "seconds": 0.0, "max": 0.0, "errors": 0}
+        )
+
+    def on_event(self, mode: str, chunk: dict) -> None:
+        if mode != "tasks":
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if "input" in chunk:
+                self._started[chunk["id"]] = now
+                return
+            started = self._started.pop(chunk["id"], None)
+            if started is None:
+                return
+            stage = self.stages[chunk["name"]]
+            stage["tasks"] += 1
+            stage["seconds"] += now - started
+            stage["max"] = max(stage["max"], now - started)
+            if chunk.get("error"):
+                stage["errors"] += 1
+
+    def merge(self, other: "StageTimer") -> None:
+        for name, theirs in other.stages.items():
+            ours = self.stages[name]
+            ours["tasks"] += theirs["tasks"]
+            ours["seconds"] += theirs["seconds"]
+            ours["max"] = max(ours["max"], theirs["max"])
+            ours["errors"] += theirs["errors"]
+
+
+# === Argument parsing ===
+def parse_agencies(names: List[str], run_all: bool) -> Dict[str, str]:
+    """
+    Agencies to run, by name: known names map to their default listing
+    page, `NAME=URL` adds any other listing page.
+    """
+    agencies = dict(DEFAULT_WEBSITES) if run_all else {}
+    for name in names:
+        if "=" in name:
+            name, url = name.split("=", 1)
+            agencies[name] = url
+        elif name in DEFAULT_WEBSITES:
+            agencies[name] = DEFAULT_WEBSITES[name]
+        else:
+            raise ValueError(
+                f"Unknown agency {name!r} (known: {', '.join(DEFAULT_WEBSITES)}; "
+                "use NAME=URL for others)"
+            )
+    return agencies
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """Agency selection, scraping and model options shared by the CLIs."""
+    from agent.llm.routing import DEFAULT_ESCALATION_THRESHOLD
+
+    models = list(MODEL_PRICING.keys())
+    parser.add_argument(
+        "agencies",
+        nargs="*",
+        metavar="AGENCY",
+        help=f"Agency name ({', '.join(DEFAULT_WEBSITES)}) or NAME=URL",
+    )
+    parser.add_argument("--all", action="store_true", help="Use every default agency")
+    parser.add_argument(
+        "-n",
+        "--max-results",
+        type=int,
+        default=10,
+        help="Maximum new articles per agency (default: 10)",
+    )
+    parser.add_argument("--browser", choices=BROWSERS, default="firefox")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="Pipeline articles in parallel instead of stage by stage",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Analyze articles as they are scraped, overlapping browser and model work",
+    )
+    parser.add_argument(
+        "--slim-state",
+        action="store_true",
+        help="Keep only article references in graph state and checkpoints",
+    )
+    parser.add_argument(
+        "--model",
+        choices=models,
+        default="gpt-4o-mini",
+        help="Summary, BEI, opportunity and email model",
+    )
+    parser.add_argument(
+        "--cheap-model",
+        choices=models,
+        default="gpt-4.1-nano",
+        help="Relevance and link filter model",
+    )
+    parser.add_argument(
+        "--escalation-model",
+        choices=models,
+        default="gpt-4o-mini",
+        help="Model re-checking positive or low-confidence verdicts",
+    )
+    parser.add_argument(
+        "--escalation-threshold",
+        type=float,
+        default=DEFAULT_ESCALATION_THRESHOLD,
+    )
+    parser.add_argument(
+        "--analysis-text",
+        choices=("summary", "body"),
+        default="summary",
+        help="Text read by the BEI, opportunity and email stages",
+    )
+    parser.add_argument(
+        "--max-calls", type=int, help="Model call budget per run (SPICE_RUN_MAX_CALLS)"
+    )
+    parser.add_argument(
+        "--max-tokens", type=int, help="Token budget per run (SPICE_RUN_MAX_TOKENS)"
+    )
+    parser.add_argument(
+        "--max-cost", type=float, help="Dollar budget per run (SPICE_RUN_MAX_COST)"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Log debug messages"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m agent",
+        description="Scrape and analyze agency news without the web UI.",
+    )
+    add_run_arguments(parser)
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Agencies analyzed at the same time (default: 1)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="PATH",
+        help="Write per-node and per-article metrics of the runs to PATH "
+        "(JSON if it ends in .json, else Prometheus text format)",
+    )
+    parser.add_argument(
+        "--trace-dir",
+        metavar="DIR",
+        help="Write a Chrome trace of each run to DIR (SPICE_TRACE_DIR); "
+        "open it in ui.perfetto.dev or chrome://tracing",
+    )
+    return parser
+
+
+def selected_agencies(parser: argparse.ArgumentParser, args) -> Dict[str, str]:
+    """Agencies named on the command line; exits with a usage error if none."""
+    try:
+        agencies = parse_agencies(args.agencies, args.all)
+    except ValueError as e:
+        parser.error(str(e))
+    if not agencies:
+        parser.error("no agencies given (name them or pass --all)")
+    return agencies
+
+
+def build_request(args, agency: str, listing_url: str):
+    from agent.runner import AnalysisRequest
+
+    return AnalysisRequest(
+        agency=agency,
+        listing_url=listing_url,
+        browser=args.browser,
+        headless=not args.headed,
+        fan_out=args.fan_out,
+        stream=args.stream,
+        slim_state=args.slim_state,
+        max_results=args.max_results,
+        default_model=args.model,
+        cheap_model=args.cheap_model,
+        escalation_model=args.escalation_model,
+        escalation_threshold=args.escalation_threshold,
+        analysis_text=args.analysis_text,
+        max_calls=args.max_calls,
+        max_tokens=args.max_tokens,
+        max_cost=args.max_cost,
+    )
+
+
+def prepare_run(browser: str) -> bool:
+    """Seed the stores from the legacy JSON files (as the app does) and
+    provision `browser`. Returns False if the browser cannot be installed."""
+    from agent.scraping.browsers import ensure_browser
+    from agent.storage.articles import get_article_store
+    from agent.storage.history import get_history_store
+
+    get_article_store().import_json()
+    get_history_store().import_json()
+    try:
+        if ensure_browser(browser):
+            return True
+        logger.error(f"Could not provision {browser}")
+    except Exception as e:
+        logger.error(f"Could not provision {browser}: {e}")
+    return False
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Log to stderr, leaving stdout for the run summary."""
+    from agent.logs import setup_logging as configure_logging
+
+    configure_logging(logging.DEBUG if verbose else None, stream=sys.stderr)
+
+
+# === Runs ===
+def run_agency(request, governor, trace_dir: Optional[str] = None) -> dict:
+    """Analyze one agency; failures are returned, not raised."""
+    from agent.llm.usage import UsageLedger
+    from agent.runner import run_analysis
+
+    timer = StageTimer()
+    usage = UsageLedger()
+    started = time.perf_counter()
+    outcome = {"agency": request.agency, "timer": timer, "error": None}
+    try:
+        result = run_analysis(
+            request,
+            governor,
+            usage=usage,
+            on_event=timer.on_event,
+            trace_dir=trace_dir,
+        )
+        articles = result["state"].get("articles", [])
+        outcome["articles"] = len(articles)
+        outcome["relevant"] = sum(1 for a in articles if a.is_relevant)
+        outcome["run_id"] = result["run_id"]
+        outcome["metrics"] = result["metrics"]
+        outcome["trace"] = result["trace"]
+    except Exception as e:
+        logger.error(f"Analysis of {request.agency} failed: {e}", exc_info=True)
+        outcome["error"] = str(e)
+    outcome["seconds"] = time.perf_counter() - started
+    report = usage.report()
+    outcome["cost"] = report["total_cost"]
+    outcome["skipped"] = (report["budget"] or {}).get("skipped", {})
+    return outcome
+
+
+def print_summary(outcomes: List[dict], elapsed: float) -> None:
+    print(
+        f"\n{'Agency':<12} {'Status':<8} {'Articles':>8} {'Relevant':>8} "
+        f"{'Cost':>9} {'Time':>8}  Run"
+    )
+    for o in outcomes:
+        status = "failed" if o["error"] else "ok"
+        print(
+            f"{o['agency']:<12} {status:<8} {o.get('articles', 0):>8} "
+            f"{o.get('relevant', 0):>8} ${o['cost']:>8.4f} {o['seconds']:>7.1f}s  "
+            f"{o.get('run_id') or '-'}"
+        )
+        if o["error"]:
+            print(f"{'':<12} error: {o['error']}")
+        if o.get("skipped"):
+            print(
+                f"{'':<12} skipped for budget: "
+                + ", ".join(f"{s} ×{len(urls)}" for s, urls in o["skipped"].items())
+            )
+        if o.get("trace"):
+            print(f"{'':<12} trace: {o['trace']}")
+
+    total = StageTimer()
+    for o in outcomes:
+        total.merge(o["timer"])
+    print(f"\n{'Stage':<28} {'Tasks':>6} {'Total':>9} {'Mean':>8} {'Max':>8}")
+    for name, stage in sorted(
+        total.stages.items(), key=lambda item: -item[1]["seconds"]
+    ):
+        errors = f"  ({stage['errors']} failed)" if stage["errors"] else ""
+        print(
+            f"{name:<28} {stage['tasks']:>6} {stage['seconds']:>8.2f}s "
+            f"{stage['seconds'] / stage['tasks']:>7.2f}s {stage['max']:>7.2f}s{errors}"
+        )
+    print(f"\nTotal: {len(outcomes)} agencies in {elapsed:.1f}s")
+
+
+def write_metrics(path: str, outcomes: List[dict]) -> None:
+    from agent.metrics import to_json, to_prometheus
+
+    runs = [
+        {
+            "labels": {"agency": o["agency"], "run": o.get("run_id") or ""},
+            "metrics": o["metrics"],
+        }
+        for o in outcomes
+        if o.get("metrics")
+    ]
+    export = to_json if path.endswith(".json") else to_prometheus
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(export(runs))
+    logger.info(f"Wrote metrics of {len(runs)} run(s) to {path}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    agencies = selected_agencies(parser, args)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    setup_logging(args.verbose)
+
+    from agent.llm.governor import RateGovernor
+
+    started = time.perf_counter()
+    if not prepare_run(args.browser):
+        return 1
+
+    governor = RateGovernor.from_env()
+    requests = [build_request(args, name, url) for name, url in agencies.items()]
+    logger.info(
+        f"Running {len(requests)} agencies, {args.concurrency} at a time: "
+        f"{', '.join(agencies)}"
+    )
+    with ThreadPoolExecutor(
+        max_workers=args.concurrency, thread_name_prefix="spice-cli"
+    ) as executor:
+        outcomes = list(
+            executor.map(
+                lambda request: run_agency(request, governor, args.trace_dir),
+                requests,
+            )
+        )
+
+    print_summary(outcomes, time.perf_counter() - started)
+    if args.metrics_out:
+        write_metrics(args.metrics_out, outcomes)
+    failed = [o["agency"] for o in outcomes if o["error"]]
+    if failed:
+        logger.error(f"Failed agencies: {', '.join(failed)}")
+        return 1
+    return 0
@@ -0,0 +1,7 @@
+# News listing pages of the agencies analyzed by default
+DEFAULT_WEBSITES = {
+    "NEA": "https://www.nea.gov.sg/media/news",
+    "PUB": "https://www.pub.gov.sg/Resources/News-Room/PressReleases",
+    "BCA": "https://www1.bca.gov.sg/about-us/news-and-publications/media-releases",
+    "IMDA": "https://www.imda.gov.sg/resources/press-releases-factsheets-and-speeches",
+}
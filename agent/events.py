@@ -0,0 +1,18 @@
+"""Progress events emitted by graph nodes for live (streaming) consumers."""
+
+from langgraph.config import get_stream_writer
+
+
+def emit(event: str, **payload) -> None:
+    """
+    Push a custom event onto the graph's stream.
+
+    Events are only delivered when the graph is run with
+    `graph.stream(..., stream_mode="custom")`. Outside of a graph run
+    (e.g. when a node helper is called directly) this is a no-op.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"event": event, **payload})
@@ -0,0 +1,554 @@
+"""
+Worker fleet: agency analyses split into tasks on a durable queue (in
+SPICE_DB) and worked off by several processes, each with its own pool of
+long-lived browsers:
+
+    python -m agent.fleet --all --workers 4
+    python -m agent.fleet NEA PUB --enqueue-only
+    python -m agent.fleet --serve --workers 4
+
+An agency's "scrape" task reads its listing page, drops links scraped
+before and runs the link filter, then queues an "article" task per link
+(body extraction, then relevance → summary → bei → opportunity → email).
+Its "collect" task runs once every article task has finished or run out
+of attempts: it adds the run to the analysis history and records the
+scraped links, except those of failed articles (retried on the next run).
+Tasks are leased, so the tasks of a worker that dies are picked up by
+another one, and failed tasks are retried with backoff.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from agent.agent import build_article_graph
+from agent.cli import (
+    add_run_arguments,
+    build_request,
+    prepare_run,
+    selected_agencies,
+    setup_logging,
+)
+from agent.context.spice import SPICE_CONTEXT
+from agent.llm.budget import RunBudget
+from agent.llm.governor import RateGovernor
+from agent.llm.routing import escalation_model_for, model_for
+from agent.llm.usage import UsageLedger
+from agent.logs import log_context
+from agent.metrics import RunMetrics, merge_reports
+from agent.runner import AnalysisRequest, build_models, history_entry
+from agent.scraping.browsers import ensure_browser
+from agent.scraping.pool import BrowserPool
+from agent.scraping.webscrape import (
+    filter_with_llm_by_source,
+    read_article,
+    read_listing,
+)
+from agent.storage.articles import canonical_url, get_article_store
+from agent.storage.history import get_history_store
+from agent.storage.queue import (
+    LEASE_SECONDS,
+    MAX_ATTEMPTS,
+    TaskQueue,
+    get_task_queue,
+)
+from agent.templates import NewsArticle, RunContext
+from agent.tracing import span
+
+# Set up logger for this module
+logger = logging.getLogger("spice.fleet")
+
+# Worker processes, and tasks each works on at once (sharing its browsers)
+FLEET_WORKERS = int(os.getenv("SPICE_FLEET_WORKERS", "2"))
+FLEET_THREADS = int(os.getenv("SPICE_FLEET_THREADS", "2"))
+
+
+class FleetWorker:
+    """
+    Works tasks off a `TaskQueue` on `threads` threads that share one
+    browser pool, until `stop` is set or, with `drain`, the queue is
+    empty. Leases are renewed while a task runs.
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        governor: RateGovernor,
+        threads: int = FLEET_THREADS,
+        lease_seconds: float = LEASE_SECONDS,
+        poll_interval: float = 1.0,
+        name: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.governor = governor
+        self.threads = threads
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.pool = BrowserPool(size=threads)
+        self.article_graph = build_article_graph().compile()
+        self.handlers: Dict[str, Callable[[dict, UsageLedger], Tuple[dict, list]]] = {
+            "scrape": self.scrape,
+            "article": self.analyze,
+            "collect": self.collect,
+        }
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._provisioned = set()
+
+    # === Loop ===
+    def run(self, stop, drain: bool = False) -> None:
+        workers = [
+            threading.Thread(
+                target=self._work_loop, args=(stop, drain), name=f"spice-fleet-{i}"
+            )
+            for i in range(self.threads)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.pool.close()
+        logger.info(
+            "Worker %s stopped: %s",
+            self.name,
+            ", ".join(f"{k} {v}" for k, v in sorted(self.stats.items())) or "no tasks",
+        )
+
+    def _work_loop(self, stop, drain: bool) -> None:
+        while not stop.is_set():
+            task = self.queue.lease(self.name, self.lease_seconds)
+            if task is None:
+                if drain and self.queue.idle():
+                    return
+                stop.wait(self.poll_interval)
+                continue
+            self.work(task)
+
+    def work(self, task: dict) -> None:
+        """
+        Run one leased task and report its result (or failure) to the
+        queue, with the model usage it spent.
+        """
+        kind = task["kind"]
+        usage = self._ledger(task)
+        with log_context(run_id=task["batch_id"], agency=task["agency"]):
+            logger.info("Task %s: %s (attempt %d)", task["id"], kind, task["attempts"])
+            try:
+                with self._keep_lease(task):
+                    result, follow_ups = self.handlers[kind](task, usage)
+            except Exception as e:
+                outcome = self.queue.fail(
+                    task["id"], self.name, str(e), spent=usage.budget.spent
+                )
+                logger.error(
+                    "Task %s (%s) failed, %s: %s",
+                    task["id"],
+                    kind,
+                    {"retry": "retrying", "failed": "giving up"}.get(
+                        outcome, "lease lost"
+                    ),
+                    e,
+                    exc_info=True,
+                )
+                self._count(f"{kind} failed")
+                return
+            if self.queue.complete(
+                task["id"], self.name, result, follow_ups, spent=usage.budget.spent
+            ):
+                self._count(f"{kind} done")
+            else:
+                logger.warning(
+                    "Lost the lease of task %s (%s); its result was dropped",
+                    task["id"],
+                    kind,
+                )
+
+    @contextmanager
+    def _keep_lease(self, task: dict) -> Iterator[None]:
+        """Renew the lease of `task` in the background while the block runs."""
+        done = threading.Event()
+
+        def renew() -> None:
+            while not done.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(task["id"], self.name, self.lease_seconds):
+                    logger.warning("Lease of task %s was lost", task["id"])
+                    return
+
+        thread = threading.Thread(target=renew, name="spice-lease", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    # === Helpers ===
+    def _page(self, request: AnalysisRequest, action: Callable[[Any], Any]) -> Any:
+        """Run `action(page)` on the pooled browser the request asks for."""
+        with self._lock:
+            provision = request.browser not in self._provisioned
+            self._provisioned.add(request.browser)
+        if provision:
+            ensure_browser(request.browser)
+        return self.pool.run(action, request.browser, request.headless)
+
+    def _ledger(self, task: dict) -> UsageLedger:
+        """
+        Usage ledger of one task, held to what is left of its batch's run
+        budget.
+        """
+        request = task["request"]
+        return UsageLedger(
+            RunBudget.from_env(
+                calls=request.get("max_calls"),
+                tokens=request.get("max_tokens"),
+                cost=request.get("max_cost"),
+                earlier=task["spent"],
+            )
+        )
+
+    # === Tasks ===
+    def scrape(self, task: dict, usage: UsageLedger) -> Tuple[dict, list]:
+        """
+        Read the listing page, keep the links never scraped before that
+        pass the link filter, and queue an article task for each.
+        """
+        request = AnalysisRequest(**task["request"])
+        links = self._page(
+            request,
+            lambda page: read_listing(page, request.listing_url, request.max_results),
+        )
+        new = get_article_store().new_links(request.listing_url, links)
+        logger.info("%d links on the listing page, %d new", len(links), len(new))
+
+        filtered = []
+        if new:
+            model, stage_models = build_models(request, self.governor, usage)
+            state = {
+                "model": model,
+                "stage_models": stage_models,
+                "escalation_threshold": request.escalation_threshold,
+            }
+            filtered = filter_with_llm_by_source(
+                model_for(state, "link_filter"),
+                {request.listing_url: new},
+                escalation_model=escalation_model_for(state, "link_filter"),
+                threshold=request.escalation_threshold,
+                usage=usage,
+                budget=usage.budget,
+            )
+        follow_ups = [
+            (
+                "article",
+                {
+                    "index": i,
+                    "total": len(filtered),
+                    "title": link["title"],
+                    "url": link.get("full_url", str(link["url"])),
+                    "host": link["url"].host,
+                },
+            )
+            for i, link in enumerate(filtered)
+        ]
+        logger.info("Queued %d article tasks", len(follow_ups))
+        return {"links": links, "usage": usage.report()}, follow_ups
+
+    def analyze(self, task: dict, usage: UsageLedger) -> Tuple[dict, list]:
+        """Extract one article's body and run it through the article pipeline."""
+        request = AnalysisRequest(**task["request"])
+        link = task["payload"]
+        metrics = RunMetrics()
+        article = NewsArticle(host=link["host"], title=link["title"], url=link["url"])
+
+        with log_context(article_index=link["index"]):
+            with metrics.time_article_stage(article.url, "extract"), span(
+                "extract", "article", url=article.url
+            ):
+                article.body = self._page(
+                    request, lambda page: read_article(page, article.url)
+                )
+
+        model, stage_models = build_models(request, self.governor, usage)
+        self.article_graph.invoke(
+            {
+                "escalation_threshold": request.escalation_threshold,
+                "analysis_text": request.analysis_text,
+                "spice_context": SPICE_CONTEXT,
+                "article": article,
+                "index": link["index"],
+                "total": link["total"],
+            },
+            context=RunContext(
+                model=model,
+                stage_models=stage_models,
+                usage=usage,
+                metrics=metrics,
+                budget=usage.budget,
+            ),
+        )
+        report = usage.report()
+        return {
+            "article": article.model_dump(mode="json"),
+            "usage": report,
+            "metrics": metrics.report(report),
+        }, []
+
+    def collect(self, task: dict, usage: UsageLedger) -> Tuple[dict, list]:
+        """
+        Add the batch's analyzed articles to the history as one run and
+        record its scraped links, leaving out those of failed articles and
+        of link filter batches skipped for budget.
+        """
+        batch_id = task["batch_id"]
+        request = AnalysisRequest(**task["request"])
+        tasks = self.queue.tasks(batch_id)
+        scrape = next(t for t in tasks if t["kind"] == "scrape")
+        if scrape["status"] != "done":
+            self.queue.finish_batch(batch_id, "failed", error=scrape["error"])
+            return {"status": "failed"}, []
+
+        done = sorted(
+            (t for t in tasks if t["kind"] == "article" and t["status"] == "done"),
+            key=lambda t: t["payload"]["index"],
+        )
+        failed = [
+            t for t in tasks if t["kind"] == "article" and t["status"] == "failed"
+        ]
+        articles = [NewsArticle.model_validate(t["result"]["article"]) for t in done]
+
+        run_usage = UsageLedger()
+        skipped = Counter()
+        for part in [scrape] + done:
+            run_usage.merge(part["result"]["usage"])
+            budget = part["result"]["usage"].get("budget") or {}
+            for stage, urls in budget.get("skipped", {}).items():
+                skipped[stage] += len(urls)
+        batch = self.queue.get_batch(batch_id)
+        seconds = (
+            datetime.now() - datetime.fromisoformat(batch["created_at"])
+        ).total_seconds()
+        metrics = merge_reports([t["result"]["metrics"] for t in done], seconds)
+
+        run_id = batch["run_id"]
+        if articles and run_id is None:
+            run_id = get_history_store().add_run(
+                history_entry({"articles": articles}, request, run_usage, metrics)
+            )
+            self.queue.record_run(batch_id, run_id)
+            logger.info(f"Analysis added to history as run {run_id}")
+
+        scrape_budget = scrape["result"]["usage"].get("budget") or {}
+        unrecorded = {
+            canonical_url(url)
+            for url in [t["payload"]["url"] for t in failed]
+            + scrape_budget.get("skipped", {}).get("link_filter", [])
+        }
+        get_article_store().record(
+            request.listing_url,
+            [
+                link
+                for link in scrape["result"]["links"]
+                if canonical_url(link["url"]) not in unrecorded
+            ],
+        )
+
+        summary = {
+            "articles": len(articles),
+            "relevant": sum(1 for a in articles if a.is_relevant),
+            "failed": [t["payload"]["url"] for t in failed],
+            "retries": sum(max(0, t["attempts"] - 1) for t in tasks),
+            "calls": metrics["calls"] + scrape["result"]["usage"]["total_calls"],
+            "cost": run_usage.report()["total_cost"],
+            "skipped": dict(skipped),
+            "run_id": run_id,
+        }
+        self.queue.finish_batch(batch_id, "succeeded", summary=summary)
+        logger.info(
+            "Batch finished: %d articles (%d relevant), %d failed",
+            summary["articles"],
+            summary["relevant"],
+            len(failed),
+        )
+        return summary, []
+
+
+# === Processes ===
+def worker_process(
+    stop, workers: int, threads: int, lease_seconds: float, drain: bool, verbose: bool
+) -> None:
+    """Entry point of a worker process; it gets 1/`workers` of the rate limits."""
+    load_dotenv()
+    # Ctrl-C reaches the whole process group: let the parent stop workers
+    # through `stop`, so they finish their current tasks
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging(verbose)
+    worker = FleetWorker(
+        get_task_queue(),
+        RateGovernor.from_env(share=1 / workers),
+        threads=threads,
+        lease_seconds=lease_seconds,
+    )
+    worker.run(stop, drain=drain)
+
+
+def start_workers(
+    count: int,
+    threads: int,
+    lease_seconds: float,
+    drain: bool,
+    verbose: bool = False,
+    method: str = "spawn",
+) -> Tuple[Any, List[multiprocessing.Process]]:
+    """Start `count` worker processes; returns their shared stop event and them."""
+    context = multiprocessing.get_context(method)
+    stop = context.Event()
+    processes = [
+        context.Process(
+            target=worker_process,
+            args=(stop, count, threads, lease_seconds, drain, verbose),
+            name=f"spice-worker-{i}",
+        )
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    return stop, processes
+
+
+# === Command line ===
+def print_batches(batches: List[dict], elapsed: float) -> None:
+    print(
+        f"\n{'Agency':<12} {'Status':<9} {'Articles':>8} {'Relevant':>8} "
+        f"{'Failed':>6} {'Retries':>7} {'Cost':>9}  Run"
+    )
+    for b in batches:
+        s = b["summary"] or {}
+        print(
+            f"{b['agency']:<12} {b['status']:<9} {s.get('articles', 0):>8} "
+            f"{s.get('relevant', 0):>8} {len(s.get('failed', [])):>6} "
+            f"{s.get('retries', 0):>7} ${s.get('cost', 0.0):>8.4f}  "
+            f"{b['run_id'] or '-'}"
+        )
+        if b["error"]:
+            print(f"{'':<12} error: {b['error']}")
+        for url in s.get("failed", []):
+            print(f"{'':<12} failed: {url}")
+    print(f"\nTotal: {len(batches)} agencies in {elapsed:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.fleet",
+        description="Analyze agencies on a fleet of worker processes.",
+    )
+    add_run_arguments(parser)
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=FLEET_WORKERS,
+        help=f"Worker processes (default: {FLEET_WORKERS})",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=FLEET_THREADS,
+        help=f"Tasks per worker at once, sharing its browsers (default: {FLEET_THREADS})",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_ATTEMPTS,
+        help=f"Attempts per task before giving up (default: {MAX_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=LEASE_SECONDS,
+        help="Seconds before the task of an unresponsive worker is reassigned",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--enqueue-only",
+        action="store_true",
+        help="Queue the agencies for workers running elsewhere, then exit",
+    )
+    mode.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep working the queue (and whatever is queued later) until stopped",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    agencies = {}
+    if not args.serve or args.agencies or args.all:
+        agencies = selected_agencies(parser, args)
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers and --threads must be at least 1")
+    setup_logging(args.verbose)
+
+    started = time.perf_counter()
+    if agencies and not prepare_run(args.browser):
+        return 1
+    queue = get_task_queue()
+    batch_ids = [
+        queue.enqueue(name, asdict(build_request(args, name, url)), args.max_attempts)
+        for name, url in agencies.items()
+    ]
+    if batch_ids:
+        logger.info(f"Queued {len(batch_ids)} agencies: {', '.join(agencies)}")
+    if args.enqueue_only:
+        for name, batch_id in zip(agencies, batch_ids):
+            print(f"{name}: {batch_id}")
+        return 0
+
+    stop, processes = start_workers(
+        args.workers, args.threads, args.lease, not args.serve, args.verbose
+    )
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    logger.info(f"Started {args.workers} workers with {args.threads} task threads each")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping workers after their current tasks...")
+        stop.set()
+        for process in processes:
+            process.join()
+
+    if not batch_ids:
+        return 0
+    batches = [queue.get_batch(batch_id) for batch_id in batch_ids]
+    print_batches(batches, time.perf_counter() - started)
+    unfinished = [b["agency"] for b in batches if b["status"] != "succeeded"]
+    if unfinished:
+        logger.error(f"Not analyzed: {', '.join(unfinished)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,12 @@
 import logging
 from langchain_core.messages import HumanMessage
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import BudgetExceeded, budgeted
+from agent.llm.routing import model_for
+from agent.logs import log_context
+from agent.metrics import article_stage
+from agent.state import load_articles, save_articles
 from agent.templates import BusinessEntity, GraphState, NewsArticle, OpenAI
 
 # Set up logger for this module
@@ -7,7 +14,10 @@ logger = logging.getLogger("spice.bei")
 
 
 def business_entity_identification(
-    model: OpenAI, spice_context: str, article: NewsArticle
+    model: OpenAI,
+    spice_context: str,
+    article: NewsArticle,
+    text_source: str = "summary",
 ) -> BusinessEntity:
     """
     Extract the top five most relevant business entities from the article
@@ -27,13 +37,48 @@ Return JSON with a single key `entities`, a list of objects each having:
 {spice_context}
 
 ### Article Content:
-{article.body}
+{article.analysis_text(text_source)}
 """
 
     parser = model.with_structured_output(BusinessEntity)
     return parser.invoke([HumanMessage(content=prompt)])
 
 
+@budgeted("bei", relevant_only=True)
+@article_stage("bei", relevant_only=True)
+def identify_entities(state: GraphState, article: NewsArticle, label: str = "") -> None:
+    """Run BEI for one article if it is relevant, keeping up to 5 entities."""
+    if not article.is_relevant:
+        article.business_entities = []
+        logger.debug("%s Skipping (not relevant): %.60s...", label, article.title)
+        return
+    if restore_article_stage("bei", article):
+        emit("entities", url=article.url, article=article)
+        return
+
+    logger.info("%s Processing: %.60s...", label, article.title)
+    try:
+        result: BusinessEntity = business_entity_identification(
+            model_for(state, "bei"),
+            state["spice_context"],
+            article,
+            state.get("analysis_text", "summary"),
+        )
+        # Truncate to top 5
+        article.business_entities = result.entities[:5]
+        save_article_stage("bei", article)
+        emit("entities", url=article.url, article=article)
+        logger.info("%s Found %d entities", label, len(article.business_entities))
+        for entity in article.business_entities:
+            logger.debug("  - %s (%s): %s", entity.name, entity.type, entity.role)
+    except BudgetExceeded:
+        # Recorded as skipped by `budgeted`
+        raise
+    except Exception as e:
+        logger.error(f"{label} Error identifying entities: {e}", exc_info=True)
+        article.business_entities = []
+
+
 def business_entity_identification_node(state: GraphState) -> GraphState:
     """
     For each article marked relevant, run the BEI prompt and keep up to 5 entities.
@@ -42,41 +87,18 @@ def business_entity_identification_node(state: GraphState) -> GraphState:
     logger.info("BUSINESS ENTITY IDENTIFICATION NODE STARTED")
     logger.info("=" * 80)
 
-    articles = state.get("articles", [])
-    relevant_articles = [
-        a for a in articles if getattr(a, "relevance", None) and a.relevance.is_relevant
-    ]
+    articles = load_articles(state)
+    relevant_articles = [a for a in articles if a.is_relevant]
 
     logger.info(
         f"Identifying business entities for {len(relevant_articles)} relevant articles"
     )
 
     for i, article in enumerate(articles, 1):
-        if getattr(article, "relevance", None) and article.relevance.is_relevant:
-            logger.info(f"[{i}/{len(articles)}] Processing: {article.title[:60]}...")
-            try:
-                result: BusinessEntity = business_entity_identification(
-                    state["model"], state["spice_context"], article
-                )
-                # Truncate to top 5
-                article.business_entities = result.entities[:5]
-                logger.info(
-                    f"[{i}/{len(articles)}] Found {len(article.business_entities)} entities"
-                )
-                for entity in article.business_entities:
-                    logger.debug(f"  - {entity.name} ({entity.type}): {entity.role}")
-            except Exception as e:
-                logger.error(
-                    f"[{i}/{len(articles)}] Error identifying entities: {e}",
-                    exc_info=True,
-                )
-                article.business_entities = []
-        else:
-            article.business_entities = []
-            logger.debug(
-                f"[{i}/{len(articles)}] Skipping (not relevant): {article.title[:60]}..."
-            )
+        with log_context(article_index=i - 1):
+            identify_entities(state, article, f"[{i}/{len(articles)}]")
 
+    state["articles"] = save_articles(state, articles)
     logger.info("✓ Business entity identification completed")
     logger.info("=" * 80)
     return state
@@ -1,4 +1,11 @@
 from langchain_core.messages import HumanMessage
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import budgeted
+from agent.llm.routing import model_for
+from agent.logs import log_context
+from agent.metrics import article_stage
+from agent.state import load_articles, save_articles
 from agent.templates import Opportunity
 from agent.templates import GraphState, NewsArticle, OpenAI
 from agent.context.spice import SPECIALIZED_CONTEXTS
@@ -10,6 +17,7 @@ def opportunity_identification(
     spice_context: str,
     filtered_contexts: Dict[str, str],
     article: NewsArticle,
+    text_source: str = "summary",
 ) -> Opportunity:
     """
     This node identifies opportunities for SPICE to collaborate based
@@ -40,7 +48,7 @@ Below you have:
 {article.title}
 
 4 **Article Content:**  
-{article.body}
+{article.analysis_text(text_source)}
 
 —
 
@@ -60,22 +68,40 @@ Your JSON must be valid.
     return parser.invoke([HumanMessage(content=prompt)])
 
 
+@budgeted("opportunity_identification", relevant_only=True)
+@article_stage("opportunity_identification", relevant_only=True)
+def identify_opportunity(state: GraphState, article: NewsArticle) -> None:
+    """
+    Applies opportunity_identification to one article if it is relevant.
+    """
+    if not article.is_relevant:
+        return
+    if restore_article_stage("opportunity_identification", article):
+        emit("opportunity", url=article.url, article=article)
+        return
+
+    domains = article.relevance.relevant_domains or []
+    filtered_contexts = {
+        key: SPECIALIZED_CONTEXTS[key] for key in domains if key in SPECIALIZED_CONTEXTS
+    }
+    article.opportunity = opportunity_identification(
+        model_for(state, "opportunity"),
+        state["spice_context"],
+        filtered_contexts,
+        article,
+        state.get("analysis_text", "summary"),
+    )
+    save_article_stage("opportunity_identification", article)
+    emit("opportunity", url=article.url, article=article)
+
+
 def opportunity_identification_node(state: GraphState) -> GraphState:
     """
     Applies opportunity_identification to each relevant article.
     """
-    for article in state.get("articles", []):
-        if getattr(article, "relevance", None) and article.relevance.is_relevant:
-            domains = article.relevance.relevant_domains or []
-            filtered_contexts = {
-                key: SPECIALIZED_CONTEXTS[key]
-                for key in domains
-                if key in SPECIALIZED_CONTEXTS
-            }
-            article.opportunity = opportunity_identification(
-                state["model"],
-                state["spice_context"],
-                filtered_contexts,
-                article,
-            )
+    articles = load_articles(state)
+    for i, article in enumerate(articles):
+        with log_context(article_index=i):
+            identify_opportunity(state, article)
+    state["articles"] = save_articles(state, articles)
     return state
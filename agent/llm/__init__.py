@@ -0,0 +1 @@
+"""LLM wrappers and backends shared by the graph nodes."""
@@ -0,0 +1,35 @@
+import os
+from typing import Any
+
+from agent.llm.offline import FixtureStore, OfflineChatModel, RecordingModel
+
+
+def create_chat_model(name: str, temperature: float = 0.7, **kwargs) -> Any:
+    """
+    Build the chat model for `name` using the backend chosen by
+    SPICE_LLM_BACKEND:
+
+      - "openai" (default): a live `ChatOpenAI`
+      - "offline": an `OfflineChatModel` replaying SPICE_LLM_FIXTURES and
+        synthesizing everything else (no key or network needed)
+      - "record": a live `ChatOpenAI` whose responses are saved to
+        SPICE_LLM_FIXTURES for later offline replay
+    """
+    backend = os.getenv("SPICE_LLM_BACKEND", "openai")
+    fixtures = os.getenv("SPICE_LLM_FIXTURES", "llm_fixtures.json")
+
+    if backend == "offline":
+        return OfflineChatModel(
+            fixtures_path=fixtures if os.path.exists(fixtures) else None,
+            latency=float(os.getenv("SPICE_OFFLINE_LATENCY", "0")),
+            latency_jitter=float(os.getenv("SPICE_OFFLINE_LATENCY_JITTER", "0")),
+            failure_rate=float(os.getenv("SPICE_OFFLINE_FAILURE_RATE", "0")),
+            seed=int(os.getenv("SPICE_OFFLINE_SEED", "0")),
+        )
+
+    from langchain_openai import ChatOpenAI
+
+    model = ChatOpenAI(model=name, temperature=temperature, **kwargs)
+    if backend == "record":
+        return RecordingModel(model, FixtureStore(fixtures))
+    return model
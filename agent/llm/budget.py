@@ -0,0 +1,211 @@
+"""Per-run and per-day limits on model calls, tokens and cost."""
+
+import functools
+import logging
+import os
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+from agent.checkpoint import restore_article_stage
+from agent.llm.routing import run_resource
+
+# Set up logger for this module
+logger = logging.getLogger("spice.budget")
+
+# Share of a budget after which optional stages start being skipped
+SOFT_LIMIT = float(os.getenv("SPICE_BUDGET_SOFT_LIMIT", "0.8"))
+
+# Optional stages, in the order they are dropped as a budget runs out:
+# email drafting from SOFT_LIMIT, opportunity identification halfway to
+# the limit. Every other stage runs until the limit itself.
+OPTIONAL_STAGES = ("email_outreach", "opportunity_identification")
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised instead of making a model call once a budget is used up."""
+
+
+def _env_number(name: str, kind: Callable = float):
+    value = os.getenv(name, "").strip()
+    return kind(value) if value else None
+
+
+@dataclass
+class BudgetLimits:
+    """Caps on model calls, tokens (prompt + completion) and cost; None is unlimited."""
+
+    calls: Optional[int] = None
+    tokens: Optional[int] = None
+    cost: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "BudgetLimits":
+        """Limits from `<prefix>_MAX_CALLS`, `_MAX_TOKENS` and `_MAX_COST`."""
+        return cls(
+            calls=_env_number(f"{prefix}_MAX_CALLS", int),
+            tokens=_env_number(f"{prefix}_MAX_TOKENS", int),
+            cost=_env_number(f"{prefix}_MAX_COST"),
+        )
+
+    def used(self, spent: dict) -> Tuple[float, Optional[str]]:
+        """Largest share of any limit `spent` uses, and that limit's name."""
+        share, name = 0.0, None
+        for field, limit in asdict(self).items():
+            if limit is None:
+                continue
+            used = spent[field] / limit if limit > 0 else 1.0
+            if used > share or name is None:
+                share, name = used, field
+        return share, name
+
+
+class RunBudget:
+    """
+    Enforces a run's own limits and the daily limits shared by all runs
+    (tracked in the usage store). Optional stages are skipped as the
+    budget runs low (see OPTIONAL_STAGES); once it is used up, no more
+    model calls are made and the remaining articles skip their stages.
+    Skipped stages are recorded per article. Safe to share between threads.
+
+    `earlier` is what parts of the run done elsewhere (other tasks of a
+    fleet batch) already spent; it counts toward the run limits.
+    """
+
+    def __init__(
+        self,
+        run: Optional[BudgetLimits] = None,
+        daily: Optional[BudgetLimits] = None,
+        store=None,
+        soft_limit: float = SOFT_LIMIT,
+        earlier: Optional[dict] = None,
+    ):
+        self.run_limits = run or BudgetLimits()
+        self.daily_limits = daily or BudgetLimits()
+        self.soft_limit = soft_limit
+        self._lock = threading.Lock()
+        self.spent = {"calls": 0, "tokens": 0, "cost": 0.0}
+        self.earlier = {**self.spent, **(earlier or {})}
+        self.skipped: Dict[str, list] = defaultdict(list)
+
+        limits = asdict(self.daily_limits).values()
+        if store is None and any(limit is not None for limit in limits):
+            from agent.storage.usage import get_usage_store
+
+            store = get_usage_store()
+        self.store = store
+
+    @classmethod
+    def from_env(
+        cls,
+        calls: Optional[int] = None,
+        tokens: Optional[int] = None,
+        cost: Optional[float] = None,
+        earlier: Optional[dict] = None,
+    ) -> "RunBudget":
+        """
+        Budget from SPICE_RUN_MAX_* and SPICE_DAILY_MAX_*; `calls`,
+        `tokens` and `cost` override the run limits.
+        """
+        run = BudgetLimits.from_env("SPICE_RUN")
+        for name, value in (("calls", calls), ("tokens", tokens), ("cost", cost)):
+            if value is not None:
+                setattr(run, name, value)
+        return cls(run, BudgetLimits.from_env("SPICE_DAILY"), earlier=earlier)
+
+    # === Accounting ===
+    def record(self, tokens: int, cost: float) -> None:
+        """Count one model call against the run and the day."""
+        with self._lock:
+            self.spent["calls"] += 1
+            self.spent["tokens"] += tokens
+            self.spent["cost"] += cost
+        if self.store is not None:
+            self.store.add(date.today().isoformat(), 1, tokens, cost)
+
+    def used(self) -> Tuple[float, Optional[str]]:
+        """Largest share of any run or daily limit used so far, and which."""
+        with self._lock:
+            spent = {
+                field: self.earlier[field] + self.spent[field] for field in self.spent
+            }
+        share, name = self.run_limits.used(spent)
+        name = name and f"run {name}"
+        if self.store is not None:
+            daily, daily_name = self.daily_limits.used(
+                self.store.get(date.today().isoformat())
+            )
+            if daily_name and daily > share:
+                share, name = daily, f"daily {daily_name}"
+        return share, name
+
+    def threshold(self, stage: str) -> float:
+        if stage in OPTIONAL_STAGES:
+            step = OPTIONAL_STAGES.index(stage) / len(OPTIONAL_STAGES)
+            return self.soft_limit + (1 - self.soft_limit) * step
+        return 1.0
+
+    def allows(self, stage: str) -> bool:
+        """Whether `stage` may still make model calls."""
+        share, _ = self.used()
+        return share < self.threshold(stage)
+
+    def check(self) -> None:
+        """Raise BudgetExceeded if any limit is used up."""
+        share, name = self.used()
+        if share >= 1.0:
+            raise BudgetExceeded(f"{name} budget used up ({share:.0%})")
+
+    def skip(self, stage: str, url: str) -> None:
+        with self._lock:
+            first = not self.skipped[stage]
+            self.skipped[stage].append(url)
+        if first:
+            share, name = self.used()
+            logger.warning(
+                f"{share:.0%} of the {name} budget used: "
+                f"skipping {stage} for the remaining articles"
+            )
+
+    def report(self) -> dict:
+        share, name = self.used()
+        with self._lock:
+            return {
+                "limits": {
+                    "run": asdict(self.run_limits),
+                    "daily": asdict(self.daily_limits),
+                },
+                "spent": dict(self.spent),
+                "used": share,
+                "binding": name,
+                "skipped": {stage: list(urls) for stage, urls in self.skipped.items()},
+            }
+
+
+def budgeted(stage: str, relevant_only: bool = False) -> Callable:
+    """
+    Decorate a per-article stage helper `(state, article, ...)` so it is
+    skipped, and the skip recorded, once the run's budget no longer allows
+    `stage`. Results restored from a checkpoint are still applied. With
+    `relevant_only`, irrelevant articles (which the helper ignores) are
+    never recorded as skipped.
+    """
+
+    def decorate(helper: Callable) -> Callable:
+        @functools.wraps(helper)
+        def wrapper(state, article, *args, **kwargs):
+            budget = run_resource(state, "budget")
+            if budget is None or (relevant_only and not article.is_relevant):
+                return helper(state, article, *args, **kwargs)
+            if budget.allows(stage) or restore_article_stage(stage, article):
+                try:
+                    return helper(state, article, *args, **kwargs)
+                except BudgetExceeded:
+                    pass
+            budget.skip(stage, article.url)
+
+        return wrapper
+
+    return decorate
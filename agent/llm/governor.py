@@ -0,0 +1,225 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict
+
+from agent.llm.proxy import ModelProxy, current_node
+from agent.tracing import span
+
+# Set up logger for this module
+logger = logging.getLogger("spice.governor")
+
+
+def estimate_tokens(input: Any, completion_tokens: int = 0) -> int:
+    """
+    Cheap token estimate for a model request (~4 characters per token),
+    plus the expected completion size.
+    """
+    if isinstance(input, str):
+        messages = [input]
+    elif isinstance(input, (list, tuple)):
+        messages = input
+    else:
+        messages = [input]
+
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4 + 4 * len(messages) + completion_tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors raised by the OpenAI client (or look-alikes)."""
+    return (
+        getattr(error, "status_code", None) == 429
+        or type(error).__name__ == "RateLimitError"
+    )
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units evenly over a minute. The level may go
+    negative when actual usage exceeds what was reserved up front.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+@dataclass
+class NodeStats:
+    calls: int = 0
+    tokens_reserved: int = 0
+    queue_wait_s: float = 0.0
+    throttled: int = 0
+    retries: int = 0
+    errors: int = 0
+
+
+class RateGovernor:
+    """
+    Process-wide limiter for LLM calls.
+
+    Every call reserves one request from the RPM bucket and an estimated
+    number of tokens from the TPM bucket. Callers are served strictly in
+    arrival order, and 429 responses are retried with exponential backoff.
+    Queue wait time and throttle/retry counts are tracked per graph node.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 500,
+        tpm: int = 200_000,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        completion_tokens: int = 512,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.completion_tokens = completion_tokens
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._stats: Dict[str, NodeStats] = defaultdict(NodeStats)
+
+    @classmethod
+    def from_env(cls, share: float = 1.0) -> "RateGovernor":
+        """
+        Build a governor from the SPICE_LLM_* environment variables, for
+        `share` of the limits (e.g. 1/N in each of N worker processes).
+        """
+        return cls(
+            rpm=max(1, int(int(os.getenv("SPICE_LLM_RPM", "500")) * share)),
+            tpm=max(1, int(int(os.getenv("SPICE_LLM_TPM", "200000")) * share)),
+            max_retries=int(os.getenv("SPICE_LLM_MAX_RETRIES", "5")),
+        )
+
+    def wrap(self, model: Any) -> "GovernedModel":
+        return GovernedModel(model, self)
+
+    # === Queueing ===
+    def acquire(self, tokens: int, node: str) -> float:
+        """
+        Block until this caller is at the head of the queue and both buckets
+        can cover the request. Returns the time spent waiting.
+        """
+        ticket = object()
+        started = time.monotonic()
+        throttled = False
+
+        with self._cond:
+            self._queue.append(ticket)
+            while True:
+                if self._queue[0] is ticket:
+                    wait = max(
+                        self.requests.wait_time(1), self.tokens.wait_time(tokens)
+                    )
+                    if wait <= 0:
+                        break
+                    throttled = True
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait()
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self._queue.popleft()
+            self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            stats = self._stats[node]
+            stats.calls += 1
+            stats.tokens_reserved += tokens
+            stats.queue_wait_s += waited
+            stats.throttled += int(throttled)
+
+        if throttled:
+            logger.debug("Throttled call from %s for %.2fs", node, waited)
+        return waited
+
+    def reconcile(self, reserved: int, result: Any) -> None:
+        """Charge the TPM bucket for the difference between estimate and usage."""
+        if isinstance(result, dict):
+            # Structured output requested with include_raw=True
+            result = result.get("raw")
+        usage = getattr(result, "usage_metadata", None)
+        if not usage:
+            return
+        with self._cond:
+            self.tokens.consume(usage.get("total_tokens", reserved) - reserved)
+
+    # === Calls ===
+    def call(self, invoke: Callable[[], Any], input: Any) -> Any:
+        """Run `invoke` under the RPM/TPM budgets, retrying 429s with backoff."""
+        node = current_node()
+        tokens = estimate_tokens(input, self.completion_tokens)
+
+        for attempt in range(self.max_retries + 1):
+            with span("rate limit wait", "llm", attempt=attempt):
+                self.acquire(tokens, node)
+            try:
+                result = invoke()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    with self._cond:
+                        self._stats[node].errors += 1
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+                delay += random.uniform(0, delay / 2)
+                with self._cond:
+                    self._stats[node].retries += 1
+                logger.warning(
+                    f"429 from model in {node}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+            self.reconcile(tokens, result)
+            return result
+
+    def stats(self, reset: bool = False) -> Dict[str, dict]:
+        """Per-node call, queue-wait, throttle and retry counters."""
+        with self._cond:
+            snapshot = {node: asdict(s) for node, s in self._stats.items()}
+            if reset:
+                self._stats.clear()
+        return snapshot
+
+
+class GovernedModel(ModelProxy):
+    """A chat model whose calls all go through a shared `RateGovernor`."""
+
+    def __init__(self, runnable: Any, governor: RateGovernor):
+        super().__init__(runnable)
+        self.governor = governor
+
+    def _call(self, invoke: Callable[[], Any], input: Any) -> Any:
+        return self.governor.call(invoke, input)
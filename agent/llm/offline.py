@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    convert_to_messages,
+)
+from langchain_core.prompt_values import PromptValue
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel, PrivateAttr
+
+from agent.llm.proxy import ModelProxy
+
+# Set up logger for this module
+logger = logging.getLogger("spice.offline")
+
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>,\]\)]+")
+SCHEMA_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+WORDS = (
+    "SPICE partners with industry on applied research pilots covering robotics, "
+    "sustainability, digital twins, energy efficiency and smart infrastructure, "
+    "with funded collaboration and co-development opportunities for companies"
+).split()
+
+
+class OfflineModelError(Exception):
+    """Injected failure; `status_code` lets 429s exercise the rate governor."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Injected offline model failure (HTTP {status_code})")
+        self.status_code = status_code
+
+
+def to_messages(input: Any) -> List[BaseMessage]:
+    """Normalize any chat-model input (str, messages, PromptValue) to messages."""
+    if isinstance(input, PromptValue):
+        return input.to_messages()
+    if isinstance(input, str):
+        return [HumanMessage(content=input)]
+    return convert_to_messages(input)
+
+
+def prompt_key(messages: List[BaseMessage], schema: Optional[str] = None) -> str:
+    """Stable hash of a request, used to key recorded fixtures."""
+    payload = json.dumps(
+        {
+            "schema": schema,
+            "messages": [[m.type, m.content] for m in messages],
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """
+    Recorded responses in a JSON file mapping prompt hash to either
+    {"content": str} (plain calls) or {"parsed": dict} (structured output).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = (
+            json.loads(self.path.read_text(encoding="utf-8"))
+            if self.path.exists()
+            else {}
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self.entries[key] = entry
+            self.path.write_text(
+                json.dumps(self.entries, indent=2, ensure_ascii=False),
+                encoding="utf-8",
+            )
+
+
+# === Schema-valid synthesis ===
+def synthesize(schema: dict, rng: random.Random, urls: List[str]) -> Any:
+    """
+    Build a value matching a JSON schema (as produced by pydantic's
+    `model_json_schema`). URL fields are filled from `urls`, the links found
+    in the prompt, so link filtering echoes back real candidates.
+    """
+    defs = schema.get("$defs", {})
+
+    def resolve(node: dict) -> dict:
+        while "$ref" in node:
+            node = defs[node["$ref"].split("/")[-1]]
+        return node
+
+    def has_url(node: dict) -> bool:
+        node = resolve(node)
+        return any(
+            resolve(p).get("format") == "uri"
+            for p in node.get("properties", {}).values()
+        )
+
+    url_iter = iter(urls)
+
+    def value(node: dict) -> Any:
+        node = resolve(node)
+        if "anyOf" in node:
+            options = [o for o in node["anyOf"] if o.get("type") != "null"]
+            return value(options[0]) if options else None
+        if "enum" in node:
+            return rng.choice(node["enum"])
+        if "const" in node:
+            return node["const"]
+
+        kind = node.get("type", "object")
+        if kind == "object":
+            return {
+                key: value(prop) for key, prop in node.get("properties", {}).items()
+            }
+        if kind == "array":
+            items = node.get("items", {})
+            if has_url(items):
+                count = len(urls)
+            else:
+                count = rng.randint(1, 3)
+            return [value(items) for _ in range(count)]
+        if kind == "boolean":
+            return rng.random() < 0.5
+        if kind == "integer":
+            return rng.randint(0, 10)
+        if kind == "number":
+            return round(rng.random(), 2)
+        if node.get("format") == "uri":
+            return next(url_iter, "https://example.com/news/offline")
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+    return value(schema)
+
+
+class OfflineChatModel(BaseChatModel):
+    """
+    Deterministic local chat model for benchmarks and load tests.
+
+    Responses are replayed from a `FixtureStore` when the prompt hash was
+    recorded, and otherwise synthesized: structured-output calls return a
+    schema-valid instance, plain calls that embed a JSON schema (e.g.
+    PydanticOutputParser format instructions) return matching JSON, and
+    anything else returns filler text. Latency and failures can be injected.
+    """
+
+    fixtures_path: Optional[str] = None
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 500
+    completion_words: int = 150
+    seed: int = 0
+
+    _fixtures: Optional[FixtureStore] = PrivateAttr(default=None)
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        if self.fixtures_path:
+            self._fixtures = FixtureStore(self.fixtures_path)
+
+    @property
+    def _llm_type(self) -> str:
+        return "spice-offline"
+
+    # === Helpers ===
+    def _rng_for(self, key: str) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    def _simulate_call(self) -> None:
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.latency_jitter)
+            fail = self._rng.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise OfflineModelError(self.failure_status)
+
+    def _usage(self, messages: List[BaseMessage], content: str) -> dict:
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(content) // 4
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _text_for(self, messages: List[BaseMessage]) -> str:
+        key = prompt_key(messages)
+        recorded = self._fixtures.get(key) if self._fixtures else None
+        if recorded and "content" in recorded:
+            return recorded["content"]
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = self._rng_for(key)
+        block = SCHEMA_BLOCK_PATTERN.search(prompt)
+        if block:
+            try:
+                schema = json.loads(block.group(1))
+                urls = list(dict.fromkeys(URL_PATTERN.findall(prompt[block.end() :])))
+                return json.dumps(synthesize(schema, rng, urls))
+            except json.JSONDecodeError:
+                pass
+        return " ".join(rng.choice(WORDS) for _ in range(self.completion_words))
+
+    # === BaseChatModel interface ===
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._simulate_call()
+        content = self._text_for(messages)
+        message = AIMessage(
+            content=content, usage_metadata=self._usage(messages, content)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        self._simulate_call()
+        content = self._text_for(messages)
+        for i, word in enumerate(content.split(" ")):
+            token = word if i == 0 else " " + word
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, content)
+            )
+        )
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        def invoke(input: Any) -> Any:
+            messages = to_messages(input)
+            key = prompt_key(messages, schema.__name__)
+            self._simulate_call()
+
+            recorded = self._fixtures.get(key) if self._fixtures else None
+            if recorded and "parsed" in recorded:
+                data = recorded["parsed"]
+            else:
+                prompt = "\n".join(str(m.content) for m in messages)
+                urls = list(dict.fromkeys(URL_PATTERN.findall(prompt)))
+                data = synthesize(schema.model_json_schema(), self._rng_for(key), urls)
+
+            parsed = schema.model_validate(data)
+            if not include_raw:
+                return parsed
+            content = json.dumps(data)
+            raw = AIMessage(
+                content=content, usage_metadata=self._usage(messages, content)
+            )
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return RunnableLambda(invoke)
+
+
+class RecordingModel(ModelProxy):
+    """
+    Wraps a live model and stores every response in a `FixtureStore`, so a
+    later `OfflineChatModel(fixtures_path=...)` run can replay it exactly.
+    """
+
+    def __init__(self, runnable: Any, fixtures: FixtureStore):
+        super().__init__(runnable)
+        self.fixtures = fixtures
+        self.schema: Optional[type] = None
+
+    def with_structured_output(self, schema, **kwargs) -> "RecordingModel":
+        derived = super().with_structured_output(schema, **kwargs)
+        derived.schema = schema
+        return derived
+
+    def _call(self, invoke: Callable[[], Any], input: Any) -> Any:
+        result = invoke()
+        messages = to_messages(input)
+        parsed = result.get("parsed") if isinstance(result, dict) else result
+
+        if self.schema is not None and isinstance(parsed, BaseModel):
+            key = prompt_key(messages, self.schema.__name__)
+            self.fixtures.put(key, {"parsed": parsed.model_dump(mode="json")})
+        elif isinstance(getattr(result, "content", None), str):
+            self.fixtures.put(prompt_key(messages), {"content": result.content})
+        return result
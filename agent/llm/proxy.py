@@ -0,0 +1,79 @@
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+_stage: ContextVar[Optional[str]] = ContextVar("spice_stage", default=None)
+_article: ContextVar[Optional[str]] = ContextVar("spice_article", default=None)
+
+
+@contextmanager
+def stage_scope(name: str) -> Iterator[None]:
+    """
+    Attribute model calls made inside the block to stage `name` rather than
+    the enclosing graph node (used when one node runs several stages).
+    """
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+@contextmanager
+def article_scope(url: str) -> Iterator[None]:
+    """Attribute model calls made inside the block to the article at `url`."""
+    token = _article.set(url)
+    try:
+        yield
+    finally:
+        _article.reset(token)
+
+
+def current_article() -> Optional[str]:
+    """URL of the article being processed, if any."""
+    return _article.get()
+
+
+def current_node() -> str:
+    """
+    Name of the stage or graph node the caller is running in, or "unknown"
+    when called outside of a graph run.
+    """
+    if _stage.get() is not None:
+        return _stage.get()
+    # Imported here so that pricing/usage helpers stay cheap to import
+    from langgraph.config import get_config
+
+    try:
+        return get_config().get("metadata", {}).get("langgraph_node", "unknown")
+    except RuntimeError:
+        return "unknown"
+
+
+class ModelProxy:
+    """
+    Wraps a chat model, or a structured-output runnable derived from it, and
+    routes every `.invoke` through `_call`. Everything else is delegated to
+    the wrapped runnable, so a proxy can stand in for `state["model"]`.
+    """
+
+    def __init__(self, runnable: Any):
+        self.runnable = runnable
+
+    def _call(self, invoke: Callable[[], Any], input: Any) -> Any:
+        return invoke()
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self._call(lambda: self.runnable.invoke(input, config, **kwargs), input)
+
+    def with_structured_output(self, schema, **kwargs) -> "ModelProxy":
+        derived = copy.copy(self)
+        derived.runnable = self.runnable.with_structured_output(schema, **kwargs)
+        return derived
+
+    def __getattr__(self, name: str) -> Any:
+        # Guard against recursion while `copy` rebuilds an instance
+        if name == "runnable" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.runnable, name)
@@ -0,0 +1,79 @@
+from typing import Any, Callable, Optional
+
+from langgraph.runtime import get_runtime
+
+# Stages that can be routed to their own model via GraphState["stage_models"].
+# "<stage>_escalation" entries name the stronger model a cascade falls back to.
+STAGES = (
+    "link_filter",
+    "relevance",
+    "summary",
+    "bei",
+    "opportunity",
+    "email",
+)
+
+DEFAULT_ESCALATION_THRESHOLD = 0.7
+
+
+def run_resource(state: dict, key: str) -> Any:
+    """
+    Look up a run-scoped object ("model", "stage_models", "usage" or
+    "budget") in state, falling back to the graph's runtime `RunContext`
+    (used by checkpointed runs, which keep these objects out of state).
+    """
+    if state.get(key) is not None:
+        return state[key]
+    try:
+        context = get_runtime().context
+    except RuntimeError:
+        return None
+    return getattr(context, key, None)
+
+
+def _check_stage(stage: str) -> None:
+    # A misspelled stage would otherwise quietly run on the default model
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGES}")
+
+
+def model_for(state: dict, stage: str) -> Any:
+    """Model configured for `stage`, falling back to the default model."""
+    _check_stage(stage)
+    stage_models = run_resource(state, "stage_models") or {}
+    return stage_models.get(stage) or run_resource(state, "model")
+
+
+def escalation_model_for(state: dict, stage: str) -> Optional[Any]:
+    """Stronger model to re-check `stage` with, if a cascade is configured."""
+    _check_stage(stage)
+    return (run_resource(state, "stage_models") or {}).get(f"{stage}_escalation")
+
+
+def escalation_threshold(state: dict) -> float:
+    """Confidence below which a verdict is re-checked on the escalation model."""
+    value = state.get("escalation_threshold")
+    return DEFAULT_ESCALATION_THRESHOLD if value is None else value
+
+
+def cascade(
+    state: dict,
+    stage: str,
+    run: Callable[[Any], Any],
+    should_escalate: Callable[[Any], bool],
+) -> Any:
+    """
+    Run `run(model)` on the stage's (cheap) model and, if `should_escalate`
+    says so and an escalation model is configured, run it again on the
+    stronger model. Escalations are counted in the run's usage ledger.
+    """
+    result = run(model_for(state, stage))
+    strong = escalation_model_for(state, stage)
+    if strong is None:
+        return result
+
+    escalate = should_escalate(result)
+    usage = run_resource(state, "usage")
+    if usage is not None:
+        usage.record_escalation(stage, escalate)
+    return run(strong) if escalate else result
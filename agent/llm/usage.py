@@ -0,0 +1,168 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+from agent.llm.proxy import ModelProxy, current_article, current_node
+from agent.tracing import span
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING = {
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def estimate_cost(model_name: str, input_tokens: int, output_tokens: int) -> float:
+    """Dollar cost of a call, or 0.0 for models missing from MODEL_PRICING."""
+    input_price, output_price = MODEL_PRICING.get(model_name, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _empty_usage() -> Dict[str, float]:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_hits": 0,
+        "cached_tokens": 0,
+        "cost": 0.0,
+    }
+
+
+class UsageLedger:
+    """
+    Per-run record of model usage (by model, node and article) and of
+    cascade escalations (by stage). Safe to share between threads.
+
+    Calls are also counted against `budget` (a `RunBudget`), if given,
+    and metered models refuse to call once it is used up.
+    """
+
+    def __init__(self, budget: Optional[Any] = None):
+        self._lock = threading.Lock()
+        self.budget = budget
+        self.by_model = defaultdict(_empty_usage)
+        self.by_node = defaultdict(_empty_usage)
+        self.by_article = defaultdict(_empty_usage)
+        self.escalations = defaultdict(lambda: {"checked": 0, "escalated": 0})
+
+    def meter(self, model: Any, model_name: str) -> "MeteredModel":
+        return MeteredModel(model, model_name, self)
+
+    def record_call(self, model_name: str, result: Any) -> None:
+        usage = getattr(result, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        # Prompt tokens served from the provider's prompt cache
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0)
+        cost = estimate_cost(model_name, input_tokens, output_tokens)
+        node = current_node()
+        article = current_article()
+        with self._lock:
+            buckets = [self.by_model[model_name], self.by_node[node]]
+            if article is not None:
+                buckets.append(self.by_article[article])
+            for bucket in buckets:
+                bucket["calls"] += 1
+                bucket["input_tokens"] += input_tokens
+                bucket["output_tokens"] += output_tokens
+                bucket["cache_hits"] += 1 if cached_tokens else 0
+                bucket["cached_tokens"] += cached_tokens
+                bucket["cost"] += cost
+        if self.budget is not None:
+            self.budget.record(input_tokens + output_tokens, cost)
+
+    def record_escalation(self, stage: str, escalated: bool, count: int = 1) -> None:
+        with self._lock:
+            self.escalations[stage]["checked"] += count
+            self.escalations[stage]["escalated"] += count if escalated else 0
+
+    def merge(self, report: dict) -> None:
+        """
+        Add the usage in another ledger's `report()` (e.g. of a part of the
+        run done in another process). Its budget report is not merged.
+        """
+        with self._lock:
+            for name in ("by_model", "by_node", "by_article"):
+                buckets = getattr(self, name)
+                for key, usage in report.get(name, {}).items():
+                    for field, value in usage.items():
+                        buckets[key][field] += value
+            for stage, counts in report.get("escalations", {}).items():
+                self.escalations[stage]["checked"] += counts["checked"]
+                self.escalations[stage]["escalated"] += counts["escalated"]
+
+    def report(self) -> dict:
+        """Totals, per-model/node/article usage and escalation rates for the run."""
+        with self._lock:
+            escalations = {
+                stage: {
+                    **counts,
+                    "rate": (
+                        counts["escalated"] / counts["checked"]
+                        if counts["checked"]
+                        else 0.0
+                    ),
+                }
+                for stage, counts in self.escalations.items()
+            }
+            return {
+                "total_cost": sum(u["cost"] for u in self.by_model.values()),
+                "total_calls": sum(u["calls"] for u in self.by_model.values()),
+                "by_model": {k: dict(v) for k, v in self.by_model.items()},
+                "by_node": {k: dict(v) for k, v in self.by_node.items()},
+                "by_article": {k: dict(v) for k, v in self.by_article.items()},
+                "escalations": escalations,
+                "budget": self.budget.report() if self.budget is not None else None,
+            }
+
+
+class MeteredModel(ModelProxy):
+    """
+    Records token usage and cost of every call in a `UsageLedger`.
+
+    Structured-output calls are made with `include_raw=True` so that the
+    raw message (and its usage metadata) is available; callers still get
+    the parsed object back unless they asked for the raw result themselves.
+    """
+
+    def __init__(self, runnable: Any, model_name: str, ledger: UsageLedger):
+        super().__init__(runnable)
+        self.model_name = model_name
+        self.ledger = ledger
+        self.unwrap_raw = False
+
+    def with_structured_output(self, schema, **kwargs) -> "MeteredModel":
+        caller_wants_raw = kwargs.get("include_raw", False)
+        kwargs["include_raw"] = True
+        derived = super().with_structured_output(schema, **kwargs)
+        derived.unwrap_raw = not caller_wants_raw
+        return derived
+
+    def _call(self, invoke: Callable[[], Any], input: Any) -> Any:
+        if self.ledger.budget is not None:
+            self.ledger.budget.check()
+        with span(
+            f"llm {self.model_name}", "llm", model=self.model_name, node=current_node()
+        ) as args:
+            result = invoke()
+            usage = getattr(
+                result.get("raw") if isinstance(result, dict) else result,
+                "usage_metadata",
+                None,
+            )
+            if usage:
+                args["input_tokens"] = usage.get("input_tokens")
+                args["output_tokens"] = usage.get("output_tokens")
+        if isinstance(result, dict) and "raw" in result:
+            self.ledger.record_call(self.model_name, result["raw"])
+            if self.unwrap_raw:
+                if result.get("parsing_error"):
+                    raise result["parsing_error"]
+                return result["parsed"]
+            return result
+        self.ledger.record_call(self.model_name, result)
+        return result
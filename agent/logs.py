@@ -0,0 +1,188 @@
+"""
+Logging setup shared by the app and the command line tools.
+
+Records are handed to a queue on the logging thread and written by a
+background listener, so slow handlers (files, terminals) never block a
+node or the event loop. Messages logged %-style are only formatted by
+the listener, and only if the record survives sampling. Every record
+carries the run context (run_id, agency, node, article_index, article)
+and, for timings, a duration; with SPICE_LOG_FORMAT=json they are
+written as one JSON object per line.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional, TextIO
+
+from agent.llm.proxy import current_article, current_node
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Fields added to every record, from log_context (or `extra=`)
+CONTEXT_FIELDS = ("run_id", "agency", "node", "article_index", "article", "duration")
+
+_context: ContextVar[dict] = ContextVar("spice_log_context", default={})
+_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Add `fields` (e.g. run_id, article_index) to records logged in the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps records with the caller's log context, graph node and article.
+    Runs on the logging thread, where those context variables are set.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        for name in CONTEXT_FIELDS:
+            if getattr(record, name, None) is None:
+                setattr(record, name, context.get(name))
+        # No graph can be running before langgraph is imported (the app
+        # imports it lazily, so don't pull it in from here)
+        if record.node is None and "langgraph.config" in sys.modules:
+            node = current_node()
+            record.node = node if node != "unknown" else None
+        if record.article is None:
+            record.article = current_article()
+        return True
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Rates from "logger=rate,..." (e.g. "spice.webscrape=0.1")."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the records below WARNING from chosen loggers
+    (and their children); warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest names first, so the most specific logger wins
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and context."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queues records with their message rendered, so arguments that change
+    later (lists, articles) are logged as they were, but leaves formatting
+    (text or JSON, tracebacks) to the listener. Only records that passed
+    the filters get here, so sampled-out ones are never rendered.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(
+    level: Optional[int] = None,
+    log_file: Optional[str] = None,
+    stream: Optional[TextIO] = sys.stderr,
+    json_format: Optional[bool] = None,
+) -> logging.Logger:
+    """
+    Route the "spice" loggers through a queue to a console `stream` and/or
+    `log_file`. Level, format and sampling default to SPICE_LOG_LEVEL
+    (INFO), SPICE_LOG_FORMAT ("text" or "json") and SPICE_LOG_SAMPLING
+    ("logger=rate,..."). Calling it again replaces the previous setup.
+    """
+    global _listener
+
+    if level is None:
+        level = logging.getLevelName(os.getenv("SPICE_LOG_LEVEL", "INFO").upper())
+    if json_format is None:
+        json_format = os.getenv("SPICE_LOG_FORMAT", "text").lower() == "json"
+    formatter = (
+        JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    )
+
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+    sampling = parse_sampling(os.getenv("SPICE_LOG_SAMPLING", ""))
+    if sampling:
+        # Before the context filter, so dropped records cost no lookups
+        queue_handler.filters.insert(0, SamplingFilter(sampling))
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger("spice")
+    logger.handlers.clear()
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+@atexit.register
+def _flush_logs() -> None:
+    """Write out queued records before the interpreter exits."""
+    if _listener is not None:
+        _listener.stop()
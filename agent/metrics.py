@@ -0,0 +1,377 @@
+"""Per-run wall time, token and cost metrics by graph node and by article."""
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agent.llm.proxy import article_scope
+from agent.tracing import span
+
+# Set up logger for this module
+logger = logging.getLogger("spice.metrics")
+
+# LLM usage fields merged into node and article metrics, from UsageLedger
+USAGE_FIELDS = (
+    "calls",
+    "input_tokens",
+    "output_tokens",
+    "cache_hits",
+    "cached_tokens",
+    "cost",
+)
+
+
+class RunMetrics:
+    """
+    Wall time of every graph node invocation and of every per-article stage
+    in a run. LLM calls, tokens, cache hits and cost come from the run's
+    `UsageLedger` and are merged in by `report`. Safe to share between
+    threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.nodes = defaultdict(lambda: {"runs": 0, "errors": 0, "seconds": 0.0})
+        self.articles = defaultdict(lambda: defaultdict(float))
+
+    @contextmanager
+    def time_node(self, name: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - begin
+            with self._lock:
+                node = self.nodes[name]
+                node["runs"] += 1
+                node["errors"] += int(failed)
+                node["seconds"] += seconds
+            logger.debug(
+                "Node %s finished in %.3fs", name, seconds, extra={"duration": seconds}
+            )
+
+    @contextmanager
+    def time_article_stage(self, url: str, stage: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - begin
+            with self._lock:
+                self.articles[url][stage] += seconds
+            logger.debug(
+                "Stage %s of %s took %.3fs",
+                stage,
+                url,
+                seconds,
+                extra={"duration": seconds},
+            )
+
+    def report(self, usage: Optional[dict] = None) -> dict:
+        """
+        Run, node and article metrics as plain JSON-serializable dicts.
+        `usage` is the run's `UsageLedger.report()`.
+        """
+        usage = usage or {}
+
+        def merged(timing: dict, calls: Optional[dict]) -> dict:
+            entry = dict(timing)
+            for name in USAGE_FIELDS:
+                entry[name] = (calls or {}).get(name, 0)
+            return entry
+
+        with self._lock:
+            node_timings = {name: dict(node) for name, node in self.nodes.items()}
+            article_stages = {
+                url: dict(stages) for url, stages in self.articles.items()
+            }
+
+        by_node = usage.get("by_node", {})
+        nodes = {
+            name: merged(
+                node_timings.get(name, {"runs": 0, "errors": 0, "seconds": 0.0}),
+                by_node.get(name),
+            )
+            for name in sorted(set(node_timings) | set(by_node))
+        }
+        by_article = usage.get("by_article", {})
+        articles = {
+            url: merged(
+                {
+                    "seconds": sum(article_stages.get(url, {}).values()),
+                    "stages": article_stages.get(url, {}),
+                },
+                by_article.get(url),
+            )
+            for url in sorted(set(article_stages) | set(by_article))
+        }
+        # Per-article stage times summed over articles (the only per-stage
+        # times when the graph fans out into one node per article)
+        stages = defaultdict(lambda: {"articles": 0, "seconds": 0.0})
+        for per_stage in article_stages.values():
+            for stage, seconds in per_stage.items():
+                stages[stage]["articles"] += 1
+                stages[stage]["seconds"] += seconds
+        return {
+            "seconds": time.perf_counter() - self.started,
+            "calls": usage.get("total_calls", 0),
+            "cost": usage.get("total_cost", 0.0),
+            "nodes": nodes,
+            "stages": dict(stages),
+            "articles": articles,
+        }
+
+
+def merge_reports(reports: List[dict], seconds: float) -> dict:
+    """
+    One report from the `RunMetrics.report()`s of parts of a run (e.g. the
+    tasks of a worker fleet batch), with `seconds` as the run's wall time.
+    """
+    nodes = defaultdict(lambda: defaultdict(int))
+    stages = defaultdict(lambda: defaultdict(int))
+    articles = defaultdict(lambda: {"stages": defaultdict(int)})
+    for report in reports:
+        for name, node in report.get("nodes", {}).items():
+            for field, value in node.items():
+                nodes[name][field] += value
+        for name, stage in report.get("stages", {}).items():
+            for field, value in stage.items():
+                stages[name][field] += value
+        for url, article in report.get("articles", {}).items():
+            merged = articles[url]
+            for field, value in article.items():
+                if field == "stages":
+                    for stage, stage_seconds in value.items():
+                        merged["stages"][stage] += stage_seconds
+                else:
+                    merged[field] = merged.get(field, 0) + value
+    return {
+        "seconds": seconds,
+        "calls": sum(report.get("calls", 0) for report in reports),
+        "cost": sum(report.get("cost", 0.0) for report in reports),
+        "nodes": {name: dict(node) for name, node in sorted(nodes.items())},
+        "stages": {name: dict(stage) for name, stage in stages.items()},
+        "articles": {
+            url: {**article, "stages": dict(article["stages"])}
+            for url, article in sorted(articles.items())
+        },
+    }
+
+
+def current_metrics() -> Optional[RunMetrics]:
+    """The running graph's `RunMetrics`, or None outside of a metered run."""
+    from langgraph.runtime import get_runtime
+
+    try:
+        return getattr(get_runtime().context, "metrics", None)
+    except RuntimeError:
+        return None
+
+
+# === Instrumentation ===
+@contextmanager
+def time_article_stage(url: str, stage: str) -> Iterator[None]:
+    """Time a per-article stage in the running graph's metrics, if any."""
+    metrics = current_metrics()
+    if metrics is None:
+        yield
+        return
+    with metrics.time_article_stage(url, stage):
+        yield
+
+
+def timed_node(name: str, node: Callable) -> Callable:
+    """
+    Wrap a graph node so each invocation is timed in the run's metrics and
+    traced as a span.
+    """
+
+    @functools.wraps(node)
+    def wrapper(state, *args, **kwargs):
+        with span(name, "node"):
+            metrics = current_metrics()
+            if metrics is None:
+                return node(state, *args, **kwargs)
+            with metrics.time_node(name):
+                return node(state, *args, **kwargs)
+
+    return wrapper
+
+
+def article_stage(stage: str, relevant_only: bool = False) -> Callable:
+    """
+    Decorate a per-article stage helper `(state, article, ...)` so its
+    wall time and model calls are attributed to that article, and traced
+    as a span. With `relevant_only`, calls for irrelevant articles (which
+    the helper skips) are not timed.
+    """
+
+    def decorate(helper: Callable) -> Callable:
+        @functools.wraps(helper)
+        def wrapper(state, article, *args, **kwargs):
+            if relevant_only and not article.is_relevant:
+                return helper(state, article, *args, **kwargs)
+            with article_scope(article.url), time_article_stage(
+                article.url, stage
+            ), span(stage, "article", url=article.url):
+                return helper(state, article, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# === Export ===
+PROMETHEUS_METRICS = (
+    # (name, type, help, scope, field)
+    ("spice_run_seconds", "gauge", "Wall time of the run.", "run", "seconds"),
+    ("spice_run_llm_calls", "gauge", "Model calls in the run.", "run", "calls"),
+    ("spice_run_cost_usd", "gauge", "Estimated model cost of the run.", "run", "cost"),
+    ("spice_node_runs", "gauge", "Invocations of the node.", "nodes", "runs"),
+    (
+        "spice_node_errors",
+        "gauge",
+        "Failed invocations of the node.",
+        "nodes",
+        "errors",
+    ),
+    ("spice_node_seconds", "gauge", "Wall time spent in the node.", "nodes", "seconds"),
+    (
+        "spice_node_llm_calls",
+        "gauge",
+        "Model calls made by the node.",
+        "nodes",
+        "calls",
+    ),
+    (
+        "spice_node_prompt_tokens",
+        "gauge",
+        "Prompt tokens sent by the node.",
+        "nodes",
+        "input_tokens",
+    ),
+    (
+        "spice_node_completion_tokens",
+        "gauge",
+        "Completion tokens received by the node.",
+        "nodes",
+        "output_tokens",
+    ),
+    (
+        "spice_node_cache_hits",
+        "gauge",
+        "Node model calls served partly from the prompt cache.",
+        "nodes",
+        "cache_hits",
+    ),
+    (
+        "spice_node_cost_usd",
+        "gauge",
+        "Estimated model cost of the node.",
+        "nodes",
+        "cost",
+    ),
+    (
+        "spice_stage_seconds",
+        "gauge",
+        "Wall time spent in a per-article stage, summed over articles.",
+        "stages",
+        "seconds",
+    ),
+    (
+        "spice_stage_articles",
+        "gauge",
+        "Articles that went through a per-article stage.",
+        "stages",
+        "articles",
+    ),
+    (
+        "spice_article_seconds",
+        "gauge",
+        "Wall time spent on the article.",
+        "articles",
+        "seconds",
+    ),
+    (
+        "spice_article_llm_calls",
+        "gauge",
+        "Model calls made for the article.",
+        "articles",
+        "calls",
+    ),
+    (
+        "spice_article_prompt_tokens",
+        "gauge",
+        "Prompt tokens sent for the article.",
+        "articles",
+        "input_tokens",
+    ),
+    (
+        "spice_article_completion_tokens",
+        "gauge",
+        "Completion tokens received for the article.",
+        "articles",
+        "output_tokens",
+    ),
+    (
+        "spice_article_cache_hits",
+        "gauge",
+        "Article model calls served partly from the prompt cache.",
+        "articles",
+        "cache_hits",
+    ),
+    (
+        "spice_article_cost_usd",
+        "gauge",
+        "Estimated model cost of the article.",
+        "articles",
+        "cost",
+    ),
+)
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def to_prometheus(runs: List[dict]) -> str:
+    """
+    Prometheus text exposition of run metrics. Each item of `runs` is
+    `{"labels": {...}, "metrics": report}`; labels (e.g. run id, agency)
+    are added to every sample of that run.
+    """
+    lines = []
+    for name, kind, help, scope, field in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for run in runs:
+            labels, metrics = run["labels"], run["metrics"]
+            if scope == "run":
+                lines.append(f"{name}{_labels(labels)} {metrics.get(field, 0)}")
+                continue
+            key = {"nodes": "node", "stages": "stage", "articles": "article"}[scope]
+            for item, values in metrics.get(scope, {}).items():
+                lines.append(
+                    f"{name}{_labels({**labels, key: item})} {values.get(field, 0)}"
+                )
+    return "\n".join(lines) + "\n"
+
+
+def to_json(runs: List[dict]) -> str:
+    return json.dumps(runs, indent=2, ensure_ascii=False)
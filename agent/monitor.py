@@ -0,0 +1,300 @@
+"""
+Long-running change monitor: polls each agency's listing page on its own
+interval and starts an analysis job only when new links appear.
+
+    python -m agent.monitor --all --interval 600 --every NEA=120
+
+Only the listing page is fetched on a poll. Its link set is canonicalized
+and hashed; an unchanged hash skips the poll outright, and a changed one
+triggers the graph only if it contains URLs never scraped before.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from agent.cli import (
+    add_run_arguments,
+    build_request,
+    prepare_run,
+    selected_agencies,
+    setup_logging,
+)
+from agent.runner import AnalysisRequest, JobRunner
+from agent.scraping.webscrape import fetch_all
+from agent.storage.articles import canonical_url, get_article_store
+from agent.storage.monitor import COUNTER_FIELDS, MonitorStore, get_monitor_store
+
+# Set up logger for this module
+logger = logging.getLogger("spice.monitor")
+
+# Seconds between polls of an agency unless set per agency
+MONITOR_INTERVAL = float(os.getenv("SPICE_MONITOR_INTERVAL", "600"))
+
+
+def link_set_hash(urls: List[str]) -> str:
+    """Order-independent hash of a set of canonical URLs."""
+    return hashlib.sha256("\n".join(sorted(set(urls))).encode("utf-8")).hexdigest()
+
+
+def fetch_listing(request: AnalysisRequest) -> List[Dict[str, str]]:
+    """Links on the listing page, as the web scrape node extracts them."""
+    return asyncio.run(
+        fetch_all(
+            request.listing_url, request.max_results, request.headless, request.browser
+        )
+    )
+
+
+class ListingMonitor:
+    """
+    Polls agencies on independent schedules and submits analysis jobs to
+    a `JobRunner`. An agency with a job still running is not polled; the
+    hash of a triggering link set is only remembered once its job succeeds,
+    so a failed run is retried on the next poll.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        requests: Dict[str, AnalysisRequest],
+        intervals: Dict[str, float],
+        store: Optional[MonitorStore] = None,
+        fetch: Callable[[AnalysisRequest], List[Dict[str, str]]] = fetch_listing,
+    ):
+        self.runner = runner
+        self.requests = requests
+        self.intervals = intervals
+        self.store = store or get_monitor_store()
+        self.fetch = fetch
+        self.watches: Dict[str, dict] = {}
+        # agency -> (job id, hash of the link set that triggered it)
+        self.pending: Dict[str, tuple] = {}
+
+        for agency, request in requests.items():
+            watch = self.store.get(agency) or {
+                "agency": agency,
+                "link_hash": None,
+                **{name: 0 for name in COUNTER_FIELDS},
+            }
+            if watch.get("listing_url") not in (None, request.listing_url):
+                # Listing page moved: its old hash means nothing
+                watch["link_hash"] = None
+            watch["listing_url"] = request.listing_url
+            watch["interval"] = intervals[agency]
+            self.watches[agency] = watch
+            self.store.save(watch)
+
+    # === Polling ===
+    def poll(self, agency: str) -> str:
+        """
+        Poll one agency. Returns what happened: "busy" (its job is still
+        running), "error", "unchanged", "no_new" or "triggered".
+        """
+        watch = self.watches[agency]
+        request = self.requests[agency]
+        if not self._settle(agency):
+            return "busy"
+
+        now = datetime.now().isoformat()
+        watch["polls"] += 1
+        watch["last_polled"] = now
+        try:
+            links = self.fetch(request)
+        except Exception as e:
+            links, watch["last_error"] = [], str(e)
+        if not links:
+            # fetch_all logs and swallows errors, returning no links
+            watch["errors"] += 1
+            watch["last_error"] = watch.get("last_error") or "no links found"
+            logger.warning(f"{agency}: listing poll failed ({watch['last_error']})")
+            return self._save(watch, "error")
+        watch["last_error"] = None
+
+        urls = [canonical_url(link["url"]) for link in links]
+        digest = link_set_hash(urls)
+        if digest == watch["link_hash"]:
+            watch["unchanged"] += 1
+            logger.debug(f"{agency}: link set unchanged")
+            return self._save(watch, "unchanged")
+
+        watch["last_changed"] = now
+        known = get_article_store().known_canonical_urls(request.listing_url, urls)
+        new = sorted(set(urls) - known)
+        if not new:
+            watch["link_hash"] = digest
+            watch["no_new"] += 1
+            logger.info(f"{agency}: link set changed, but no new URLs")
+            return self._save(watch, "no_new")
+
+        job_id = self.runner.submit(replace(request, thread_id=None))
+        self.pending[agency] = (job_id, digest)
+        watch["triggers"] += 1
+        watch["last_triggered"] = now
+        watch["last_job"] = job_id
+        logger.info(f"{agency}: {len(new)} new URL(s), started job {job_id}")
+        return self._save(watch, "triggered")
+
+    def _settle(self, agency: str) -> bool:
+        """Account for the agency's finished job; False while it is running."""
+        if agency not in self.pending:
+            return True
+        job_id, digest = self.pending[agency]
+        if not self.runner.done(job_id):
+            return False
+        del self.pending[agency]
+        if self.runner.status(job_id) == "succeeded":
+            self.watches[agency]["link_hash"] = digest
+            self.store.save(self.watches[agency])
+        else:
+            logger.warning(f"{agency}: job {job_id} failed, retrying on next poll")
+        return True
+
+    def _save(self, watch: dict, outcome: str) -> str:
+        self.store.save(watch)
+        return outcome
+
+    # === Scheduling ===
+    def run(self, stop: threading.Event, once: bool = False) -> None:
+        """
+        Poll every agency on its interval until `stop` is set (or, with
+        `once`, poll each agency once). First polls are staggered over a
+        few seconds so agencies do not all launch a browser at once.
+        """
+        now = time.monotonic()
+        due = [
+            (now + random.uniform(0, min(5.0, interval)), agency)
+            for agency, interval in self.intervals.items()
+        ]
+        heapq.heapify(due)
+        while due and not stop.is_set():
+            at, agency = heapq.heappop(due)
+            if stop.wait(max(0.0, at - time.monotonic())):
+                break
+            try:
+                outcome = self.poll(agency)
+            except Exception as e:
+                logger.error(f"{agency}: poll failed: {e}", exc_info=True)
+                outcome = "error"
+            if outcome == "busy":
+                # Check back shortly rather than a full interval later
+                heapq.heappush(due, (time.monotonic() + 5.0, agency))
+            elif not once:
+                heapq.heappush(due, (time.monotonic() + self.intervals[agency], agency))
+
+    def stats(self) -> List[dict]:
+        return [w for w in self.store.list_watches() if w["agency"] in self.watches]
+
+
+# === Command line ===
+def parse_intervals(
+    agencies: List[str], default: float, overrides: List[str]
+) -> Dict[str, float]:
+    intervals = {agency: default for agency in agencies}
+    for override in overrides:
+        agency, _, seconds = override.partition("=")
+        if agency not in intervals:
+            raise ValueError(f"--every names unknown agency {agency!r}")
+        intervals[agency] = float(seconds)
+    return intervals
+
+
+def print_stats(stats: List[dict]) -> None:
+    print(
+        f"\n{'Agency':<12} {'Every':>7} {'Polls':>6} {'Unchanged':>9} "
+        f"{'No new':>7} {'Triggers':>8} {'Errors':>6} {'Skip %':>7}"
+    )
+    for w in stats:
+        skip = f"{w['skip_ratio']:.0%}" if w["skip_ratio"] is not None else "-"
+        print(
+            f"{w['agency']:<12} {w['interval']:>6.0f}s {w['polls']:>6} "
+            f"{w['unchanged']:>9} {w['no_new']:>7} {w['triggers']:>8} "
+            f"{w['errors']:>6} {skip:>7}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.monitor",
+        description="Watch agency listing pages and analyze new articles.",
+    )
+    add_run_arguments(parser)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=MONITOR_INTERVAL,
+        help=f"Seconds between polls of each agency (default: {MONITOR_INTERVAL:.0f})",
+    )
+    parser.add_argument(
+        "--every",
+        action="append",
+        default=[],
+        metavar="AGENCY=SECONDS",
+        help="Poll interval of one agency (repeatable)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Analyses run at the same time (default: 2)",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Poll each agency once, then exit"
+    )
+    args = parser.parse_args(argv)
+    agencies = selected_agencies(parser, args)
+    try:
+        intervals = parse_intervals(list(agencies), args.interval, args.every)
+    except ValueError as e:
+        parser.error(str(e))
+    setup_logging(args.verbose)
+
+    from agent.llm.governor import RateGovernor
+
+    if not prepare_run(args.browser):
+        return 1
+    # Results go to the history; none are viewed here
+    runner = JobRunner(
+        RateGovernor.from_env(), max_workers=args.workers, keep_results=0
+    )
+    monitor = ListingMonitor(
+        runner,
+        {name: build_request(args, name, url) for name, url in agencies.items()},
+        intervals,
+    )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    logger.info(
+        "Monitoring "
+        + ", ".join(f"{name} every {intervals[name]:.0f}s" for name in agencies)
+    )
+    try:
+        monitor.run(stop, once=args.once)
+    except KeyboardInterrupt:
+        stop.set()
+    logger.info("Waiting for running analyses to finish...")
+    runner.executor.shutdown(wait=True)
+    for agency in list(monitor.pending):
+        monitor._settle(agency)
+
+    print_stats(monitor.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,20 @@
 from langchain_core.messages import HumanMessage
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import budgeted
+from agent.llm.routing import model_for
+from agent.logs import log_context
+from agent.metrics import article_stage
+from agent.state import load_articles, save_articles
 from agent.templates import GraphState, NewsArticle, OpenAI
 
 
-def email_outreach(model: OpenAI, spice_context: str, article: NewsArticle) -> str:
+def email_outreach(
+    model: OpenAI,
+    spice_context: str,
+    article: NewsArticle,
+    text_source: str = "summary",
+) -> str:
     """
     This node drafts cold outreach emails to each identified business entity.
     Updates `email_drafts` as a dict mapping entity name -> email text.
@@ -40,7 +52,7 @@ Use a clear, confident, and helpful tone. Avoid sounding like a mass email.
 {spice_context}
 
 ### Article Content:
-{article.body}
+{article.analysis_text(text_source)}
 
 ### Collaboration Opportunity:
 {opportunity}
@@ -69,19 +81,38 @@ Best regards,
 SPICE (SIT-Polytechnic Innovation Centre of Excellence)  
 [Contact Details]
 """
+        emit("email_started", url=article.url, entity=name)
         response = model.invoke([HumanMessage(content=prompt)])
         emails[name] = response.content
+        emit("email_draft", url=article.url, entity=name, draft=response.content)
     return emails
 
 
+@budgeted("email_outreach", relevant_only=True)
+@article_stage("email_outreach", relevant_only=True)
+def draft_emails(state: GraphState, article: NewsArticle) -> None:
+    """
+    Drafts outreach emails for one relevant article's business entities.
+    """
+    if not article.is_relevant or restore_article_stage("email_outreach", article):
+        return
+    article.email_drafts = email_outreach(
+        model_for(state, "email"),
+        state["spice_context"],
+        article,
+        state.get("analysis_text", "summary"),
+    )
+    save_article_stage("email_outreach", article)
+
+
 def email_outreach_node(state: GraphState) -> GraphState:
     """
     Handles the email outreach node.
     Drafts outreach emails for each identified business entity and updates the state.
     """
-    for article in state.get("articles", []):
-        if article.relevance.is_relevant:
-            article.email_drafts = email_outreach(
-                state["model"], state["spice_context"], article
-            )
+    articles = load_articles(state)
+    for i, article in enumerate(articles):
+        with log_context(article_index=i):
+            draft_emails(state, article)
+    state["articles"] = save_articles(state, articles)
     return state
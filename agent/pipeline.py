@@ -0,0 +1,208 @@
+"""
+Per-article analysis, and the streaming mode that runs it while the
+listing is still being scraped. Link filter batches, body extraction and
+analysis are stages joined by bounded queues: pages are read while earlier
+articles are with the model, and when the model falls behind the full
+queues hold back extraction and filtering instead of piling up articles.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List
+
+from agent.llm.proxy import stage_scope
+from agent.llm.routing import (
+    escalation_model_for,
+    escalation_threshold,
+    model_for,
+    run_resource,
+)
+from agent.logs import log_context
+from agent.identification.bei import identify_entities
+from agent.identification.opportunity import identify_opportunity
+from agent.outreach.email import draft_emails
+from agent.scoring.relevance import score_article
+from agent.scraping import webscrape
+from agent.state import save_articles
+from agent.storage.articles import SPICE_DB, get_article_store
+from agent.summary.summary import summarize_article
+from agent.templates import GraphState, NewsArticle
+from agent.tracing import span, track
+
+# Set up logger for this module
+logger = logging.getLogger("spice.pipeline")
+
+# Browser pages reading article bodies at once
+STREAM_PAGES = int(os.getenv("SPICE_STREAM_PAGES", "2"))
+
+# Articles analyzed at once
+STREAM_ANALYZERS = int(os.getenv("SPICE_STREAM_ANALYZERS", "4"))
+
+# Extracted articles that may wait for analysis before extraction pauses
+STREAM_BUFFER = int(os.getenv("SPICE_STREAM_BUFFER", "2"))
+
+
+def analyze_article(task: dict, article: NewsArticle, index: int, label: str) -> None:
+    """
+    Run one article through relevance → summary → bei → opportunity →
+    email, in place. Model calls are attributed to the same stage names as
+    in the staged graph.
+    """
+    with log_context(article_index=index), span(
+        "article", "article", index=index, url=article.url
+    ):
+        with stage_scope("relevance_score"):
+            score_article(task, article, label)
+        if article.is_relevant:
+            with stage_scope("summary"):
+                summarize_article(task, article, label)
+            with stage_scope("bei"):
+                identify_entities(task, article, label)
+            with stage_scope("opportunity_identification"):
+                identify_opportunity(task, article)
+            with stage_scope("email_outreach"):
+                draft_emails(task, article)
+
+
+# === Streaming ===
+async def _read_article(instance, url: str) -> str:
+    """Body of `url` on a fresh context of the shared browser; empty on errors."""
+    context = await instance.new_context(user_agent=webscrape.USER_AGENT)
+    try:
+        return await webscrape.read_article(await context.new_page(), url)
+    except Exception as e:
+        logger.error(f"❌ Failed to extract from {url}: {str(e)}", exc_info=True)
+        return ""
+    finally:
+        await context.close()
+
+
+async def stream_articles(
+    state: GraphState,
+    links: List[Dict[str, str]],
+    pages: int = STREAM_PAGES,
+    analyzers: int = STREAM_ANALYZERS,
+    buffer: int = STREAM_BUFFER,
+) -> List[NewsArticle]:
+    """
+    Filter `links` (new links of the listing), extract and analyze the
+    approved ones, overlapping the three. Returns the articles in link
+    order. Model calls run in worker threads, since the model clients are
+    synchronous; everything runs in the caller's context.
+    """
+    model = model_for(state, "link_filter")
+    escalation_model = escalation_model_for(state, "link_filter")
+    threshold = escalation_threshold(state)
+    usage = run_resource(state, "usage")
+    budget = run_resource(state, "budget")
+
+    # Sized so a slow stage fills its input queue and the one feeding it waits
+    approved: asyncio.Queue = asyncio.Queue(maxsize=pages)
+    extracted: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    results: Dict[int, NewsArticle] = {}
+
+    async def filter_links() -> None:
+        index = 0
+        for i, batch in enumerate(webscrape.chunked(links, 10)):
+            kept = await asyncio.to_thread(
+                webscrape.filter_links_batch,
+                model,
+                batch,
+                i + 1,
+                escalation_model,
+                threshold,
+                usage,
+                budget,
+            )
+            for link in kept:
+                await approved.put((index, link))
+                index += 1
+        logger.info(f"✓ LLM filtering complete - {index} articles approved")
+        for _ in range(pages):
+            await approved.put(None)
+
+    async def extract(instance, page: int) -> None:
+        # The pages share the event loop's thread; give each its own track
+        with track(f"extract page {page + 1}"):
+            while (item := await approved.get()) is not None:
+                index, link = item
+                article = await webscrape.scrape_article(
+                    link,
+                    index,
+                    f"[{index + 1}]",
+                    lambda url: _read_article(instance, url),
+                )
+                await extracted.put((index, article))
+
+    async def extract_all(instance) -> None:
+        await asyncio.gather(*(extract(instance, page) for page in range(pages)))
+        for _ in range(analyzers):
+            await extracted.put(None)
+
+    async def analyze() -> None:
+        while (item := await extracted.get()) is not None:
+            index, article = item
+            await asyncio.to_thread(
+                analyze_article, state, article, index, f"[{index + 1}]"
+            )
+            results[index] = article
+
+    async with webscrape.async_playwright() as p:
+        with span("browser launch", "browser", browser=state.get("browser")):
+            instance = await getattr(p, state.get("browser", "firefox")).launch(
+                headless=state.get("headless", True)
+            )
+        tasks = [
+            asyncio.create_task(filter_links()),
+            asyncio.create_task(extract_all(instance)),
+            *(asyncio.create_task(analyze()) for _ in range(analyzers)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failed stage stops the others (whose queues would never drain)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            with span("browser close", "browser"):
+                await instance.close()
+
+    return [results[index] for index in sorted(results)]
+
+
+def stream_pipeline_node(state: GraphState) -> GraphState:
+    """
+    Scrape the selected listing and analyze its new articles as they are
+    extracted (the graph's streaming mode, in place of web_scrape and the
+    per-article pipeline).
+    """
+    listing_url = state["websites"][state["website_selected"]]
+    max_results = state.get("max_results", 10)
+    headless = state.get("headless", True)
+    browser = state.get("browser", "firefox")
+    budget = run_resource(state, "budget")
+    store = get_article_store(state.get("article_db") or SPICE_DB)
+
+    logger.info(f"Streaming scrape of {listing_url} into analysis")
+    all_articles = asyncio.run(
+        webscrape.fetch_all(
+            listing_url, max_results, headless, browser, raise_errors=True
+        )
+    )
+    new_articles = store.new_links(listing_url, all_articles)
+    logger.info(
+        f"✓ Found {len(new_articles)} NEW articles "
+        f"({len(all_articles) - len(new_articles)} previously scraped)"
+    )
+
+    articles: List[NewsArticle] = []
+    if new_articles:
+        articles = asyncio.run(stream_articles(state, new_articles))
+        logger.info(f"✓ Extracted and analyzed {len(articles)} articles")
+    else:
+        logger.warning("No new data to process")
+    state["articles"] = save_articles(state, articles)
+
+    webscrape.record_scraped_links(store, listing_url, all_articles, budget)
+    return state
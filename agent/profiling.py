@@ -0,0 +1,42 @@
+"""Lightweight wall-clock profile of application startup phases."""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# Set up logger for this module
+logger = logging.getLogger("spice.profiling")
+
+
+class StartupProfile:
+    """
+    Records how long each named startup phase took, and when it finished
+    relative to process start, so slow imports or provisioning steps show
+    up in the logs and in the UI.
+    """
+
+    def __init__(self, started: float = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: List[Dict[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - begin)
+
+    def record(self, name: str, seconds: float) -> None:
+        at = time.perf_counter() - self.started
+        self.phases.append({"phase": name, "seconds": seconds, "at": at})
+        logger.info(f"Startup: {name} took {seconds:.3f}s (t+{at:.3f}s)")
+
+    def mark(self, name: str) -> None:
+        """Record a milestone (time since start) the first time it is reached."""
+        if not any(p["phase"] == name for p in self.phases):
+            self.record(name, time.perf_counter() - self.started)
+
+    def report(self) -> List[Dict[str, float]]:
+        return [dict(p) for p in self.phases]
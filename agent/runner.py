@@ -0,0 +1,474 @@
+"""Runs analyses outside the UI thread, on a local pool of worker threads."""
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from agent.agent import build_graph
+from agent.checkpoint import get_checkpointer, get_progress_log
+from agent.context.spice import SPICE_CONTEXT
+from agent.llm.backends import create_chat_model
+from agent.llm.budget import RunBudget
+from agent.llm.governor import RateGovernor
+from agent.llm.routing import DEFAULT_ESCALATION_THRESHOLD
+from agent.llm.usage import UsageLedger
+from agent.logs import log_context
+from agent.metrics import RunMetrics
+from agent.scraping.browsers import ensure_browser
+from agent.state import load_articles
+from agent.storage.articles import get_article_store
+from agent.storage.history import get_history_store
+from agent.storage.jobs import JobStore, get_job_store
+from agent.storage.workspace import get_workspace
+from agent.templates import RunContext
+from agent.tracing import TRACE_DIR, Tracer, span, tracing
+
+# Set up logger for this module
+logger = logging.getLogger("spice.runner")
+
+# Articles processed at once when the graph fans out per article
+ARTICLE_CONCURRENCY = int(os.getenv("SPICE_ARTICLE_CONCURRENCY", "4"))
+
+# Nodes whose free-text model output is relayed token by token
+STREAMED_TEXT_NODES = {"summary", "email_outreach"}
+
+# Analyses (e.g. agencies) run at the same time by the job runner
+JOB_WORKERS = int(os.getenv("SPICE_JOB_WORKERS", "2"))
+
+# Final graph states of finished jobs kept in memory for viewing, most
+# recently finished or viewed first
+JOB_RESULTS = int(os.getenv("SPICE_JOB_RESULTS", "8"))
+
+
+@dataclass
+class AnalysisRequest:
+    """Everything needed to (re)run one agency analysis; stored with its job."""
+
+    agency: str
+    listing_url: str
+    browser: str = "firefox"
+    headless: bool = True
+    fan_out: bool = False
+    # Analyze articles while the listing is still being scraped
+    stream: bool = False
+    # Keep article references in graph state, articles in the workspace store
+    slim_state: bool = False
+    max_results: int = 10
+    default_model: str = "gpt-4o-mini"
+    cheap_model: str = "gpt-4.1-nano"
+    escalation_model: str = "gpt-4o-mini"
+    escalation_threshold: float = DEFAULT_ESCALATION_THRESHOLD
+    analysis_text: str = "summary"
+    # Run budget overrides of SPICE_RUN_MAX_CALLS / _TOKENS / _COST
+    max_calls: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    # Checkpoint thread of the run; reused when the run is resumed
+    thread_id: Optional[str] = None
+
+
+def build_models(request: AnalysisRequest, governor: RateGovernor, usage: UsageLedger):
+    """Default model and per-stage models, metered and rate-governed."""
+
+    # Retries are handled by the rate governor, not the OpenAI client
+    def build_model(name, temperature=0.7):
+        return usage.meter(
+            governor.wrap(create_chat_model(name, temperature, max_retries=0)),
+            name,
+        )
+
+    model = build_model(request.default_model)
+    stage_models = {
+        "link_filter": build_model(request.cheap_model, 0),
+        "relevance": build_model(request.cheap_model, 0),
+    }
+    if request.escalation_model != request.cheap_model:
+        strong = build_model(request.escalation_model, 0)
+        stage_models["link_filter_escalation"] = strong
+        stage_models["relevance_escalation"] = strong
+    return model, stage_models
+
+
+def history_entry(
+    result: dict, request: AnalysisRequest, usage: UsageLedger, metrics: dict
+) -> dict:
+    """Analysis history record of a finished run."""
+    articles = result.get("articles", [])
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "agency": request.agency,
+        "browser": request.browser,
+        "headless": request.headless,
+        "articles_count": len(articles),
+        "relevant_count": sum(1 for a in articles if a.is_relevant),
+        "usage": usage.report(),
+        "metrics": metrics,
+        "articles": [
+            {
+                "title": a.title,
+                "url": a.url,
+                "host": a.host,
+                "body": a.body,
+                "summary": a.summary,
+                "relevance": (
+                    {
+                        "is_relevant": a.relevance.is_relevant,
+                        "reason": a.relevance.reason,
+                        "confidence": a.relevance.confidence,
+                    }
+                    if a.relevance
+                    else None
+                ),
+                "business_entities": [
+                    {"name": e.name, "type": e.type, "role": e.role}
+                    for e in (a.business_entities or [])
+                ],
+                "opportunity": (
+                    {
+                        "opportunity": a.opportunity.opportunity,
+                        "justification": a.opportunity.justification,
+                    }
+                    if a.opportunity
+                    else None
+                ),
+                "email_drafts": a.email_drafts or {},
+            }
+            for a in articles
+        ],
+    }
+
+
+def run_analysis(
+    request: AnalysisRequest,
+    governor: RateGovernor,
+    usage: Optional[UsageLedger] = None,
+    on_event: Optional[Callable[[str, dict], None]] = None,
+    resume: bool = False,
+    trace_dir: Optional[str] = None,
+    stream_tokens: bool = False,
+) -> dict:
+    """
+    Run the graph for `request` with checkpointing, passing every streamed
+    ("tasks", "custom") event to `on_event`, and append the result to the
+    analysis history. With `resume`, continue the checkpointed run of
+    `request.thread_id` instead of starting over. With `stream_tokens`,
+    model output tokens ("messages" events) are passed on too.
+
+    Model usage is held to the request's run budget and the daily budget;
+    stages skipped for budget are listed in the usage report.
+
+    With `trace_dir` (default SPICE_TRACE_DIR), the run's spans (nodes,
+    articles, browser actions, model calls) are written there as a
+    Chrome trace file.
+
+    With `request.slim_state`, the graph state (and so the checkpoints
+    and the returned state) only holds `ArticleRef`s; the articles are
+    kept in the workspace store until the run is added to the history.
+
+    The run's checkpoints are deleted once it completes; those of a run
+    that failed are kept so it can be resumed.
+
+    Returns the final graph state, the history run id (None when no
+    articles were found), the run's metrics report and the trace path.
+    """
+    usage = usage or UsageLedger()
+    usage.budget = RunBudget.from_env(
+        calls=request.max_calls, tokens=request.max_tokens, cost=request.max_cost
+    )
+    metrics = RunMetrics()
+    thread_id = request.thread_id or str(uuid.uuid4())
+    model, stage_models = build_models(request, governor, usage)
+    graph = build_graph(fan_out=request.fan_out, stream=request.stream).compile(
+        checkpointer=get_checkpointer()
+    )
+    config = {
+        "max_concurrency": ARTICLE_CONCURRENCY,
+        "configurable": {"thread_id": thread_id},
+    }
+    # Model clients and the ledger are not checkpointable, so they travel
+    # in the runtime context instead of the graph state
+    context = RunContext(
+        model=model,
+        stage_models=stage_models,
+        usage=usage,
+        progress=get_progress_log(),
+        metrics=metrics,
+        budget=usage.budget,
+    )
+    inputs = {
+        "escalation_threshold": request.escalation_threshold,
+        "analysis_text": request.analysis_text,
+        "spice_context": SPICE_CONTEXT,
+        "websites": {request.agency: request.listing_url},
+        "website_selected": request.agency,
+        "max_results": request.max_results,
+        "article_db": get_article_store().path,
+        "slim_state": request.slim_state,
+        "headless": request.headless,
+        "browser": request.browser,
+    }
+    if resume:
+        # None resumes from the last checkpoint of the thread
+        inputs = None
+
+    logger.info(
+        f"{'Resuming' if resume else 'Starting'} analysis of {request.agency} "
+        f"(thread {thread_id})"
+    )
+    trace_dir = trace_dir or TRACE_DIR
+    tracer = Tracer(f"spice {request.agency}") if trace_dir else None
+    result = None
+    with tracing(tracer), log_context(run_id=thread_id, agency=request.agency):
+        with span("run", "run", agency=request.agency, resume=resume):
+            for mode, chunk in graph.stream(
+                inputs,
+                config,
+                context=context,
+                stream_mode=["tasks", "custom", "values"]
+                + (["messages"] if stream_tokens and on_event else []),
+            ):
+                if mode == "values":
+                    result = chunk
+                elif on_event is not None:
+                    on_event(mode, chunk)
+    get_progress_log().clear(thread_id)
+
+    trace_path = None
+    if tracer is not None:
+        name = re.sub(r"[^\w.-]+", "_", request.agency)
+        trace_path = tracer.export(
+            os.path.join(trace_dir, f"trace_{name}_{thread_id}.json")
+        )
+        logger.info(f"Wrote trace of {len(tracer.events)} spans to {trace_path}")
+    report = metrics.report(usage.report())
+
+    articles = load_articles(result, thread_id)
+    run_id = None
+    if articles:
+        relevant_count = sum(1 for a in articles if a.is_relevant)
+        logger.info(f"Found {len(articles)} articles, {relevant_count} relevant")
+        run_id = get_history_store().add_run(
+            history_entry({**result, "articles": articles}, request, usage, report)
+        )
+        logger.info(f"Analysis added to history as run {run_id}")
+    else:
+        logger.warning("No articles found in result")
+    if request.slim_state:
+        get_workspace(result["article_db"]).clear(thread_id)
+    # Checkpoints are only kept for resuming failed runs
+    get_checkpointer().delete_thread(thread_id)
+
+    logger.info(
+        f"Run took {report['seconds']:.1f}s, cost ${report['cost']:.4f} over "
+        f"{report['calls']} calls, escalations: {usage.report()['escalations']}"
+    )
+    skipped = usage.budget.report()["skipped"]
+    if skipped:
+        logger.warning(
+            "Skipped for budget: "
+            + ", ".join(f"{stage} ×{len(urls)}" for stage, urls in skipped.items())
+        )
+    return {
+        "state": result,
+        "run_id": run_id,
+        "metrics": report,
+        "trace": trace_path,
+    }
+
+
+class JobProgress:
+    """
+    Folds a run's stream events into per-node status and a compact live
+    view of each article, written to the job store at most every
+    `interval` seconds (and whenever a node starts or finishes).
+    """
+
+    def __init__(self, store: JobStore, job_id: str, interval: float = 1.0):
+        self.store = store
+        self.job_id = job_id
+        self.interval = interval
+        self.nodes: Dict[str, dict] = {}
+        self.articles: Dict[str, dict] = {}
+        self._flushed = 0.0
+        # Article whose summary or email draft is being written, if any
+        self._writing: Optional[str] = None
+
+    def on_event(self, mode: str, chunk: dict) -> None:
+        if mode == "tasks":
+            self._on_task(chunk)
+            self.flush(force=True)
+        elif mode == "custom":
+            self._on_article_event(chunk)
+            self.flush()
+        elif mode == "messages":
+            self._on_token(*chunk)
+            self.flush()
+
+    def _on_token(self, message, metadata: dict) -> None:
+        """
+        Append a token to the live text of the article being written. Only
+        for stage-by-stage runs: per-article pipelines interleave tokens
+        from several articles.
+        """
+        if (
+            self._writing is None
+            or metadata.get("langgraph_node") not in STREAMED_TEXT_NODES
+            or not isinstance(message.content, str)
+        ):
+            return
+        entry = self.articles[self._writing]
+        entry["live"] = entry.get("live", "") + message.content
+
+    def _on_task(self, task: dict) -> None:
+        node = self.nodes.setdefault(
+            task["name"], {"status": "running", "running": 0, "done": 0}
+        )
+        if "input" in task:
+            node["running"] += 1
+            node["status"] = "running"
+            return
+        node["running"] -= 1
+        node["done"] += 1
+        if task.get("error"):
+            node["status"] = "failed"
+        elif node["running"] == 0:
+            node["status"] = "done"
+
+    def _on_article_event(self, event: dict) -> None:
+        name = event.get("event")
+        entry = self.articles.setdefault(
+            event["url"], {"title": None, "stage": None, "emails": []}
+        )
+        entry["stage"] = name
+        if name in ("summary_started", "email_started"):
+            self._writing, entry["live"] = event["url"], ""
+        elif name in ("summary", "email_draft"):
+            self._writing = None
+            entry.pop("live", None)
+        if name in ("email_started", "email_draft"):
+            if name == "email_draft":
+                entry["emails"].append(event["entity"])
+            return
+
+        article = event["article"]
+        entry["title"] = article.title
+        if name == "relevance" and article.relevance:
+            entry["relevant"] = article.relevance.is_relevant
+            entry["reason"] = article.relevance.reason
+        elif name == "summary":
+            entry["summary"] = article.summary
+        elif name == "entities":
+            entry["entities"] = [e.name for e in article.business_entities]
+        elif name == "opportunity" and article.opportunity:
+            entry["opportunity"] = article.opportunity.opportunity
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or now - self._flushed >= self.interval:
+            self.store.progress(self.job_id, self.nodes, self.articles)
+            self._flushed = now
+
+
+class JobRunner:
+    """
+    Local worker pool for analyses. Jobs are recorded in a `JobStore`
+    (status, per-node progress, live article view) so the UI only submits
+    and polls. The final graph states of the last `keep_results` jobs are
+    also kept in memory for this process (the rest are in the history).
+    """
+
+    def __init__(
+        self,
+        governor: RateGovernor,
+        store: Optional[JobStore] = None,
+        max_workers: int = JOB_WORKERS,
+        keep_results: int = JOB_RESULTS,
+    ):
+        self.governor = governor
+        self.store = store or get_job_store()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="spice-job"
+        )
+        self.keep_results = keep_results
+        self._results: "OrderedDict[str, dict]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, request: AnalysisRequest, resume: bool = False) -> str:
+        job_id = str(uuid.uuid4())
+        if request.thread_id is None:
+            request.thread_id = job_id
+        self.store.create(job_id, request.agency, asdict(request))
+        self._futures[job_id] = self.executor.submit(
+            self._work, job_id, request, resume
+        )
+        logger.info(f"Submitted job {job_id} for {request.agency}")
+        return job_id
+
+    def resume(self, job_id: str) -> str:
+        """Submit a new job continuing the checkpointed run of a failed one."""
+        request = AnalysisRequest(**self.store.get(job_id)["request"])
+        self.store.mark_resumed(job_id)
+        return self.submit(request, resume=True)
+
+    def done(self, job_id: str) -> bool:
+        """True once a job submitted by this process has finished (either way)."""
+        future = self._futures.get(job_id)
+        if future is None or future.done():
+            self._futures.pop(job_id, None)
+            return True
+        return False
+
+    def status(self, job_id: str) -> Optional[str]:
+        """Stored status of a job ("queued", "running", "succeeded", ...)."""
+        job = self.store.get(job_id)
+        return job["status"] if job else None
+
+    def result(self, job_id: str) -> Optional[dict]:
+        """
+        Final graph state of a job finished by this process, while it is
+        among the last `keep_results` finished or viewed.
+        """
+        with self._lock:
+            if job_id not in self._results:
+                return None
+            self._results.move_to_end(job_id)
+            return self._results[job_id]
+
+    def _work(self, job_id: str, request: AnalysisRequest, resume: bool) -> None:
+        self.store.start(job_id)
+        progress = JobProgress(self.store, job_id)
+        usage = UsageLedger()
+        try:
+            ensure_browser(request.browser)
+            outcome = run_analysis(
+                request,
+                self.governor,
+                usage=usage,
+                on_event=progress.on_event,
+                resume=resume,
+                stream_tokens=True,
+            )
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            progress.flush(force=True)
+            self.store.finish(job_id, "failed", error=str(e), usage=usage.report())
+            return
+
+        with self._lock:
+            self._results[job_id] = outcome["state"]
+            while len(self._results) > self.keep_results:
+                self._results.popitem(last=False)
+        progress.flush(force=True)
+        self.store.finish(
+            job_id, "succeeded", run_id=outcome["run_id"], usage=usage.report()
+        )
+        logger.info(f"Job {job_id} finished")
@@ -1,5 +1,12 @@
 import logging
 from langchain_core.messages import HumanMessage
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import BudgetExceeded, budgeted
+from agent.llm.routing import cascade, escalation_threshold
+from agent.logs import log_context
+from agent.metrics import article_stage
+from agent.state import load_articles, save_articles
 from agent.templates import RelevanceScore
 from agent.templates import GraphState, NewsArticle, OpenAI
 
@@ -7,12 +14,21 @@ from agent.templates import GraphState, NewsArticle, OpenAI
 logger = logging.getLogger("spice.relevance")
 
 
+# Relevance is judged on the opening of the raw body; press releases put
+# the funding/partnership news up front.
+RELEVANCE_LEAD_CHARS = 4000
+
+
 def relevance_scoring(
-    model: OpenAI, spice_context: str, article: NewsArticle
+    model: OpenAI,
+    spice_context: str,
+    article: NewsArticle,
+    lead_chars: int = RELEVANCE_LEAD_CHARS,
 ) -> RelevanceScore:
     """
     This node checks relevance ONLY if there is clear potential funding
     and/or collaboration with private companies (not government-only news).
+    Only the first `lead_chars` characters of the raw body are sent.
     """
     prompt = f"""
 You are an expert relevance evaluator for SPICE (SIT-Polytechnic Innovation Centre of Excellence).
@@ -32,18 +48,55 @@ Return valid JSON per the Pydantic schema with:
 1. "is_relevant": true/false
 2. "reason": one short sentence
 3. "relevant_domains": pick from SPICE’s domains, only if relevant
+4. "confidence": how sure you are of the decision, from 0.0 to 1.0
 
 ### SPICE Context
 {spice_context}
 
-### Article Content
-{article.body}
+### Article Title
+{article.title}
+
+### Article Lead
+{article.body[:lead_chars]}
 """
     structured_output_parser = model.with_structured_output(RelevanceScore)
     decision_response = structured_output_parser.invoke([HumanMessage(content=prompt)])
     return decision_response
 
 
+@budgeted("relevance_score")
+@article_stage("relevance_score")
+def score_article(state: GraphState, article: NewsArticle, label: str = "") -> None:
+    """
+    Score one article, re-checking positive or low-confidence verdicts from
+    the cheap model when a cascade is configured, and emit the verdict.
+    """
+    if restore_article_stage("relevance_score", article):
+        emit("relevance", url=article.url, article=article)
+        return
+
+    threshold = escalation_threshold(state)
+    logger.info("%s Scoring: %.60s...", label, article.title)
+    try:
+        article.relevance = cascade(
+            state,
+            "relevance",
+            lambda model: relevance_scoring(model, state["spice_context"], article),
+            lambda score: score.is_relevant or score.confidence < threshold,
+        )
+        save_article_stage("relevance_score", article)
+        emit("relevance", url=article.url, article=article)
+        if article.relevance.is_relevant:
+            logger.info("%s ✓ RELEVANT - %s", label, article.relevance.reason)
+        else:
+            logger.info("%s ✗ NOT RELEVANT - %s", label, article.relevance.reason)
+    except BudgetExceeded:
+        # Recorded as skipped by `budgeted`
+        raise
+    except Exception as e:
+        logger.error(f"{label} Error scoring relevance: {e}", exc_info=True)
+
+
 def relevance_scoring_node(state: GraphState) -> GraphState:
     """
     Handles the relevance scoring node.
@@ -54,30 +107,15 @@ def relevance_scoring_node(state: GraphState) -> GraphState:
     logger.info("RELEVANCE SCORING NODE STARTED")
     logger.info("=" * 80)
 
-    articles = state.get("articles", [])
+    articles = load_articles(state)
     logger.info(f"Scoring relevance for {len(articles)} articles")
 
-    relevant_count = 0
     for i, article in enumerate(articles, 1):
-        logger.info(f"[{i}/{len(articles)}] Scoring: {article.title[:60]}...")
-        try:
-            article.relevance = relevance_scoring(
-                state["model"], state["spice_context"], article
-            )
-            if article.relevance.is_relevant:
-                relevant_count += 1
-                logger.info(
-                    f"[{i}/{len(articles)}] ✓ RELEVANT - {article.relevance.reason}"
-                )
-            else:
-                logger.info(
-                    f"[{i}/{len(articles)}] ✗ NOT RELEVANT - {article.relevance.reason}"
-                )
-        except Exception as e:
-            logger.error(
-                f"[{i}/{len(articles)}] Error scoring relevance: {e}", exc_info=True
-            )
+        with log_context(article_index=i - 1):
+            score_article(state, article, f"[{i}/{len(articles)}]")
 
+    state["articles"] = save_articles(state, articles)
+    relevant_count = sum(1 for a in articles if a.is_relevant)
     logger.info(
         f"✓ Relevance scoring completed: {relevant_count}/{len(articles)} relevant"
     )
@@ -0,0 +1,118 @@
+import importlib.util
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Set up logger for this module
+logger = logging.getLogger("spice.browsers")
+
+# Playwright browser names and the extra builds they need at runtime
+BROWSER_BUILDS = {
+    "chromium": ["chromium", "chromium-headless-shell", "ffmpeg"],
+    "firefox": ["firefox"],
+    "webkit": ["webkit"],
+}
+
+
+def browsers_path() -> Path:
+    """Directory Playwright installs browsers into (honours PLAYWRIGHT_BROWSERS_PATH)."""
+    custom = os.getenv("PLAYWRIGHT_BROWSERS_PATH")
+    if custom and custom != "0":
+        return Path(custom).expanduser()
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "ms-playwright"
+    if sys.platform == "win32":
+        return Path(os.getenv("LOCALAPPDATA", Path.home())) / "ms-playwright"
+    return Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "ms-playwright"
+
+
+def _expected_revisions() -> Optional[dict]:
+    """
+    Map of build name -> accepted revisions, read from the browsers.json
+    bundled with the installed playwright package (without importing it).
+    """
+    spec = importlib.util.find_spec("playwright")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    manifest = (
+        Path(spec.submodule_search_locations[0])
+        / "driver"
+        / "package"
+        / "browsers.json"
+    )
+    try:
+        builds = json.loads(manifest.read_text(encoding="utf-8"))["browsers"]
+    except (OSError, KeyError, ValueError):
+        return None
+    return {
+        build["name"]: {build["revision"], *build.get("revisionOverrides", {}).values()}
+        for build in builds
+    }
+
+
+def missing_builds(browser: str) -> List[str]:
+    """
+    Builds of `browser` that are not installed, using only a directory
+    check (no subprocess, no playwright import).
+    """
+    root = browsers_path()
+    revisions = _expected_revisions() or {}
+    missing = []
+    for build in BROWSER_BUILDS.get(browser, [browser]):
+        prefix = build.replace("-", "_")
+        accepted = revisions.get(build)
+        if accepted:
+            candidates = [root / f"{prefix}-{rev}" for rev in accepted]
+        else:
+            candidates = list(root.glob(f"{prefix}-*"))
+        if not any((c / "INSTALLATION_COMPLETE").exists() for c in candidates):
+            missing.append(build)
+    return missing
+
+
+def ensure_browser(browser: str, timeout: int = 300) -> bool:
+    """
+    Make sure the selected Playwright browser is installed, installing only
+    that browser (and its system dependencies) when it is missing.
+    """
+    missing = missing_builds(browser)
+    if not missing:
+        logger.info(f"Playwright {browser} already installed")
+        return True
+
+    logger.info(f"Playwright {browser} missing ({', '.join(missing)}), installing...")
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "playwright", "install", browser],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        logger.error(f"❌ Playwright {browser} installation timed out")
+        return False
+
+    if result.returncode != 0:
+        logger.warning(
+            f"Playwright {browser} install returned code {result.returncode}"
+        )
+        logger.warning(f"stderr: {result.stderr}")
+        return False
+    logger.info(f"✓ Playwright {browser} browser installed successfully")
+
+    # System dependencies (may fail without root, that's ok)
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "playwright", "install-deps", browser],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        logger.info(f"✓ Playwright {browser} system dependencies installed")
+    except Exception as e:
+        logger.warning(f"Could not install system deps (may be already present): {e}")
+    return True
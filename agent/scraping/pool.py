@@ -0,0 +1,134 @@
+"""
+Browsers kept open across tasks, for worker processes that scrape many
+pages: a browser is launched once per engine and reused, each task
+getting a fresh context (cookies, cache) and page of its own.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from agent.scraping import webscrape
+from agent.tracing import span, track
+
+# Set up logger for this module
+logger = logging.getLogger("spice.pool")
+
+T = TypeVar("T")
+
+
+class BrowserPool:
+    """
+    Runs page actions on long-lived browsers. The browsers live on the
+    pool's own event loop thread, so synchronous callers on any thread can
+    share them; at most `size` pages are open at once. A browser that
+    crashed or was disconnected is relaunched on next use.
+    """
+
+    def __init__(self, size: int = 2):
+        self.size = size
+        self.launches = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="spice-browser-pool", daemon=True
+        )
+        self._thread.start()
+        self._playwright = None
+        self._browsers: Dict[Tuple[str, bool], Any] = {}
+        self._launch_lock: Optional[asyncio.Lock] = None
+        # Free page slots; each traces its actions on a track of its own
+        self._pages: Optional[asyncio.Queue] = None
+
+    def run(
+        self,
+        action: Callable[[Any], Awaitable[T]],
+        browser: str = "firefox",
+        headless: bool = True,
+    ) -> T:
+        """
+        Run `action(page)` on a new page of `browser` and return its
+        result. Runs in the caller's context, so log context and tracing
+        carry over.
+        """
+        context = contextvars.copy_context()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def start() -> None:
+            task = self._loop.create_task(
+                self._run(action, browser, headless), context=context
+            )
+            task.add_done_callback(done)
+
+        self._loop.call_soon_threadsafe(start)
+        return future.result()
+
+    async def _run(self, action, browser: str, headless: bool):
+        if self._pages is None:
+            self._pages = asyncio.Queue()
+            for slot in range(self.size):
+                self._pages.put_nowait(slot)
+        slot = await self._pages.get()
+        try:
+            with track(f"browser pool page {slot + 1}"):
+                instance = await self._browser(browser, headless)
+                context = await instance.new_context(user_agent=webscrape.USER_AGENT)
+                try:
+                    return await action(await context.new_page())
+                finally:
+                    await context.close()
+        finally:
+            self._pages.put_nowait(slot)
+
+    async def _browser(self, browser: str, headless: bool):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            instance = self._browsers.get((browser, headless))
+            if instance is not None and instance.is_connected():
+                return instance
+            if self._playwright is None:
+                # Looked up on the module, so a patched fetcher applies
+                self._playwright = await webscrape.async_playwright().start()
+            logger.info(
+                "Launching %s browser for the pool%s",
+                browser,
+                " (relaunch)" if instance is not None else "",
+            )
+            with span("browser launch", "browser", browser=browser):
+                instance = await getattr(self._playwright, browser).launch(
+                    headless=headless
+                )
+            self._browsers[(browser, headless)] = instance
+            self.launches += 1
+            return instance
+
+    async def _shutdown(self) -> None:
+        for instance in self._browsers.values():
+            try:
+                await instance.close()
+            except Exception as e:
+                logger.debug("Error closing browser: %s", e)
+        self._browsers.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self) -> None:
+        """Close the browsers and stop the pool's event loop."""
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -2,7 +2,7 @@ import asyncio
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 from playwright.async_api import async_playwright
@@ -10,12 +10,46 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.output_parsers import PydanticOutputParser
 
-from agent.templates import NewsLinkList, NewsArticle
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import BudgetExceeded, RunBudget
+from agent.llm.routing import (
+    DEFAULT_ESCALATION_THRESHOLD,
+    escalation_model_for,
+    escalation_threshold,
+    model_for,
+    run_resource,
+)
+from agent.llm.usage import UsageLedger
+from agent.logs import log_context
+from agent.metrics import time_article_stage
+from agent.state import save_articles
+from agent.storage.articles import SPICE_DB, canonical_url, get_article_store
+from agent.templates import NewsLink, NewsLinkList, NewsArticle
+from agent.tracing import span
 
 # Set up logger for this module
 logger = logging.getLogger("spice.webscrape")
 
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# Settle time after a page loads, for scripts that render links or text
+LISTING_SETTLE_MS = 2000
+ARTICLE_SETTLE_MS = 1000
+
+# Collects [href, text] of every link-like element in one browser round trip
+LINK_HARVEST_JS = """
+els => els.map(el => [
+    el.getAttribute("href") || el.getAttribute("data-href"),
+    el.innerText || "",
+])
+"""
+
+# Characters normalize_path ignores when comparing paths
+_PATH_IGNORED = str.maketrans("", "", "-_ ")
+
+
 # === Utility Functions ===
 def chunked(lst, n):
     for i in range(0, len(lst), n):
@@ -23,13 +57,86 @@ def chunked(lst, n):
 
 
 def normalize_path(path: str) -> str:
-    return (
-        path.lower().replace("-", "").replace("_", "").replace(" ", "").rstrip("/")
-        + "/"
-    )
+    return path.lower().translate(_PATH_IGNORED).rstrip("/") + "/"
+
+
+def filter_listing_links(
+    listing_url: str, anchors: Iterable[Tuple[Optional[str], str]], max_results: int
+) -> List[Dict[str, str]]:
+    """
+    Article links among the `(href, text)` pairs harvested from a listing
+    page: absolute, query-free URLs under the listing's path (compared with
+    `normalize_path`), deduplicated in page order, at most `max_results`.
+    Links without text are titled from their last path segment.
+    """
+    norm_prefix = normalize_path(urlparse(listing_url).path.rstrip("/") + "/")
+    seen, results = set(), []
+    for raw, text in anchors:
+        if len(results) >= max_results:
+            break
+        if not raw:
+            continue
+
+        full_url = raw if raw.startswith("http") else urljoin(listing_url, raw)
+        if "?" in full_url or full_url in seen:
+            continue
+
+        parsed_link = urlparse(full_url)
+        if not normalize_path(parsed_link.path).startswith(norm_prefix):
+            continue
+
+        seen.add(full_url)
+        title = (text or "").strip()
+        if not title:
+            last_path = Path(parsed_link.path).name
+            title = last_path.replace("-", " ").replace("_", " ").strip().title()
+        results.append({"title": title, "url": full_url})
+    return results
 
 
 # === Scraping Functions ===
+async def read_listing(
+    page, listing_url: str, max_results: int
+) -> List[Dict[str, str]]:
+    """Article links on the listing page at `listing_url`, read with `page`."""
+    logger.info(f"Navigating to: {listing_url}")
+    with span("navigate", "browser", url=listing_url) as args:
+        response = await page.goto(listing_url, wait_until="load", timeout=30000)
+        args["status"] = response.status if response else None
+
+    # Log response status
+    if response:
+        logger.info("Page response status: %s", response.status)
+        logger.debug("Response headers: %s", response.headers)
+
+        if response.status == 403:
+            logger.error("❌ 403 FORBIDDEN - Your IP may be blocked!")
+        elif response.status == 429:
+            logger.error("❌ 429 TOO MANY REQUESTS - Rate limited!")
+        elif response.status >= 400:
+            logger.error(f"❌ HTTP {response.status} error received")
+        else:
+            logger.info("✓ Page loaded successfully")
+
+    with span("wait", "browser", ms=LISTING_SETTLE_MS):
+        await page.wait_for_timeout(LISTING_SETTLE_MS)
+    logger.debug("Waited %d ms for page content to load", LISTING_SETTLE_MS)
+
+    with span("harvest links", "browser") as args:
+        anchors = await page.eval_on_selector_all(
+            "[href], [data-href]", LINK_HARVEST_JS
+        )
+        args["anchors"] = len(anchors)
+    logger.info(f"Found {len(anchors)} elements with href/data-href attributes")
+
+    with span("filter links", "scrape") as args:
+        results = filter_listing_links(listing_url, anchors, max_results)
+        args["links"] = len(results)
+
+    logger.info(f"✓ Successfully scraped {len(results)} links from listing page")
+    return results
+
+
 async def fetch_links_by_listing(
     listing_url: str, max_results: int, headless: bool = True, browser: str = "firefox"
 ) -> List[Dict[str, str]]:
@@ -38,84 +145,21 @@ async def fetch_links_by_listing(
         f"Settings - Browser: {browser}, Headless: {headless}, Max Results: {max_results}"
     )
 
-    parsed = urlparse(listing_url)
-    raw_prefix = parsed.path.rstrip("/") + "/"
-    norm_prefix = normalize_path(raw_prefix)
-    logger.debug(f"Normalized path prefix: {norm_prefix}")
-
     async with async_playwright() as p:
         try:
             browser_engine = getattr(p, browser)
             logger.info(f"Launching {browser} browser...")
-            browser_instance = await browser_engine.launch(headless=headless)
+            with span("browser launch", "browser", browser=browser):
+                browser_instance = await browser_engine.launch(headless=headless)
 
-            context = await browser_instance.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
+                context = await browser_instance.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
 
-            logger.info(f"Navigating to: {listing_url}")
-            response = await page.goto(listing_url, wait_until="load", timeout=30000)
+            results = await read_listing(page, listing_url, max_results)
 
-            # Log response status
-            if response:
-                logger.info(f"Page response status: {response.status}")
-                logger.info(f"Response headers: {dict(response.headers)}")
-
-                if response.status == 403:
-                    logger.error("❌ 403 FORBIDDEN - Your IP may be blocked!")
-                elif response.status == 429:
-                    logger.error("❌ 429 TOO MANY REQUESTS - Rate limited!")
-                elif response.status >= 400:
-                    logger.error(f"❌ HTTP {response.status} error received")
-                else:
-                    logger.info("✓ Page loaded successfully")
-
-            await page.wait_for_timeout(2000)
-            logger.debug("Waited 2 seconds for page content to load")
-
-            els = await page.query_selector_all("[href], [data-href]")
-            logger.info(f"Found {len(els)} elements with href/data-href attributes")
-
-            seen, results = set(), []
-
-            for el in els:
-                if len(results) >= max_results:
-                    break
-
-                raw = await el.get_attribute("href") or await el.get_attribute(
-                    "data-href"
-                )
-                if not raw:
-                    continue
-
-                full_url = raw if raw.startswith("http") else urljoin(listing_url, raw)
-                if "?" in full_url:
-                    continue
-
-                parsed_link = urlparse(full_url)
-                norm_path = normalize_path(parsed_link.path)
-
-                if not norm_path.startswith(norm_prefix) or full_url in seen:
-                    continue
-
-                seen.add(full_url)
-                title = (await el.inner_text() or "").strip()
-                if not title:
-                    last_path = Path(parsed_link.path).name
-                    title = (
-                        last_path.replace("-", " ").replace("_", " ").strip().title()
-                    )
-
-                results.append({"title": title, "url": full_url})
-                logger.debug(f"Added article: {title[:50]}... -> {full_url}")
-
-            logger.info(
-                f"✓ Successfully scraped {len(results)} links from listing page"
-            )
-
-            await context.close()
-            await browser_instance.close()
+            with span("browser close", "browser"):
+                await context.close()
+                await browser_instance.close()
             return results
 
         except Exception as e:
@@ -126,8 +170,12 @@ async def fetch_links_by_listing(
 
 
 async def fetch_all(
-    url: str, max_results: int, headless: bool, browser: str
+    url: str, max_results: int, headless: bool, browser: str, raise_errors: bool = False
 ) -> List[Dict[str, str]]:
+    """
+    Links on the listing page at `url`. Errors are logged and give no
+    links, or are raised with `raise_errors`.
+    """
     try:
         logger.info("=" * 80)
         logger.info(f"STARTING WEB SCRAPE: {url}")
@@ -143,17 +191,13 @@ async def fetch_all(
         logger.error("  3. Website structure changed")
         logger.error("  4. Timeout (page too slow)")
         print(f"⚠️ Error on {url}: {e}")
+        if raise_errors:
+            raise
         return []
 
 
 # === LLM Filtering ===
-def filter_with_llm_by_source(
-    model: ChatOpenAI, all_articles: Dict[str, List[Dict[str, str]]]
-) -> List[Dict[str, str]]:
-    logger.info(f"Starting LLM filtering for {len(all_articles)} source(s)")
-    parser = PydanticOutputParser(pydantic_object=NewsLinkList)
-
-    system_prompt = f"""
+LINK_FILTER_PROMPT = """
     You are a helpful assistant that filters a batch of scraped web links.
 
     Your task is to identify only valid news articles or press releases. These should be links that point to actual news pages. 
@@ -162,117 +206,255 @@ def filter_with_llm_by_source(
     - cookie banners or policy notices
     - empty or malformed
 
-    Return results as a list of `NewsLink` under a `links` field.
+    Return results as a list of `NewsLink` under a `links` field, with a
+    `confidence` between 0.0 and 1.0 for each link you keep.
 
     Use the following Pydantic format:
-    {parser.get_format_instructions()}"""
+    {format_instructions}"""
+
+
+def filter_link_batch(
+    model: ChatOpenAI, parser: PydanticOutputParser, batch: List[Dict[str, str]]
+) -> List[NewsLink]:
+    """Ask `model` which links in `batch` are news articles."""
+    system_prompt = LINK_FILTER_PROMPT.format(
+        format_instructions=parser.get_format_instructions()
+    )
+    user_prompt = f"Evaluate the following list:\n{json.dumps(batch, indent=2, ensure_ascii=False)}"
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+    response = model.invoke(messages)
+    return parser.parse(response.content).links
+
+
+def filter_links_batch(
+    model: ChatOpenAI,
+    batch: List[Dict[str, str]],
+    batch_number: int = 1,
+    escalation_model: Optional[ChatOpenAI] = None,
+    threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+    usage: Optional[UsageLedger] = None,
+    budget: Optional[RunBudget] = None,
+) -> List[Dict[str, str]]:
+    """
+    The news/press-release links of one batch (of at most 10), with their
+    `full_url`. When `escalation_model` is given, links the first model
+    approved with confidence below `threshold` are re-checked by it, and
+    only the ones it also approves are kept. Once `budget` is used up the
+    batch is dropped and recorded as skipped; if it runs out during the
+    re-check, the confident approvals are kept and the unsure links are
+    recorded as skipped. A batch whose output cannot be parsed is dropped.
+    """
+
+    def skip(urls: Iterable[str]) -> None:
+        if budget is None:
+            return
+        # Recorded under the listing's spelling of the URL, which is what
+        # record_scraped_links leaves out
+        originals = {canonical_url(link["url"]): link["url"] for link in batch}
+        for url in urls:
+            budget.skip("link_filter", originals.get(canonical_url(url), url))
+
+    if budget is not None and not budget.allows("link_filter"):
+        skip(link["url"] for link in batch)
+        return []
+
+    parser = PydanticOutputParser(pydantic_object=NewsLinkList)
+    logger.debug("Filtering batch %d (%d links)", batch_number, len(batch))
+    filtered = []
+    try:
+        approved = filter_link_batch(model, parser, batch)
+        if escalation_model is not None:
+            unsure = [l for l in approved if l.confidence < threshold]
+            if usage is not None:
+                usage.record_escalation(
+                    "link_filter", False, len(approved) - len(unsure)
+                )
+                usage.record_escalation("link_filter", True, len(unsure))
+            if unsure:
+                logger.debug(
+                    f"Escalating {len(unsure)} low-confidence links from batch {batch_number}"
+                )
+                recheck = [{"title": l.title, "url": str(l.url)} for l in unsure]
+                approved = [l for l in approved if l.confidence >= threshold]
+                try:
+                    approved += filter_link_batch(escalation_model, parser, recheck)
+                except BudgetExceeded as e:
+                    logger.warning(
+                        f"Budget used up re-checking batch {batch_number}: {e}"
+                    )
+                    skip(link["url"] for link in recheck)
+
+        logger.debug("LLM approved %d links from batch %d", len(approved), batch_number)
+        for link in approved:
+            item = link.model_dump()
+            default_port = {"http": 80, "https": 443}.get(link.url.scheme)
+            port = (
+                f":{link.url.port}"
+                if link.url.port and link.url.port != default_port
+                else ""
+            )
+            item["full_url"] = (
+                f"{link.url.scheme}://{link.url.host}{port}{link.url.path}"
+            )
+            filtered.append(item)
+    except BudgetExceeded as e:
+        logger.warning(f"Budget used up filtering batch {batch_number}: {e}")
+        skip(link["url"] for link in batch)
+    except Exception as e:
+        logger.error(
+            f"❌ Error parsing structured output for batch {batch_number}: {str(e)}"
+        )
+        print("❌ Error parsing structured output:", e)
+    return filtered
+
+
+def filter_with_llm_by_source(
+    model: ChatOpenAI,
+    all_articles: Dict[str, List[Dict[str, str]]],
+    escalation_model: Optional[ChatOpenAI] = None,
+    threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+    usage: Optional[UsageLedger] = None,
+    budget: Optional[RunBudget] = None,
+) -> List[Dict[str, str]]:
+    """Keep only news/press-release links, in batches of 10 (see filter_links_batch)."""
+    logger.info(f"Starting LLM filtering for {len(all_articles)} source(s)")
 
     filtered = []
     for src, links in all_articles.items():
         logger.info(f"Processing {len(links)} links from source: {src}")
         for i, batch in enumerate(chunked(links, 10)):
-            logger.debug(f"Filtering batch {i+1} ({len(batch)} links)")
-            user_prompt = f"Evaluate the following list:\n{json.dumps(batch, indent=2, ensure_ascii=False)}"
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt),
-            ]
-            response = model.invoke(messages)
-            try:
-                parsed = parser.parse(response.content)
-                batch_count = len(parsed.links)
-                logger.debug(f"LLM approved {batch_count} links from batch {i+1}")
-                for link in parsed.links:
-                    item = link.model_dump()
-                    item["full_url"] = (
-                        f"{link.url.scheme}://{link.url.host}{link.url.path}"
-                    )
-                    filtered.append(item)
-            except Exception as e:
-                logger.error(
-                    f"❌ Error parsing structured output for batch {i+1}: {str(e)}"
+            filtered.extend(
+                filter_links_batch(
+                    model, batch, i + 1, escalation_model, threshold, usage, budget
                 )
-                print("❌ Error parsing structured output:", e)
+            )
 
     logger.info(f"✓ LLM filtering complete - {len(filtered)} articles approved")
     return filtered
 
 
 # === Content Extraction ===
+async def read_article(page, url: str) -> str:
+    """
+    Text of the article at `url`, read with `page`: the first non-empty of
+    its <article>, <main> or <body>. Empty if the page has no text.
+    """
+    logger.debug("Navigating to article: %s", url)
+    with span("navigate", "browser", url=url) as args:
+        response = await page.goto(url, wait_until="load", timeout=15000)
+        args["status"] = response.status if response else None
+
+    if response:
+        logger.debug("Article page response status: %s", response.status)
+        if response.status == 403:
+            logger.error(f"❌ 403 FORBIDDEN on article page: {url}")
+        elif response.status == 429:
+            logger.error(f"❌ 429 RATE LIMITED on article page: {url}")
+        elif response.status >= 400:
+            logger.warning(f"⚠️ HTTP {response.status} on article page: {url}")
+
+    with span("wait", "browser", ms=ARTICLE_SETTLE_MS):
+        await page.wait_for_timeout(ARTICLE_SETTLE_MS)
+
+    with span("extract text", "browser") as args:
+        for selector in ["article", "main", "body"]:
+            el = await page.query_selector(selector)
+            if el:
+                text = await el.inner_text()
+                if text.strip():
+                    logger.info(
+                        "✓ Extracted %d characters using selector: %s",
+                        len(text),
+                        selector,
+                    )
+                    args.update(selector=selector, chars=len(text))
+                    return text.strip()
+
+    logger.warning(f"⚠️ No content extracted from {url}")
+    return ""
+
+
 async def extract_article_body(url: str, headless: bool, browser: str) -> str:
-    logger.info(f"Extracting article body from: {url}")
+    logger.info("Extracting article body from: %s", url)
     async with async_playwright() as p:
         browser_engine = getattr(p, browser)
-        browser_instance = await browser_engine.launch(headless=headless)
-        context = await browser_instance.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        )
-        page = await context.new_page()
+        with span("browser launch", "browser", browser=browser):
+            browser_instance = await browser_engine.launch(headless=headless)
+            context = await browser_instance.new_context(user_agent=USER_AGENT)
+            page = await context.new_page()
         try:
-            logger.debug(f"Navigating to article: {url}")
-            response = await page.goto(url, wait_until="load", timeout=15000)
-
-            if response:
-                logger.debug(f"Article page response status: {response.status}")
-                if response.status == 403:
-                    logger.error(f"❌ 403 FORBIDDEN on article page: {url}")
-                elif response.status == 429:
-                    logger.error(f"❌ 429 RATE LIMITED on article page: {url}")
-                elif response.status >= 400:
-                    logger.warning(f"⚠️ HTTP {response.status} on article page: {url}")
-
-            await page.wait_for_timeout(1000)
-
-            for selector in ["article", "main", "body"]:
-                el = await page.query_selector(selector)
-                if el:
-                    text = await el.inner_text()
-                    if text.strip():
-                        logger.info(
-                            f"✓ Extracted {len(text)} characters using selector: {selector}"
-                        )
-                        return text.strip()
-
-            logger.warning(f"⚠️ No content extracted from {url}")
+            return await read_article(page, url)
         except Exception as e:
             logger.error(f"❌ Failed to extract from {url}: {str(e)}", exc_info=True)
             print(f"❌ Failed to extract from {url}: {e}")
         finally:
-            await context.close()
-            await browser_instance.close()
+            with span("browser close", "browser"):
+                await context.close()
+                await browser_instance.close()
         return ""
 
 
+async def scrape_article(
+    article: Dict[str, str],
+    index: int,
+    label: str,
+    extract: Callable[[str], Awaitable[str]],
+) -> NewsArticle:
+    """
+    `NewsArticle` of a filtered link, its body read by `extract(url)` or,
+    when the run is resumed, restored from the checkpoint.
+    """
+    host = article["url"].host
+    url = article.get("full_url", article["url"])
+    title = article.get("title", f"Article {index + 1}")
+
+    logger.info("%s Processing: %.60s...", label, title)
+    news_article = NewsArticle(host=host, title=title, url=url)
+    if not restore_article_stage("extract", news_article):
+        with time_article_stage(url, "extract"), log_context(article_index=index), span(
+            "extract", "article", url=url
+        ):
+            news_article.body = await extract(url)
+        save_article_stage("extract", news_article)
+
+    emit("article_scraped", url=url, article=news_article)
+    logger.debug(
+        "%s Created NewsArticle object with %d chars", label, len(news_article.body)
+    )
+    return news_article
+
+
 async def process_articles(
     articles: List[Dict[str, str]], headless: bool = True, browser: str = "firefox"
 ) -> List[NewsArticle]:
     logger.info(f"Processing {len(articles)} articles for content extraction")
-    results = []
-    for i, article in enumerate(articles, 1):
-        host = article["url"].host
-        url = article.get("full_url", article["url"])
-        title = article.get("title", f"Article {i}")
-
-        logger.info(f"[{i}/{len(articles)}] Processing: {title[:60]}...")
-        body = await extract_article_body(url, headless, browser)
-
-        article_data = {
-            "host": host,
-            "title": title,
-            "url": url,
-            "body": body,
-        }
-
-        news_article = NewsArticle(**article_data)
-        results.append(news_article)
-        logger.debug(
-            f"[{i}/{len(articles)}] Created NewsArticle object with {len(body)} chars"
-        )
 
+    async def extract(url: str) -> str:
+        return await extract_article_body(url, headless, browser)
+
+    results = [
+        await scrape_article(article, i, f"[{i + 1}/{len(articles)}]", extract)
+        for i, article in enumerate(articles)
+    ]
     logger.info(f"✓ Completed processing {len(results)} articles")
     return results
 
 
+def record_scraped_links(
+    store, listing_url: str, links: List[Dict[str, str]], budget: Optional[RunBudget]
+) -> None:
+    """
+    Record a scrape's links as seen, except those of link filter batches
+    skipped for budget, so the next run picks them up. Done once a scrape
+    is through, so the links of a failed one are retried too.
+    """
+    skipped = set(budget.skipped.get("link_filter", [])) if budget else set()
+    store.record(listing_url, [a for a in links if a["url"] not in skipped])
+
+
 # === Main Node Logic ===
 def web_scrape_node(state: dict) -> dict:
     logger.info("=" * 80)
@@ -293,50 +475,47 @@ def web_scrape_node(state: dict) -> dict:
     logger.info(f"  - Headless: {headless}")
     logger.info(f"  - Max results: {max_results}")
 
-    model = state.get("model", ChatOpenAI(model="gpt-4o-mini", temperature=0))
-    scraped_articles = state.get("scraped_articles", {})
+    model = model_for(state, "link_filter")
+    budget = run_resource(state, "budget")
+    store = get_article_store(state.get("article_db") or SPICE_DB)
 
-    # Scrape fresh data
+    # Scrape fresh data; an unreachable listing fails the run rather than
+    # passing for one without new articles
     logger.info("Starting fresh scrape...")
-    all_articles = asyncio.run(fetch_all(listing_url, max_results, headless, browser))
+    all_articles = asyncio.run(
+        fetch_all(listing_url, max_results, headless, browser, raise_errors=True)
+    )
     logger.info(f"Fresh scrape returned {len(all_articles)} articles")
 
-    new_articles_only, new_data_found = {}, False
-
-    if listing_url in scraped_articles:
-        logger.info(
-            f"Found {len(scraped_articles[listing_url])} previously scraped articles"
-        )
-        seen = {json.dumps(x, sort_keys=True) for x in scraped_articles[listing_url]}
-        new_articles = [
-            x for x in all_articles if json.dumps(x, sort_keys=True) not in seen
-        ]
-        if new_articles:
-            logger.info(f"✓ Found {len(new_articles)} NEW articles")
-            scraped_articles[listing_url].extend(new_articles)
-            new_articles_only[listing_url] = new_articles
-            new_data_found = True
-        else:
-            logger.info("No new articles found (all already scraped)")
-    else:
-        logger.info("First time scraping this URL")
-        scraped_articles[listing_url] = all_articles
-        if all_articles:
-            new_articles_only[listing_url] = all_articles
-            new_data_found = True
+    new_articles = store.new_links(listing_url, all_articles)
+    new_articles_only = {listing_url: new_articles} if new_articles else {}
+    new_data_found = bool(new_articles)
+    logger.info(
+        f"✓ Found {len(new_articles)} NEW articles "
+        f"({len(all_articles) - len(new_articles)} previously scraped)"
+    )
 
     if new_data_found:
         logger.info("Processing new articles with LLM filter and content extraction...")
-        filtered_articles = filter_with_llm_by_source(model, new_articles_only)
+        filtered_articles = filter_with_llm_by_source(
+            model,
+            new_articles_only,
+            escalation_model=escalation_model_for(state, "link_filter"),
+            threshold=escalation_threshold(state),
+            usage=run_resource(state, "usage"),
+            budget=budget,
+        )
         logger.info(f"After LLM filtering: {len(filtered_articles)} articles remain")
 
         extracted = asyncio.run(process_articles(filtered_articles, headless, browser))
-        state["articles"] = extracted
+        state["articles"] = save_articles(state, extracted)
         logger.info(f"✓ Successfully extracted content for {len(extracted)} articles")
     else:
         logger.warning("No new data to process")
         state["articles"] = []
 
+    record_scraped_links(store, listing_url, all_articles, budget)
+
     logger.info("=" * 80)
     logger.info("WEB SCRAPE NODE COMPLETED")
     logger.info("=" * 80)
@@ -0,0 +1,65 @@
+"""
+Reading and writing the articles in graph state. Normally
+`state["articles"]` holds the `NewsArticle`s themselves; with
+`slim_state` it holds `ArticleRef`s, and the articles live in the run's
+workspace store, so state and checkpoints stay the same small size
+however long bodies and stage outputs get. Nodes go through these
+helpers either way.
+"""
+
+from typing import List, Optional, Union
+
+from agent.storage.db import SPICE_DB
+from agent.storage.workspace import get_workspace
+from agent.templates import ArticleRef, NewsArticle
+
+
+def _thread_id(thread_id: Optional[str]) -> str:
+    """The given run, or the running graph's checkpoint thread."""
+    if thread_id is not None:
+        return thread_id
+    from langgraph.config import get_config
+
+    return get_config()["configurable"]["thread_id"]
+
+
+def _workspace(state: dict):
+    return get_workspace(state.get("article_db") or SPICE_DB)
+
+
+def load_articles(state: dict, thread_id: Optional[str] = None) -> List[NewsArticle]:
+    """The run's articles, read from the workspace in slim mode."""
+    items = state.get("articles") or []
+    refs = [item for item in items if isinstance(item, ArticleRef)]
+    if not refs:
+        return items
+    loaded = iter(
+        NewsArticle.model_validate(payload)
+        for payload in _workspace(state).get_many(
+            _thread_id(thread_id), [ref.url for ref in refs]
+        )
+    )
+    return [next(loaded) if isinstance(item, ArticleRef) else item for item in items]
+
+
+def save_articles(
+    state: dict, articles: List[NewsArticle], thread_id: Optional[str] = None
+) -> List[Union[NewsArticle, ArticleRef]]:
+    """
+    What to keep in `state["articles"]` for `articles`: the articles
+    themselves or, in slim mode, references once they are saved.
+    """
+    if not state.get("slim_state"):
+        return articles
+    _workspace(state).put_many(
+        _thread_id(thread_id), [article.model_dump(mode="json") for article in articles]
+    )
+    return [ArticleRef.of(article) for article in articles]
+
+
+def load_article(state: dict, item: Union[NewsArticle, ArticleRef]) -> NewsArticle:
+    return load_articles({**state, "articles": [item]})[0]
+
+
+def save_article(state: dict, article: NewsArticle) -> Union[NewsArticle, ArticleRef]:
+    return save_articles(state, [article])[0]
@@ -0,0 +1 @@
+"""Persistent SQLite-backed stores for scraped links and analysis history."""
@@ -0,0 +1,207 @@
+import json
+import logging
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from agent.storage.db import MAX_PARAMS, SPICE_DB, connect, is_imported, mark_imported
+
+# Set up logger for this module
+logger = logging.getLogger("spice.storage")
+
+LEGACY_ARTICLES_JSON = "all_articles.json"
+
+
+def canonical_url(url: str) -> str:
+    """
+    URL with scheme and host lowercased, default port, fragment and trailing
+    slash dropped, so trivially different spellings of a link compare equal.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != {"http": 80, "https": 443}.get(scheme):
+        host = f"{host}:{parsed.port}"
+    path = parsed.path.rstrip("/") or "/"
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{scheme}://{host}{path}{query}"
+
+
+class ArticleStore:
+    """
+    Links seen on each agency listing page, one row per (listing, URL) with
+    its canonical URL and the time it was first and last seen. Replaces the all_articles.json
+    dict that was loaded, passed through graph state and rewritten whole
+    after every run.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS scraped_links (
+                    listing_url TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL DEFAULT '',
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    canonical_url TEXT,
+                    PRIMARY KEY (listing_url, url)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_scraped_links_first_seen
+                    ON scraped_links (listing_url, first_seen);
+                """)
+
+            columns = {
+                row["name"]
+                for row in self.conn.execute("PRAGMA table_info(scraped_links)")
+            }
+            if "canonical_url" not in columns:
+                # Databases created before canonical URLs were stored
+                self.conn.execute(
+                    "ALTER TABLE scraped_links ADD COLUMN canonical_url TEXT"
+                )
+                rows = self.conn.execute(
+                    "SELECT listing_url, url FROM scraped_links"
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE scraped_links SET canonical_url = ? "
+                    "WHERE listing_url = ? AND url = ?",
+                    [
+                        (canonical_url(row["url"]), row["listing_url"], row["url"])
+                        for row in rows
+                    ],
+                )
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scraped_links_canonical
+                    ON scraped_links (listing_url, canonical_url)
+                """)
+
+    # === Queries ===
+    def known_urls(self, listing_url: str, urls: Iterable[str]) -> set:
+        """Subset of `urls` already recorded for `listing_url`."""
+        urls = list(dict.fromkeys(urls))
+        known = set()
+        with self._lock:
+            for start in range(0, len(urls), MAX_PARAMS):
+                chunk = urls[start : start + MAX_PARAMS]
+                rows = self.conn.execute(
+                    f"SELECT url FROM scraped_links WHERE listing_url = ? "
+                    f"AND url IN ({','.join('?' * len(chunk))})",
+                    (listing_url, *chunk),
+                ).fetchall()
+                known.update(row["url"] for row in rows)
+        return known
+
+    def known_canonical_urls(self, listing_url: str, urls: Iterable[str]) -> set:
+        """Subset of the canonical `urls` recorded for `listing_url` in any spelling."""
+        urls = list(dict.fromkeys(urls))
+        known = set()
+        with self._lock:
+            for start in range(0, len(urls), MAX_PARAMS):
+                chunk = urls[start : start + MAX_PARAMS]
+                rows = self.conn.execute(
+                    f"SELECT canonical_url FROM scraped_links WHERE listing_url = ? "
+                    f"AND canonical_url IN ({','.join('?' * len(chunk))})",
+                    (listing_url, *chunk),
+                ).fetchall()
+                known.update(row["canonical_url"] for row in rows)
+        return known
+
+    def new_links(
+        self, listing_url: str, links: List[Dict[str, str]]
+    ) -> List[Dict[str, str]]:
+        """Links (in scrape order) whose URL was never seen on this listing."""
+        known = self.known_urls(listing_url, (link["url"] for link in links))
+        return [link for link in links if link["url"] not in known]
+
+    def links(self, listing_url: str) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT title, url, first_seen, last_seen FROM scraped_links "
+                "WHERE listing_url = ? ORDER BY first_seen, url",
+                (listing_url,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, listing_url: Optional[str] = None) -> int:
+        with self._lock:
+            if listing_url is None:
+                row = self.conn.execute("SELECT COUNT(*) FROM scraped_links")
+            else:
+                row = self.conn.execute(
+                    "SELECT COUNT(*) FROM scraped_links WHERE listing_url = ?",
+                    (listing_url,),
+                )
+            return row.fetchone()[0]
+
+    # === Writes ===
+    def record(
+        self,
+        listing_url: str,
+        links: List[Dict[str, str]],
+        seen_at: Optional[str] = None,
+    ) -> None:
+        """
+        Upsert `links` for `listing_url` in one transaction: new URLs are
+        inserted with `first_seen`, known ones get `last_seen` refreshed.
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        rows = [
+            (
+                listing_url,
+                link["url"],
+                link.get("title", ""),
+                seen_at,
+                seen_at,
+                canonical_url(link["url"]),
+            )
+            for link in links
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO scraped_links
+                    (listing_url, url, title, first_seen, last_seen, canonical_url)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (listing_url, url) DO UPDATE SET
+                    title = excluded.title,
+                    last_seen = MAX(last_seen, excluded.last_seen)
+                """,
+                rows,
+            )
+
+    # === Migration ===
+    def import_json(self, path: str = LEGACY_ARTICLES_JSON) -> int:
+        """
+        One-time import of a legacy all_articles.json file. Returns the
+        number of links imported (0 if already imported or missing).
+        """
+        source = Path(path)
+        with self._lock:
+            done = is_imported(self.conn, str(source.resolve()))
+        if done or not source.exists():
+            return 0
+
+        data = json.loads(source.read_text(encoding="utf-8"))
+        seen_at = datetime.fromtimestamp(source.stat().st_mtime).isoformat()
+        imported = 0
+        for listing_url, links in data.items():
+            self.record(listing_url, links, seen_at)
+            imported += len(links)
+
+        with self._lock:
+            mark_imported(self.conn, str(source.resolve()))
+        logger.info(f"Imported {imported} links from {source} into {self.path}")
+        return imported
+
+
+@lru_cache(maxsize=None)
+def get_article_store(path: str = SPICE_DB) -> ArticleStore:
+    """Process-wide store per database file."""
+    return ArticleStore(path)
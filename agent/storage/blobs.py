@@ -0,0 +1,138 @@
+import hashlib
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterable
+
+from agent.storage.db import MAX_PARAMS
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to zlib
+    zstandard = None
+
+# Marker of a blob reference inside a stored JSON payload
+BLOB_REF = "$blob"
+
+# Texts shorter than this are stored uncompressed
+MIN_COMPRESS_BYTES = 64
+
+
+def _compress(data: bytes) -> tuple:
+    if len(data) < MIN_COMPRESS_BYTES:
+        return "raw", data
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=9).compress(data)
+    return "zlib", zlib.compress(data, 9)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "raw":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "Blob is zstd-compressed; install `zstandard` to read it"
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed, compressed text blobs (article bodies, summaries,
+    email drafts) keyed by SHA-256, so text repeated across runs is stored
+    once. Operates on the caller's connection and transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            ) WITHOUT ROWID
+            """)
+
+    def put(self, text: str) -> str:
+        """Store `text` (if not stored yet) and return its hash."""
+        digest = content_hash(text)
+        exists = self.conn.execute(
+            "SELECT 1 FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone()
+        if not exists:
+            raw = text.encode("utf-8")
+            codec, data = _compress(raw)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                (digest, codec, len(raw), data),
+            )
+        return digest
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(dict.fromkeys(hashes))
+        texts = {}
+        for start in range(0, len(hashes), MAX_PARAMS):
+            chunk = hashes[start : start + MAX_PARAMS]
+            rows = self.conn.execute(
+                f"SELECT hash, codec, data FROM blobs "
+                f"WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for digest, codec, data in rows:
+                texts[digest] = _decompress(codec, data).decode("utf-8")
+        return texts
+
+    def get(self, digest: str) -> str:
+        return self.get_many([digest])[digest]
+
+    # === JSON payloads ===
+    def ref(self, text: Any) -> Any:
+        """Blob reference for a text value (other values are kept as they are)."""
+        if isinstance(text, str) and text:
+            return {BLOB_REF: self.put(text)}
+        return text
+
+    def resolve(self, payload: Any) -> Any:
+        """Replace every blob reference in a JSON payload with its text."""
+        hashes = []
+
+        def collect(node):
+            if isinstance(node, dict):
+                if BLOB_REF in node:
+                    hashes.append(node[BLOB_REF])
+                else:
+                    for value in node.values():
+                        collect(value)
+            elif isinstance(node, list):
+                for value in node:
+                    collect(value)
+
+        collect(payload)
+        texts = self.get_many(hashes)
+
+        def fill(node):
+            if isinstance(node, dict):
+                if BLOB_REF in node:
+                    return texts[node[BLOB_REF]]
+                return {key: fill(value) for key, value in node.items()}
+            if isinstance(node, list):
+                return [fill(value) for value in node]
+            return node
+
+        return fill(payload)
+
+    def stats(self) -> dict:
+        """Blob count, original and stored bytes."""
+        count, size, stored = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) "
+            "FROM blobs"
+        ).fetchone()
+        return {"blobs": count, "bytes": size, "stored_bytes": stored}
@@ -0,0 +1,53 @@
+import os
+import sqlite3
+from datetime import datetime
+
+SPICE_DB = os.getenv("SPICE_DB", "spice.db")
+
+# SQLite's default limit on host parameters per statement
+MAX_PARAMS = 900
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Connection shared between threads, in WAL mode so readers never block."""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """)
+    return conn
+
+
+def is_imported(conn: sqlite3.Connection, source: str) -> bool:
+    """True if the legacy file `source` was already imported into this database."""
+    row = conn.execute(
+        "SELECT 1 FROM store_meta WHERE key = ?", (f"imported:{source}",)
+    ).fetchone()
+    return row is not None
+
+
+def mark_imported(conn: sqlite3.Connection, source: str) -> None:
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO store_meta VALUES (?, ?)",
+            (f"imported:{source}", datetime.now().isoformat()),
+        )
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT value FROM store_meta WHERE key = 'schema_version'"
+    ).fetchone()
+    return int(row[0]) if row else 1
+
+
+def set_schema_version(conn: sqlite3.Connection, version: int) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO store_meta VALUES ('schema_version', ?)",
+        (str(version),),
+    )
@@ -0,0 +1,408 @@
+import json
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from agent.storage.blobs import BlobStore
+from agent.storage.db import (
+    SPICE_DB,
+    connect,
+    is_imported,
+    mark_imported,
+    schema_version,
+    set_schema_version,
+)
+
+# Set up logger for this module
+logger = logging.getLogger("spice.storage")
+
+LEGACY_HISTORY_JSON = "analysis_history.json"
+
+# Layout version of stored payloads (2: large texts moved to blobs)
+SCHEMA_VERSION = 2
+
+# Article fields stored as blobs (email drafts are too, one per entity)
+BLOB_FIELDS = ("body", "summary")
+
+# Text columns of the full-text index, in order
+SEARCH_FIELDS = ("title", "body", "entities", "opportunity", "emails")
+
+# Article columns, in the order they are stored
+ARTICLE_COLUMNS = """
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES analysis_runs (id),
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    is_relevant INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    UNIQUE (run_id, position)
+"""
+
+# Run metadata columns, in the order they are stored
+RUN_FIELDS = (
+    "timestamp",
+    "agency",
+    "browser",
+    "headless",
+    "articles_count",
+    "relevant_count",
+)
+
+
+class HistoryStore:
+    """
+    Append-only analysis history. Run metadata lives in a small
+    `analysis_runs` index; article payloads live in `run_articles` and are
+    only read for the run and article being viewed. Bodies, summaries and
+    email drafts are kept in a compressed, deduplicated `BlobStore` and
+    referenced from the payloads.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analysis_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    agency TEXT NOT NULL,
+                    browser TEXT,
+                    headless INTEGER,
+                    articles_count INTEGER NOT NULL,
+                    relevant_count INTEGER NOT NULL,
+                    usage TEXT,
+                    metrics TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_analysis_runs_timestamp
+                    ON analysis_runs (timestamp);
+                """)
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS run_articles ({ARTICLE_COLUMNS})"
+            )
+            self.blobs = BlobStore(self.conn)
+
+            columns = {
+                row["name"]
+                for row in self.conn.execute("PRAGMA table_info(analysis_runs)")
+            }
+            if "metrics" not in columns:
+                # Databases created before per-node metrics were recorded
+                self.conn.execute("ALTER TABLE analysis_runs ADD COLUMN metrics TEXT")
+
+            columns = {
+                row["name"]
+                for row in self.conn.execute("PRAGMA table_info(run_articles)")
+            }
+            if "id" not in columns:
+                # Databases keyed on (run_id, position) only: the search
+                # index needs stable ids, which implicit rowids are not
+                # (VACUUM may renumber them). The current rowids become the
+                # ids, so the index still points at the right articles.
+                self.conn.executescript(f"""
+                    BEGIN;
+                    CREATE TABLE run_articles_keyed ({ARTICLE_COLUMNS});
+                    INSERT INTO run_articles_keyed
+                        SELECT rowid, run_id, position, title, url,
+                               is_relevant, payload
+                        FROM run_articles;
+                    DROP TABLE run_articles;
+                    ALTER TABLE run_articles_keyed RENAME TO run_articles;
+                    COMMIT;
+                    """)
+
+            index = self.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'article_search'"
+            ).fetchone()
+            if index and "content = ''" not in index[0]:
+                # Index from before blobs, holding its own copy of the text
+                self.conn.execute("DROP TABLE article_search")
+                index = None
+            # Contentless: rowids are run_articles ids, the text is in blobs
+            self.conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5(
+                    {', '.join(SEARCH_FIELDS)},
+                    content = '',
+                    tokenize = 'porter unicode61'
+                )
+                """)
+
+        if schema_version(self.conn) < SCHEMA_VERSION:
+            self.migrate_payloads_to_blobs()
+        if not index:
+            self.rebuild_search_index()
+
+    # === Writes ===
+    def add_run(self, entry: dict) -> int:
+        """Append a run (metadata plus its `articles`) in one transaction."""
+        articles = entry.get("articles", [])
+        reports = [entry.get(name) for name in ("usage", "metrics")]
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO analysis_runs ({', '.join(RUN_FIELDS)}, usage, metrics) "
+                f"VALUES ({', '.join('?' * (len(RUN_FIELDS) + 2))})",
+                (
+                    *(entry.get(name) for name in RUN_FIELDS),
+                    *(json.dumps(r) if r is not None else None for r in reports),
+                ),
+            )
+            run_id = cursor.lastrowid
+            for position, article in enumerate(articles):
+                cursor = self.conn.execute(
+                    "INSERT INTO run_articles "
+                    "(run_id, position, title, url, is_relevant, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        position,
+                        article.get("title") or "Untitled",
+                        article.get("url") or "",
+                        int(bool((article.get("relevance") or {}).get("is_relevant"))),
+                        self._encode(article),
+                    ),
+                )
+                self._index_article(cursor.lastrowid, article)
+        return run_id
+
+    def _encode(self, article: dict) -> str:
+        """JSON payload of an article, with its large texts stored as blobs."""
+        payload = dict(article)
+        for name in BLOB_FIELDS:
+            payload[name] = self.blobs.ref(payload.get(name))
+        payload["email_drafts"] = {
+            entity: self.blobs.ref(draft)
+            for entity, draft in (article.get("email_drafts") or {}).items()
+        }
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+    def _index_article(self, article_id: int, article: dict) -> None:
+        self.conn.execute(
+            f"INSERT INTO article_search (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' * len(SEARCH_FIELDS))})",
+            (article_id, *search_document(article)),
+        )
+
+    def rebuild_search_index(self) -> None:
+        """Re-index every stored article (for databases created before the index)."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO article_search (article_search) VALUES ('delete-all')"
+            )
+            rows = self.conn.execute("SELECT id, payload FROM run_articles")
+            count = 0
+            for article_id, payload in rows.fetchall():
+                self._index_article(article_id, self.blobs.resolve(json.loads(payload)))
+                count += 1
+        logger.info(f"Rebuilt search index over {count} articles")
+
+    def migrate_payloads_to_blobs(self) -> None:
+        """Move texts embedded in older payloads into the blob store."""
+        with self._lock, self.conn:
+            rows = self.conn.execute("SELECT id, payload FROM run_articles")
+            count = 0
+            for article_id, payload in rows.fetchall():
+                article = self.blobs.resolve(json.loads(payload))
+                self.conn.execute(
+                    "UPDATE run_articles SET payload = ? WHERE id = ?",
+                    (self._encode(article), article_id),
+                )
+                count += 1
+            set_schema_version(self.conn, SCHEMA_VERSION)
+        if count:
+            logger.info(f"Moved texts of {count} stored articles into blobs")
+
+    # === Queries ===
+    def version(self) -> int:
+        """
+        Changes whenever a run is added (runs are append-only), so callers
+        can key caches of query results on it.
+        """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM analysis_runs"
+            ).fetchone()[0]
+
+    def count_runs(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM analysis_runs").fetchone()[0]
+
+    def list_runs(self, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        """Run metadata, most recent first (no article payloads)."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(RUN_FIELDS)} FROM analysis_runs "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_run(self, run_id: int) -> Optional[dict]:
+        """Metadata, usage report and metrics of one run."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM analysis_runs WHERE id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        for name in ("usage", "metrics"):
+            run[name] = json.loads(run[name]) if run[name] else None
+        return run
+
+    def count_articles(self, run_id: int) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM run_articles WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+
+    def list_articles(
+        self,
+        run_id: int,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        relevant_first: bool = False,
+    ) -> List[dict]:
+        """Title, URL and relevance of each article of a run, for selectors."""
+        order = "is_relevant DESC, position" if relevant_first else "position"
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT position, title, url, is_relevant FROM run_articles "
+                f"WHERE run_id = ? ORDER BY {order} LIMIT ? OFFSET ?",
+                (run_id, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [{**dict(row), "is_relevant": bool(row["is_relevant"])} for row in rows]
+
+    def get_article(self, run_id: int, position: int) -> Optional[dict]:
+        """Full stored payload of one article of a run, texts included."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM run_articles WHERE run_id = ? AND position = ?",
+                (run_id, position),
+            ).fetchone()
+            if row is None:
+                return None
+            return self.blobs.resolve(json.loads(row["payload"]))
+
+    def search(self, query: str, limit: int = 50) -> List[dict]:
+        """
+        Articles matching every term of `query` (the last term as a prefix),
+        best BM25 match first, with the run they belong to and a snippet.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT a.run_id, a.position, r.timestamp, r.agency,
+                       a.title, a.url, a.is_relevant, a.payload
+                FROM (
+                    SELECT rowid,
+                           bm25(article_search, 5.0, 1.0, 3.0, 2.0, 1.0) AS rank
+                    FROM article_search
+                    WHERE article_search MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                ) AS s
+                JOIN run_articles AS a ON a.id = s.rowid
+                JOIN analysis_runs AS r ON r.id = a.run_id
+                ORDER BY s.rank
+                """,
+                (match, limit),
+            ).fetchall()
+
+            hits = []
+            for row in rows:
+                hit = dict(row)
+                article = self.blobs.resolve(json.loads(hit.pop("payload")))
+                hit["is_relevant"] = bool(hit["is_relevant"])
+                hit["snippet"] = snippet(
+                    " ".join(search_document(article)), query.split()
+                )
+                hits.append(hit)
+        return hits
+
+    def storage_stats(self) -> dict:
+        """Blob deduplication and compression figures."""
+        with self._lock:
+            return self.blobs.stats()
+
+    # === Migration ===
+    def import_json(self, path: str = LEGACY_HISTORY_JSON) -> int:
+        """
+        One-time import of a legacy analysis_history.json file. Returns the
+        number of runs imported (0 if already imported or missing).
+        """
+        source = Path(path)
+        with self._lock:
+            done = is_imported(self.conn, str(source.resolve()))
+        if done or not source.exists():
+            return 0
+
+        entries = json.loads(source.read_text(encoding="utf-8"))
+        for entry in entries:
+            self.add_run(entry)
+
+        with self._lock:
+            mark_imported(self.conn, str(source.resolve()))
+        logger.info(f"Imported {len(entries)} runs from {source} into {self.path}")
+        return len(entries)
+
+
+def search_document(article: dict) -> tuple:
+    """Values of SEARCH_FIELDS for an article payload (texts resolved)."""
+    opportunity = article.get("opportunity") or {}
+    return (
+        article.get("title") or "",
+        article.get("body") or "",
+        " ".join(
+            f"{e.get('name', '')} {e.get('type', '')}"
+            for e in article.get("business_entities") or []
+        ),
+        f"{opportunity.get('opportunity', '')} {opportunity.get('justification', '')}",
+        " ".join(
+            f"{entity} {draft}"
+            for entity, draft in (article.get("email_drafts") or {}).items()
+        ),
+    )
+
+
+def snippet(text: str, terms: List[str], words: int = 16) -> str:
+    """
+    Window of `words` words around the first match of any term, with the
+    matches in bold. (The index is contentless, so FTS5's snippet() cannot
+    be used.)
+    """
+    prefixes = [t.strip('"').lower() for t in terms if t.strip('"')]
+
+    def matches(token: str) -> bool:
+        word = token.lower().strip(".,;:!?()[]\"'")
+        return any(word.startswith(p) for p in prefixes)
+
+    tokens = text.split()
+    first = next((i for i, t in enumerate(tokens) if matches(t)), 0)
+    start = max(0, first - words // 2)
+    window = " ".join(
+        f"**{t}**" if matches(t) else t for t in tokens[start : start + words]
+    )
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + words < len(tokens) else ""
+    return prefix + window + suffix
+
+
+def fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: all terms quoted, last one a prefix."""
+    terms = [t.replace('"', '""') for t in query.split()]
+    if not terms:
+        return ""
+    return " ".join(f'"{t}"' for t in terms) + "*"
+
+
+@lru_cache(maxsize=None)
+def get_history_store(path: str = SPICE_DB) -> HistoryStore:
+    """Process-wide store per database file."""
+    return HistoryStore(path)
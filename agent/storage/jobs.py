@@ -0,0 +1,139 @@
+import json
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
+
+from agent.storage.db import SPICE_DB, connect
+
+# Job states: queued, running, succeeded, failed, interrupted (running when
+# their process exited) and resumed (continued by a later job)
+ACTIVE_STATUSES = ("queued", "running")
+JSON_FIELDS = ("request", "nodes", "articles", "usage")
+
+
+class JobStore:
+    """
+    Persistent table of background analysis jobs: their request, status,
+    per-node progress and a compact live view of each article, so that the
+    UI can poll it and a page reload does not lose track of a run.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    agency TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    nodes TEXT NOT NULL DEFAULT '{}',
+                    articles TEXT NOT NULL DEFAULT '{}',
+                    usage TEXT,
+                    error TEXT,
+                    run_id INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status
+                    ON analysis_jobs (status, created_at);
+                """)
+
+    def _update(self, job_id: str, **fields) -> None:
+        for name in JSON_FIELDS:
+            if name in fields:
+                fields[name] = json.dumps(fields[name], ensure_ascii=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"UPDATE analysis_jobs SET {', '.join(f'{k} = ?' for k in fields)} "
+                "WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    # === Lifecycle ===
+    def create(self, job_id: str, agency: str, request: dict) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO analysis_jobs (id, agency, status, request, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, agency, json.dumps(request), datetime.now().isoformat()),
+            )
+
+    def start(self, job_id: str) -> None:
+        self._update(
+            job_id,
+            status="running",
+            started_at=datetime.now().isoformat(),
+            nodes={},
+            articles={},
+            error=None,
+        )
+
+    def progress(self, job_id: str, nodes: dict, articles: dict) -> None:
+        self._update(job_id, nodes=nodes, articles=articles)
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        error: Optional[str] = None,
+        run_id: Optional[int] = None,
+        usage: Optional[dict] = None,
+    ) -> None:
+        self._update(
+            job_id,
+            status=status,
+            finished_at=datetime.now().isoformat(),
+            error=error,
+            run_id=run_id,
+            usage=usage,
+        )
+
+    def mark_resumed(self, job_id: str) -> None:
+        """A failed/interrupted job whose run was continued by a new job."""
+        self._update(job_id, status="resumed")
+
+    def mark_interrupted(self) -> int:
+        """Flag jobs left queued/running by a previous process. Returns how many."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE analysis_jobs SET status = 'interrupted', finished_at = ? "
+                f"WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))})",
+                (datetime.now().isoformat(), *ACTIVE_STATUSES),
+            )
+        return cursor.rowcount
+
+    # === Queries ===
+    def _decode(self, row) -> dict:
+        job = dict(row)
+        for name in JSON_FIELDS:
+            job[name] = json.loads(job[name]) if job[name] else None
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._decode(row) if row else None
+
+    def list_jobs(self, limit: int = 10) -> List[dict]:
+        """Active jobs first, then the most recent finished ones."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM analysis_jobs "
+                f"ORDER BY status IN ({', '.join('?' * len(ACTIVE_STATUSES))}) DESC, "
+                "created_at DESC LIMIT ?",
+                (*ACTIVE_STATUSES, limit),
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_job_store(path: str = SPICE_DB) -> JobStore:
+    """Process-wide store per database file."""
+    return JobStore(path)
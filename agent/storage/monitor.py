@@ -0,0 +1,75 @@
+import threading
+from functools import lru_cache
+from typing import List, Optional
+
+from agent.storage.db import SPICE_DB, connect
+
+# Per-agency counters kept by the listing monitor, in column order
+COUNTER_FIELDS = ("polls", "unchanged", "no_new", "triggers", "errors")
+
+
+class MonitorStore:
+    """
+    State of the listing monitor, one row per agency: the hash of the link
+    set last seen on its listing page (so a restart does not re-trigger),
+    poll/trigger counters and when it last polled, changed and triggered.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS listing_monitor (
+                    agency TEXT PRIMARY KEY,
+                    listing_url TEXT NOT NULL,
+                    interval REAL NOT NULL,
+                    link_hash TEXT,
+                    {', '.join(f'{name} INTEGER NOT NULL DEFAULT 0' for name in COUNTER_FIELDS)},
+                    last_polled TEXT,
+                    last_changed TEXT,
+                    last_triggered TEXT,
+                    last_job TEXT,
+                    last_error TEXT
+                )
+                """)
+
+    def get(self, agency: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM listing_monitor WHERE agency = ?", (agency,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def save(self, watch: dict) -> None:
+        """Upsert an agency's row from a dict of its column values."""
+        columns = ", ".join(watch)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in watch)
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO listing_monitor ({columns}) "
+                f"VALUES ({', '.join('?' * len(watch))}) "
+                f"ON CONFLICT (agency) DO UPDATE SET {updates}",
+                tuple(watch.values()),
+            )
+
+    def list_watches(self) -> List[dict]:
+        """Every monitored agency, with its skip ratio (polls that did not trigger)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM listing_monitor ORDER BY agency"
+            ).fetchall()
+        watches = []
+        for row in rows:
+            watch = dict(row)
+            skipped = watch["unchanged"] + watch["no_new"]
+            watch["skip_ratio"] = skipped / watch["polls"] if watch["polls"] else None
+            watches.append(watch)
+        return watches
+
+
+@lru_cache(maxsize=None)
+def get_monitor_store(path: str = SPICE_DB) -> MonitorStore:
+    """Process-wide store per database file."""
+    return MonitorStore(path)
@@ -0,0 +1,392 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agent.storage.db import SPICE_DB, connect
+
+# Task kinds, in the order workers take them: finishing a batch comes
+# before more articles, and articles before scraping another agency
+TASK_KINDS = ("collect", "article", "scrape")
+
+# Seconds a worker holds a task without renewing its lease
+LEASE_SECONDS = float(os.getenv("SPICE_QUEUE_LEASE", "120"))
+
+# Attempts of a task before it is given up, and the delay before the
+# first retry (doubled for every further one)
+MAX_ATTEMPTS = int(os.getenv("SPICE_QUEUE_MAX_ATTEMPTS", "3"))
+RETRY_DELAY = float(os.getenv("SPICE_QUEUE_RETRY_DELAY", "5"))
+
+# Task states: queued (possibly waiting out a retry delay), leased, done
+# and failed (out of attempts). Batches are running, succeeded or failed.
+OPEN_STATUSES = ("queued", "leased")
+
+# Model usage of a batch's tasks so far, counted against the run budget
+SPENT_FIELDS = ("calls", "tokens", "cost")
+
+
+class TaskQueue:
+    """
+    Durable queue of worker fleet tasks, shared by worker processes through
+    the database. A worker leases a task for `lease_seconds` and renews
+    the lease while it works; a task whose lease runs out (its worker died
+    or hung) goes to the next worker. Failed tasks are retried with
+    backoff until they run out of attempts.
+
+    Tasks belong to a batch, one agency analysis: a "scrape" task queues
+    its "article" tasks when it completes, and the batch's "collect" task
+    is only handed out once every other task of the batch is settled.
+    Tasks report the model usage they spent, so each task of a batch is
+    held to what is left of the batch's run budget.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS task_batches (
+                    id TEXT PRIMARY KEY,
+                    agency TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    run_id INTEGER,
+                    summary TEXT,
+                    error TEXT,
+                    spent_calls INTEGER NOT NULL DEFAULT 0,
+                    spent_tokens INTEGER NOT NULL DEFAULT 0,
+                    spent_cost REAL NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS task_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    batch_id TEXT NOT NULL REFERENCES task_batches (id),
+                    kind TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    finished_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_task_queue_status
+                    ON task_queue (status, priority, available_at);
+                CREATE INDEX IF NOT EXISTS idx_task_queue_batch
+                    ON task_queue (batch_id, status);
+                """)
+
+            columns = {
+                row["name"]
+                for row in self.conn.execute("PRAGMA table_info(task_batches)")
+            }
+            if "spent_calls" not in columns:
+                # Queues created before batches tracked their spend
+                for field, kind in zip(SPENT_FIELDS, ("INTEGER", "INTEGER", "REAL")):
+                    self.conn.execute(
+                        f"ALTER TABLE task_batches ADD COLUMN spent_{field} "
+                        f"{kind} NOT NULL DEFAULT 0"
+                    )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Write transaction that takes the database lock up front, so two
+        processes can never lease the same task.
+        """
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def _insert(
+        self, batch_id: str, tasks: Iterable[Tuple[str, dict]], max_attempts: int
+    ) -> None:
+        now = datetime.now().isoformat()
+        self.conn.executemany(
+            "INSERT INTO task_queue (batch_id, kind, priority, payload, status, "
+            "max_attempts, available_at, created_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, 0, ?)",
+            [
+                (
+                    batch_id,
+                    kind,
+                    TASK_KINDS.index(kind),
+                    json.dumps(payload, ensure_ascii=False),
+                    max_attempts,
+                    now,
+                )
+                for kind, payload in tasks
+            ],
+        )
+
+    def _give_up(self, task_ids: List[int], error: str) -> None:
+        """Fail tasks that are out of attempts, and the batches of collect tasks."""
+        now = datetime.now().isoformat()
+        for task_id in task_ids:
+            self.conn.execute(
+                "UPDATE task_queue SET status = 'failed', error = ?, finished_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                (error, now, task_id),
+            )
+            self.conn.execute(
+                "UPDATE task_batches SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE status = 'running' AND id = "
+                "(SELECT batch_id FROM task_queue WHERE id = ? AND kind = 'collect')",
+                (error, now, task_id),
+            )
+
+    def _add_spent(self, task_id: int, spent: Optional[dict]) -> None:
+        """Add a task attempt's model usage to its batch."""
+        if not spent:
+            return
+        self.conn.execute(
+            "UPDATE task_batches SET "
+            + ", ".join(f"spent_{f} = spent_{f} + ?" for f in SPENT_FIELDS)
+            + " WHERE id = (SELECT batch_id FROM task_queue WHERE id = ?)",
+            (*(spent.get(f, 0) for f in SPENT_FIELDS), task_id),
+        )
+
+    # === Producers ===
+    def enqueue(
+        self, agency: str, request: dict, max_attempts: int = MAX_ATTEMPTS
+    ) -> str:
+        """Queue the analysis of one agency (its scrape and collect tasks)."""
+        batch_id = str(uuid.uuid4())
+        with self._transaction():
+            self.conn.execute(
+                "INSERT INTO task_batches (id, agency, request, status, created_at) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (batch_id, agency, json.dumps(request), datetime.now().isoformat()),
+            )
+            self._insert(batch_id, [("scrape", {}), ("collect", {})], max_attempts)
+        return batch_id
+
+    # === Workers ===
+    def lease(
+        self, worker: str, lease_seconds: float = LEASE_SECONDS
+    ) -> Optional[dict]:
+        """
+        Lease the next task that is ready (including ones whose lease ran
+        out), or None. The task comes with its batch's agency, request and
+        usage so far (`spent`).
+        """
+        now = time.time()
+        with self._transaction():
+            expired = self.conn.execute(
+                "SELECT id FROM task_queue WHERE status = 'leased' "
+                "AND lease_expires < ? AND attempts >= max_attempts",
+                (now,),
+            ).fetchall()
+            self._give_up([row["id"] for row in expired], "lease expired")
+
+            row = self.conn.execute(
+                """
+                SELECT t.id FROM task_queue t
+                WHERE (
+                    (t.status = 'queued' AND t.available_at <= :now)
+                    OR (t.status = 'leased' AND t.lease_expires < :now)
+                )
+                AND (t.kind != 'collect' OR NOT EXISTS (
+                    SELECT 1 FROM task_queue o
+                    WHERE o.batch_id = t.batch_id AND o.id != t.id
+                    AND o.status IN ('queued', 'leased')
+                ))
+                ORDER BY t.priority, t.id
+                LIMIT 1
+                """,
+                {"now": now},
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE task_queue SET status = 'leased', lease_owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, row["id"]),
+            )
+            task = self.conn.execute(
+                "SELECT t.*, b.agency, b.request, b.spent_calls, b.spent_tokens, "
+                "b.spent_cost FROM task_queue t "
+                "JOIN task_batches b ON b.id = t.batch_id WHERE t.id = ?",
+                (row["id"],),
+            ).fetchone()
+        return self._decode(task)
+
+    def heartbeat(
+        self, task_id: int, worker: str, lease_seconds: float = LEASE_SECONDS
+    ) -> bool:
+        """Extend the lease of a task; False if `worker` no longer holds it."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE task_queue SET lease_expires = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + lease_seconds, task_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self,
+        task_id: int,
+        worker: str,
+        result: dict,
+        follow_ups: Iterable[Tuple[str, dict]] = (),
+        spent: Optional[dict] = None,
+    ) -> bool:
+        """
+        Store a task's result and queue its `(kind, payload)` follow-up
+        tasks, all at once, adding the model usage it `spent` to its batch.
+        False (and only the usage stored) if `worker` lost the lease, in
+        which case another worker redoes the task.
+        """
+        with self._transaction():
+            self._add_spent(task_id, spent)
+            task = self.conn.execute(
+                "SELECT batch_id, max_attempts FROM task_queue "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker),
+            ).fetchone()
+            if task is None:
+                return False
+            self.conn.execute(
+                "UPDATE task_queue SET status = 'done', result = ?, finished_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                (
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    datetime.now().isoformat(),
+                    task_id,
+                ),
+            )
+            self._insert(task["batch_id"], follow_ups, task["max_attempts"])
+        return True
+
+    def fail(
+        self,
+        task_id: int,
+        worker: str,
+        error: str,
+        retry_delay: float = RETRY_DELAY,
+        spent: Optional[dict] = None,
+    ) -> Optional[str]:
+        """
+        Record a failed attempt, and the model usage it `spent`: the task
+        is queued again after a backoff delay ("retry") or, out of
+        attempts, given up ("failed"). None if `worker` lost the lease.
+        """
+        with self._transaction():
+            self._add_spent(task_id, spent)
+            task = self.conn.execute(
+                "SELECT attempts, max_attempts FROM task_queue "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker),
+            ).fetchone()
+            if task is None:
+                return None
+            if task["attempts"] >= task["max_attempts"]:
+                self._give_up([task_id], error)
+                return "failed"
+            delay = retry_delay * 2 ** (task["attempts"] - 1)
+            self.conn.execute(
+                "UPDATE task_queue SET status = 'queued', error = ?, available_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                (error, time.time() + delay, task_id),
+            )
+        return "retry"
+
+    # === Batches ===
+    def _update_batch(self, batch_id: str, **fields) -> None:
+        if "summary" in fields:
+            fields["summary"] = json.dumps(fields["summary"], ensure_ascii=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"UPDATE task_batches SET {', '.join(f'{k} = ?' for k in fields)} "
+                "WHERE id = ?",
+                (*fields.values(), batch_id),
+            )
+
+    def record_run(self, batch_id: str, run_id: int) -> None:
+        """The history run a batch was added as (so a retry does not add it twice)."""
+        self._update_batch(batch_id, run_id=run_id)
+
+    def finish_batch(
+        self,
+        batch_id: str,
+        status: str,
+        summary: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        self._update_batch(
+            batch_id,
+            status=status,
+            summary=summary,
+            error=error,
+            finished_at=datetime.now().isoformat(),
+        )
+
+    # === Queries ===
+    def _decode(self, row) -> dict:
+        task = dict(row)
+        for name in ("payload", "request", "result", "summary"):
+            if name in task:
+                task[name] = json.loads(task[name]) if task[name] else None
+        if "spent_calls" in task:
+            task["spent"] = {f: task.pop(f"spent_{f}") for f in SPENT_FIELDS}
+        return task
+
+    def tasks(self, batch_id: str) -> List[dict]:
+        """Every task of a batch, in the order they were queued."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM task_queue WHERE batch_id = ? ORDER BY id",
+                (batch_id,),
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def get_batch(self, batch_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM task_batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+        return self._decode(row) if row else None
+
+    def idle(self) -> bool:
+        """True when no task is queued (or waiting for a retry) or leased."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM task_queue WHERE status IN (?, ?) LIMIT 1",
+                OPEN_STATUSES,
+            ).fetchone()
+        return row is None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of tasks by kind and status."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT kind, status, COUNT(*) AS n FROM task_queue "
+                "GROUP BY kind, status"
+            ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return counts
+
+
+@lru_cache(maxsize=None)
+def get_task_queue(path: str = SPICE_DB) -> TaskQueue:
+    """Process-wide queue per database file."""
+    return TaskQueue(path)
@@ -0,0 +1,57 @@
+import threading
+from functools import lru_cache
+
+from agent.storage.db import SPICE_DB, connect
+
+# Daily model usage totals, in column order
+USAGE_FIELDS = ("calls", "tokens", "cost")
+
+
+class UsageStore:
+    """
+    Model calls, tokens and estimated cost per calendar day, summed over
+    every run and process using the database. Backs the daily budgets.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_usage_daily (
+                    day TEXT PRIMARY KEY,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL DEFAULT 0
+                )
+                """)
+
+    def add(self, day: str, calls: int, tokens: int, cost: float) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO llm_usage_daily (day, calls, tokens, cost)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (day) DO UPDATE SET
+                    calls = calls + excluded.calls,
+                    tokens = tokens + excluded.tokens,
+                    cost = cost + excluded.cost
+                """,
+                (day, calls, tokens, cost),
+            )
+
+    def get(self, day: str) -> dict:
+        """Usage totals of `day` (an ISO date), zero if nothing was recorded."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT calls, tokens, cost FROM llm_usage_daily WHERE day = ?",
+                (day,),
+            ).fetchone()
+        return dict(row) if row else {"calls": 0, "tokens": 0, "cost": 0.0}
+
+
+@lru_cache(maxsize=None)
+def get_usage_store(path: str = SPICE_DB) -> UsageStore:
+    """Process-wide store per database file."""
+    return UsageStore(path)
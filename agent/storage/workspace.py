@@ -0,0 +1,85 @@
+import json
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from agent.storage.blobs import BlobStore
+from agent.storage.db import MAX_PARAMS, SPICE_DB, connect
+from agent.storage.history import BLOB_FIELDS
+
+
+class ArticleWorkspace:
+    """
+    Articles of runs in progress, keyed by run (checkpoint thread) and URL,
+    for graphs run with slim state. Texts go to the same compressed,
+    deduplicated blobs as the history, so a body written by several stages
+    (and later added to the history) is stored once. A run's articles are
+    dropped once the run is in the history.
+    """
+
+    def __init__(self, path: str = SPICE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS workspace_articles (
+                    thread_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, url)
+                )
+                """)
+            self.blobs = BlobStore(self.conn)
+
+    def _encode(self, article: dict) -> str:
+        payload = dict(article)
+        for name in BLOB_FIELDS:
+            payload[name] = self.blobs.ref(payload.get(name))
+        payload["email_drafts"] = {
+            entity: self.blobs.ref(draft)
+            for entity, draft in (article.get("email_drafts") or {}).items()
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+    def put_many(self, thread_id: str, articles: Iterable[dict]) -> None:
+        """Save (or overwrite) articles, given as JSON-ready dicts with a "url"."""
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO workspace_articles VALUES (?, ?, ?, ?)",
+                [
+                    (thread_id, article["url"], self._encode(article), now)
+                    for article in articles
+                ],
+            )
+
+    def get_many(self, thread_id: str, urls: List[str]) -> List[dict]:
+        """Articles of a run by URL, in the order given; KeyError if one is missing."""
+        payloads: Dict[str, dict] = {}
+        with self._lock:
+            for start in range(0, len(urls), MAX_PARAMS):
+                chunk = urls[start : start + MAX_PARAMS]
+                rows = self.conn.execute(
+                    "SELECT url, payload FROM workspace_articles WHERE thread_id = ? "
+                    f"AND url IN ({','.join('?' * len(chunk))})",
+                    (thread_id, *chunk),
+                ).fetchall()
+                for row in rows:
+                    payloads[row["url"]] = json.loads(row["payload"])
+            resolved = self.blobs.resolve(payloads)
+        return [resolved[url] for url in urls]
+
+    def clear(self, thread_id: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM workspace_articles WHERE thread_id = ?", (thread_id,)
+            )
+
+
+@lru_cache(maxsize=None)
+def get_workspace(path: str = SPICE_DB) -> ArticleWorkspace:
+    """Process-wide workspace per database file."""
+    return ArticleWorkspace(path)
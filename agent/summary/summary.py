@@ -1,6 +1,13 @@
 import logging
 from langchain_core.messages import HumanMessage
-from agent.templates import GraphState, OpenAI
+from agent.checkpoint import restore_article_stage, save_article_stage
+from agent.events import emit
+from agent.llm.budget import BudgetExceeded, budgeted
+from agent.llm.routing import model_for
+from agent.logs import log_context
+from agent.metrics import article_stage
+from agent.state import load_articles, save_articles
+from agent.templates import GraphState, NewsArticle, OpenAI
 
 # Set up logger for this module
 logger = logging.getLogger("spice.summary")
@@ -43,35 +50,57 @@ Please write the summary below:
     return resp.content.strip()
 
 
+@budgeted("summary", relevant_only=True)
+@article_stage("summary")
+def summarize_article(state: GraphState, article: NewsArticle, label: str = "") -> None:
+    """Attach a summary to one article unless it already has one."""
+    if article.summary:
+        return
+    if restore_article_stage("summary", article):
+        emit("summary", url=article.url, article=article)
+        return
+
+    logger.info("%s Summarizing: %.60s...", label, article.title)
+    emit("summary_started", url=article.url, article=article)
+    try:
+        article.summary = summary(
+            model_for(state, "summary"), state["spice_context"], article
+        )
+        save_article_stage("summary", article)
+        emit("summary", url=article.url, article=article)
+        logger.debug("%s Summary length: %d chars", label, len(article.summary))
+    except BudgetExceeded:
+        # Recorded as skipped by `budgeted`
+        raise
+    except Exception as e:
+        logger.error(f"{label} Error summarizing article: {e}", exc_info=True)
+
+
 def summary_node(state: GraphState) -> GraphState:
     """
-    Runs through each article in state["articles"] and attaches a
+    Runs through each relevant article in state["articles"] and attaches a
     focused summary at article.summary, without dropping the full body.
+    Irrelevant articles are never summarized.
     """
     logger.info("=" * 80)
     logger.info("SUMMARY NODE STARTED")
     logger.info("=" * 80)
 
-    articles = state.get("articles", [])
+    articles = load_articles(state)
     if not articles:
         logger.warning("No articles to summarize")
         state["response"] = "No articles to summarize."
         return state
 
-    logger.info(f"Summarizing {len(articles)} articles")
+    relevant_count = sum(1 for a in articles if a.is_relevant)
+    logger.info(f"Summarizing {relevant_count}/{len(articles)} relevant articles")
 
     for i, article in enumerate(articles, 1):
-        logger.info(f"[{i}/{len(articles)}] Summarizing: {article.title[:60]}...")
-        try:
-            article.body = summary(state["model"], state["spice_context"], article)
-            logger.debug(
-                f"[{i}/{len(articles)}] Summary length: {len(article.body)} chars"
-            )
-        except Exception as e:
-            logger.error(
-                f"[{i}/{len(articles)}] Error summarizing article: {e}", exc_info=True
-            )
+        if article.is_relevant:
+            with log_context(article_index=i - 1):
+                summarize_article(state, article, f"[{i}/{len(articles)}]")
 
+    state["articles"] = save_articles(state, articles)
     logger.info("✓ Summary node completed")
     logger.info("=" * 80)
     return state
@@ -3,15 +3,20 @@ from pydantic import BaseModel, Field, HttpUrl
 from typing_extensions import TypedDict
 
 from langchain_openai import OpenAI
-from typing import List, Literal, Optional
+from typing import Annotated, Dict, List, Literal, Optional, Union
 from pydantic import BaseModel, Field, HttpUrl
 from agent.context.spice import SPECIALIZED_CONTEXTS
 from enum import Enum
+from dataclasses import dataclass, field
 
 
 class NewsLink(BaseModel):
     title: str
     url: HttpUrl
+    confidence: float = Field(
+        1.0,
+        description="How confident you are (0.0 to 1.0) that this is a news article.",
+    )
 
 
 class NewsLinkList(BaseModel):
@@ -21,6 +26,9 @@ class NewsLinkList(BaseModel):
 class RelevanceScore(BaseModel):
     is_relevant: bool = Field(..., description="Whether the article is relevant.")
     reason: str = Field(..., description="Brief explanation for your decision.")
+    confidence: float = Field(
+        1.0, description="How confident you are in this decision, from 0.0 to 1.0."
+    )
     relevant_domains: List[str] = Field(
         default_factory=list,
         description=(
@@ -86,22 +94,101 @@ class NewsArticle(BaseModel):
     title: str
     url: str
     body: Optional[str] = None
-    relevance: RelevanceScore = None
+    summary: Optional[str] = None
+    relevance: Optional[RelevanceScore] = None
     business_entities: List[BusinessEntityItem] = []
-    opportunity: Opportunity = None
-    email_drafts: List[dict[str, str]] = None
+    opportunity: Optional[Opportunity] = None
+    email_drafts: Optional[Dict[str, str]] = None
+
+    @property
+    def is_relevant(self) -> bool:
+        return bool(self.relevance and self.relevance.is_relevant)
+
+    def analysis_text(self, source: str = "summary") -> str:
+        """
+        Text the analysis stages work from: the summary (when one was
+        generated) or the full scraped body.
+        """
+        if source == "summary" and self.summary:
+            return self.summary
+        return self.body or ""
+
+
+class ArticleRef(BaseModel):
+    """
+    An article in slim graph state: its URL and what routing needs, while
+    the article itself (body and stage outputs) is kept in the run's
+    workspace store.
+    """
+
+    url: str
+    title: str
+    is_relevant: bool = False
+
+    @classmethod
+    def of(cls, article: NewsArticle) -> "ArticleRef":
+        return cls(
+            url=article.url, title=article.title, is_relevant=article.is_relevant
+        )
+
+
+def merge_completed(left: Optional[list], right: Optional[list]) -> list:
+    """Reducer for per-article fan-out results, keyed by article index."""
+    merged = dict(left or [])
+    merged.update(dict(right or []))
+    return sorted(merged.items(), key=lambda item: item[0])
+
+
+@dataclass
+class RunContext:
+    """
+    Run-scoped dependencies passed as the graph's runtime `context` rather
+    than in state, so they are never written to checkpoints: model clients,
+    the usage ledger, the per-article progress log, the run's metrics and
+    its budget.
+    """
+
+    model: Optional[OpenAI] = None
+    stage_models: Dict[str, OpenAI] = field(default_factory=dict)
+    usage: Optional[object] = None
+    progress: Optional[object] = None
+    metrics: Optional[object] = None
+    budget: Optional[object] = None
+
+
+class ArticleTask(TypedDict):
+    """Input of the per-article pipeline when the graph fans out."""
+
+    model: OpenAI
+    stage_models: Dict[str, OpenAI]
+    escalation_threshold: float
+    usage: Optional[object]
+    analysis_text: Literal["summary", "body"]
+    spice_context: str
+    slim_state: bool
+    article_db: str
+    article: Union[NewsArticle, ArticleRef]
+    index: int
+    total: int
 
 
 class GraphState(TypedDict):
     model: OpenAI
+    stage_models: Dict[str, OpenAI]
+    escalation_threshold: float
+    usage: Optional[object]
+    analysis_text: Literal["summary", "body"]
     spice_context: str
     websites: dict
     website_selected: str
     max_results: int
-    articles: List[NewsArticle]
+    # NewsArticles, or ArticleRefs with `slim_state`
+    slim_state: bool
+    articles: List[Union[NewsArticle, ArticleRef]]
+    completed_articles: Annotated[list, merge_completed]
     current_index: int
     current_article: Optional[NewsArticle]
-    scraped_articles: dict
+    article_db: str
     response: Optional[object]
     headless: bool
     browser: Literal["chromium", "firefox", "webkit"]
@@ -0,0 +1,158 @@
+"""
+In-process tracing of a run: nested spans for graph nodes, articles,
+browser actions and model calls, exported as a Chrome trace event file.
+Open it in https://ui.perfetto.dev, chrome://tracing or speedscope for a
+timeline and flame graph of where the run's wall time went.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+# Directory traces of every run are written to, if set
+TRACE_DIR = os.getenv("SPICE_TRACE_DIR") or None
+
+_tracer: ContextVar[Optional["Tracer"]] = ContextVar("spice_tracer", default=None)
+_track: ContextVar[Optional[str]] = ContextVar("spice_track", default=None)
+
+
+class Tracer:
+    """
+    Collects spans as Chrome "complete" trace events, one track per thread
+    (or per `track` block). Spans nest by time on their track, so a span
+    opened inside another shows up beneath it. Safe to share between
+    threads.
+    """
+
+    def __init__(self, name: str = "spice"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.events: List[dict] = []
+        self.threads: Dict[int, str] = {}
+        self._tracks: Dict[str, int] = {}
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._started) * 1_000_000
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[dict]:
+        """
+        Record the block as a span. Yields the span's args, which can be
+        filled in (e.g. with a response status) before the block ends.
+        """
+        track_name = _track.get()
+        if track_name is None:
+            thread = threading.current_thread()
+            tid, label = thread.ident, thread.name
+        else:
+            with self._lock:
+                # Small ids, which thread idents never are
+                tid = self._tracks.setdefault(track_name, len(self._tracks) + 1)
+            label = track_name
+        begin = self._now_us()
+        error = None
+        try:
+            yield args
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": begin,
+                "dur": self._now_us() - begin,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {k: v for k, v in args.items() if v is not None},
+            }
+            if error:
+                event["args"]["error"] = error
+            with self._lock:
+                self.events.append(event)
+                self.threads.setdefault(tid, label)
+
+    def summary(self) -> Dict[str, dict]:
+        """Span count and total seconds by category."""
+        totals: Dict[str, dict] = {}
+        with self._lock:
+            for event in self.events:
+                total = totals.setdefault(event["cat"], {"spans": 0, "seconds": 0.0})
+                total["spans"] += 1
+                total["seconds"] += event["dur"] / 1_000_000
+        return totals
+
+    def to_chrome(self) -> dict:
+        """The trace in Chrome's trace event format (JSON object form)."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: (e["ts"], -e["dur"]))
+            threads = dict(self.threads)
+        pid = os.getpid()
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": self.name},
+            }
+        ] + [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> str:
+        """Write the trace to `path` (directories are created); returns it."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f, default=str)
+        return path
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Record spans opened in the block (and threads it starts) in `tracer`."""
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+@contextmanager
+def track(name: str) -> Iterator[None]:
+    """
+    Record spans opened in the block (and threads it starts) on track
+    `name` instead of their thread's. Concurrent asyncio tasks share a
+    thread, so each needs its own track for its spans to nest; `name`
+    must not be used by two tasks at once.
+    """
+    token = _track.set(name)
+    try:
+        yield
+    finally:
+        _track.reset(token)
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _tracer.get()
+
+
+def span(name: str, category: str, **args: Any) -> ContextManager[dict]:
+    """A span in the current run's trace; does nothing when not tracing."""
+    tracer = _tracer.get()
+    if tracer is None:
+        return nullcontext(args)
+    return tracer.span(name, category, **args)
@@ -1,119 +1,134 @@
+import time
+
+_script_started = time.perf_counter()
+
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from agent.agent import build_graph
-from agent.context.spice import SPICE_CONTEXT
-import json
+from agent.context.agencies import DEFAULT_WEBSITES
+from agent.llm.usage import MODEL_PRICING
+from agent.logs import setup_logging as configure_logging
+from agent.profiling import StartupProfile
 import os
 import sys
-import subprocess
-import logging
 from pathlib import Path
 from datetime import datetime
 
+# The graph, LLM and scraping modules (langchain, langgraph, playwright) are
+# imported only when a run starts; see import_pipeline below.
+_imports_done = time.perf_counter()
+
 # === Load environment ===
 load_dotenv()
 
 
 # === Configure Logging ===
-def setup_logging():
-    """Configure logging for the application."""
+@st.cache_resource
+def setup_logging(day):
+    """
+    Log to the console and to logs/spice_<day>.log through a background
+    queue listener (see agent/logs.py), set up once per process and day.
+    """
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
 
-    # Create log filename with date
-    log_file = log_dir / f"spice_{datetime.now().strftime('%Y%m%d')}.log"
+    logger = configure_logging(log_file=str(log_dir / f"spice_{day}.log"))
+    logger.info("=" * 60)
+    logger.info("SPICE Application Started")
+    logger.info("=" * 60)
+    return logger
+
+
+# Initialize logger
+logger = setup_logging(datetime.now().strftime("%Y%m%d"))
 
-    # Configure logging format
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
 
-    # Get or create logger
-    logger = logging.getLogger("spice")
-    logger.setLevel(logging.INFO)
+# === Startup Profile ===
+@st.cache_resource
+def get_startup_profile():
+    """Startup phases of this process, recorded from the first page load."""
+    profile = StartupProfile(started=_script_started)
+    profile.record("import app modules", _imports_done - _script_started)
+    return profile
+
+
+def import_pipeline():
+    """
+    Import the graph and LLM stack on first use. These modules pull in
+    langchain, langgraph and playwright and dominate cold-start time, so
+    they are kept off the login page.
+    """
+    if "agent.runner" in sys.modules:
+        return
+    with get_startup_profile().phase("import pipeline modules"):
+        import agent.runner  # noqa: F401
+
+
+# === Shared LLM Rate Governor ===
+@st.cache_resource
+def get_rate_governor():
+    """One RPM/TPM governor shared by every session in this process."""
+    from agent.llm.governor import RateGovernor
 
-    # Remove existing handlers to avoid duplicates
-    logger.handlers.clear()
+    governor = RateGovernor.from_env()
+    logger.info(
+        f"LLM rate governor: {governor.requests.capacity:.0f} RPM, "
+        f"{governor.tokens.capacity:.0f} TPM"
+    )
+    return governor
 
-    # File handler - writes to log file
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(logging.Formatter(log_format, date_format))
 
-    # Console handler - writes to terminal/console
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(logging.Formatter(log_format, date_format))
+# === Background Job Runner ===
+@st.cache_resource
+def get_job_runner():
+    """
+    Worker pool shared by every session in this process. Analyses run as
+    jobs in the background, so reruns and page reloads do not stop them.
+    """
+    import_pipeline()
+    from agent.runner import JobRunner
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Seed the stores from the legacy JSON files before any job writes
+    get_article_store()
+    get_history_store()
+    return JobRunner(get_rate_governor(), get_job_store())
 
-    return logger
 
+@st.cache_resource
+def get_job_store():
+    """Job table, with jobs left unfinished by a previous process flagged."""
+    from agent.storage.jobs import get_job_store as open_job_store
 
-# Initialize logger
-logger = setup_logging()
-logger.info("=" * 60)
-logger.info("SPICE Application Started")
-logger.info("=" * 60)
+    store = open_job_store()
+    interrupted = store.mark_interrupted()
+    if interrupted:
+        logger.warning(f"Marked {interrupted} unfinished job(s) as interrupted")
+    return store
 
 
-# === Install Playwright Browsers ===
+def loaded_job_runner():
+    """The job runner if a run already loaded the pipeline, else None."""
+    return get_job_runner() if "agent.runner" in sys.modules else None
+
+
+# === Listing Monitor ===
 @st.cache_resource
-def install_playwright_browsers():
-    """Install Playwright browsers if not already installed. Runs once per deployment."""
-    try:
-        logger.info("Checking Playwright browser installation...")
-
-        # Install all browsers (chromium, firefox, webkit)
-        browsers = ["chromium", "firefox", "webkit"]
-        for browser in browsers:
-            logger.info(f"Installing {browser}...")
-            result = subprocess.run(
-                [sys.executable, "-m", "playwright", "install", browser],
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout per browser
-            )
+def get_monitor_store():
+    """Counters written by the `agent.monitor` daemon, if it has run."""
+    from agent.storage.monitor import get_monitor_store as open_monitor_store
 
-            if result.returncode == 0:
-                logger.info(f"✓ Playwright {browser} browser installed successfully")
-            else:
-                logger.warning(
-                    f"Playwright {browser} install returned code {result.returncode}"
-                )
-                logger.warning(f"stderr: {result.stderr}")
-
-        # Also try to install system dependencies (may fail on some systems, that's ok)
-        try:
-            logger.info("Installing system dependencies...")
-            subprocess.run(
-                [sys.executable, "-m", "playwright", "install-deps"],
-                capture_output=True,
-                text=True,
-                timeout=300,
-            )
-            logger.info("✓ Playwright system dependencies installed")
-        except Exception as e:
-            logger.warning(
-                f"Could not install system deps (may be already present): {e}"
-            )
+    return open_monitor_store()
 
-        return True
-    except subprocess.TimeoutExpired:
-        logger.error("❌ Playwright installation timed out")
-        return False
-    except Exception as e:
-        logger.error(f"❌ Error installing Playwright browsers: {e}", exc_info=True)
-        return False
 
+# === Scraped Article Store ===
+@st.cache_resource
+def get_article_store():
+    """SQLite store of scraped links, seeded once from all_articles.json."""
+    from agent.storage.articles import get_article_store as open_article_store
 
-# Install browsers on startup
-logger.info("Running Playwright browser installation check...")
-install_playwright_browsers()
-logger.info("Playwright setup complete")
+    store = open_article_store()
+    store.import_json()
+    return store
 
 
 # === Authentication ===
@@ -168,17 +183,12 @@ def check_password():
     return True
 
 
-# === Default configuration ===
-DEFAULT_WEBSITES = {
-    "NEA": "https://www.nea.gov.sg/media/news",
-    "PUB": "https://www.pub.gov.sg/Resources/News-Room/PressReleases",
-    "BCA": "https://www1.bca.gov.sg/about-us/news-and-publications/media-releases",
-    "IMDA": "https://www.imda.gov.sg/resources/press-releases-factsheets-and-speeches",
-}
-
 # === Session State Init ===
 st.set_page_config(page_title="SPICE Outreach System", layout="wide")
 
+startup_profile = get_startup_profile()
+startup_profile.mark("login page ready")
+
 # Check authentication before showing app
 if not check_password():
     st.stop()  # Don't continue if not authenticated
@@ -191,89 +201,271 @@ if "output" not in st.session_state:
     st.session_state.output = None
 if "selected_article_index" not in st.session_state:
     st.session_state.selected_article_index = 0
-if "analysis_history" not in st.session_state:
-    st.session_state.analysis_history = []
 
 
 # === Helper Functions ===
-def load_analysis_history():
-    """Load analysis history from file."""
-    history_path = Path("analysis_history.json")
-    if history_path.exists():
-        try:
-            with open(history_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading analysis history: {e}")
-    return []
-
-
-def save_analysis_history(history):
-    """Save analysis history to file."""
-    history_path = Path("analysis_history.json")
-    try:
-        with open(history_path, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=2, ensure_ascii=False, default=str)
-        logger.info(f"Saved analysis history with {len(history)} entries")
-    except Exception as e:
-        logger.error(f"Error saving analysis history: {e}")
-
-
-def add_to_history(result, agency, browser, headless):
-    """Add current analysis result to history."""
-    history_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "agency": agency,
-        "browser": browser,
-        "headless": headless,
-        "articles_count": len(result.get("articles", [])),
-        "relevant_count": sum(
-            1 for a in result.get("articles", []) if a.relevance.is_relevant
-        ),
-        "articles": [
-            {
-                "title": a.title,
-                "url": a.url,
-                "host": a.host,
-                "body": a.body,
-                "relevance": {
-                    "is_relevant": a.relevance.is_relevant,
-                    "reason": a.relevance.reason,
-                },
-                "business_entities": [
-                    {"name": e.name, "type": e.type, "role": e.role}
-                    for e in (a.business_entities or [])
-                ],
-                "opportunity": (
-                    {
-                        "opportunity": a.opportunity.opportunity,
-                        "justification": a.opportunity.justification,
-                    }
-                    if a.opportunity
-                    else None
-                ),
-                "email_drafts": a.email_drafts or {},
-            }
-            for a in result.get("articles", [])
-        ],
-    }
+@st.cache_resource
+def get_history_store():
+    """Analysis history store, seeded once from analysis_history.json."""
+    from agent.storage.history import get_history_store as open_history_store
+
+    store = open_history_store()
+    store.import_json()
+    return store
+
+
+# History queries are cached per database file and history version (the
+# latest run id), so reruns only query what changed. A run's articles never
+# change once written, so those loaders are keyed on the run alone.
+HISTORY_PAGE_SIZE = 20
+HISTORY_ARTICLE_PAGE_SIZE = 25
+
+
+def truncate_title(title, max_length=100):
+    return title if len(title) <= max_length else title[: max_length - 3] + "..."
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_history_overview(db_path, version):
+    """Run count and blob storage figures."""
+    store = get_history_store()
+    return {"runs": store.count_runs(), "blobs": store.storage_stats()}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_history_page(db_path, version, page):
+    """One page of run metadata (most recent first) with selector labels."""
+    offset = page * HISTORY_PAGE_SIZE
+    runs = get_history_store().list_runs(limit=HISTORY_PAGE_SIZE, offset=offset)
+    for i, run in enumerate(runs):
+        run["label"] = (
+            f"{offset + i + 1}. "
+            f"{datetime.fromisoformat(run['timestamp']).strftime('%Y-%m-%d %H:%M')} - "
+            f"{run['agency']} ({run['relevant_count']}/{run['articles_count']} relevant)"
+        )
+    return runs
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_run_articles(db_path, run_id, page):
+    """One page of a run's article list (relevant first), with labels."""
+    offset = page * HISTORY_ARTICLE_PAGE_SIZE
+    articles = get_history_store().list_articles(
+        run_id, limit=HISTORY_ARTICLE_PAGE_SIZE, offset=offset, relevant_first=True
+    )
+    for i, article in enumerate(articles):
+        article["label"] = (
+            f"{offset + i + 1}. {truncate_title(article.get('title', 'Untitled'))}  "
+            f"{'✅ Relevant' if article['is_relevant'] else '❌ Not Relevant'}"
+        )
+    return articles
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_run_details(db_path, run_id):
+    """Full run record: metadata, usage report and metrics."""
+    return get_history_store().get_run(run_id)
 
-    # Load existing history
-    history = load_analysis_history()
-    history.append(history_entry)
 
-    # Keep only last 50 entries to avoid file getting too large
-    if len(history) > 50:
-        history = history[-50:]
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_history_article(db_path, run_id, position):
+    """Full stored article, texts included."""
+    return get_history_store().get_article(run_id, position)
 
-    save_analysis_history(history)
-    st.session_state.analysis_history = history
-    return history
 
+@st.cache_data(max_entries=128, ttl=3600, show_spinner=False)
+def search_history(db_path, version, query):
+    started = time.perf_counter()
+    hits = get_history_store().search(query)
+    return hits, (time.perf_counter() - started) * 1000
+
+
+def page_selector(total, page_size, key):
+    """Page number input (0-based result) when `total` items span several pages."""
+    pages = max(1, -(-total // page_size))
+    if pages == 1:
+        return 0
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = st.number_input(
+            "Page", min_value=1, max_value=pages, value=1, step=1, key=key
+        )
+    with col2:
+        st.caption(
+            f"Page {page} of {pages} · items {(page - 1) * page_size + 1}–"
+            f"{min(page * page_size, total)} of {total}"
+        )
+    return page - 1
+
+
+def metrics_rows(items, key):
+    return [
+        {
+            key: name,
+            "Time (s)": round(m["seconds"], 2),
+            "LLM calls": m["calls"],
+            "Prompt tokens": m["input_tokens"],
+            "Completion tokens": m["output_tokens"],
+            "Cache hits": m["cache_hits"],
+            "Cost ($)": round(m["cost"], 5),
+        }
+        for name, m in items.items()
+    ]
+
+
+def render_run_metrics(run, metrics):
+    """Per-node and per-article time, tokens and cost of a run, with exports."""
+    from agent.metrics import to_json, to_prometheus
+
+    with st.expander(
+        f"📊 Run Metrics: {metrics['seconds']:.1f}s, "
+        f"{metrics['calls']} LLM calls, ${metrics['cost']:.4f}"
+    ):
+        st.markdown("**By node**")
+        st.dataframe(metrics_rows(metrics["nodes"], "Node"), hide_index=True)
+        if metrics["articles"]:
+            st.markdown("**By article**")
+            st.dataframe(metrics_rows(metrics["articles"], "Article"), hide_index=True)
+
+        export = [
+            {"labels": {"agency": run["agency"], "run": run["id"]}, "metrics": metrics}
+        ]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "⬇️ Prometheus",
+                to_prometheus(export),
+                file_name=f"spice_run_{run['id']}.prom",
+                mime="text/plain",
+            )
+        with col2:
+            st.download_button(
+                "⬇️ JSON",
+                to_json(export),
+                file_name=f"spice_run_{run['id']}.json",
+                mime="application/json",
+            )
+
+
+JOB_STATUS_ICONS = {
+    "queued": "🕓",
+    "running": "⏳",
+    "succeeded": "✅",
+    "failed": "❌",
+    "interrupted": "⚠️",
+    "resumed": "🔁",
+}
+NODE_STATUS_ICONS = {"running": "⏳", "done": "✅", "failed": "❌"}
+
+
+def render_job(job, show_articles=True):
+    """Status, per-node progress and live article view of one analysis job."""
+    icon = JOB_STATUS_ICONS.get(job["status"], "")
+    started = job["started_at"] or job["created_at"]
+    ended = job["finished_at"] or datetime.now().isoformat()
+    elapsed = datetime.fromisoformat(ended) - datetime.fromisoformat(started)
+    st.markdown(
+        f"**{icon} {job['agency']}** — {job['status']} "
+        f"({elapsed.total_seconds():.0f}s)"
+    )
+
+    nodes = job["nodes"] or {}
+    if nodes:
+        st.caption(
+            " → ".join(
+                f"{NODE_STATUS_ICONS.get(n['status'], '')} {name}"
+                + (f" ×{n['done']}" if n["done"] > 1 else "")
+                for name, n in nodes.items()
+            )
+        )
+
+    articles = job["articles"] or {}
+    if show_articles and articles:
+        with st.expander(
+            f"📰 {len(articles)} article(s)", expanded=job["status"] == "running"
+        ):
+            for url, a in articles.items():
+                verdict = {True: "✅", False: "❌"}.get(a.get("relevant"), "…")
+                lines = [
+                    f"{verdict} **{a.get('title') or url}** — [View Original]({url})"
+                ]
+                if a.get("summary"):
+                    lines.append(f"📃 {a['summary']}")
+                elif a.get("live") and a.get("stage") == "summary_started":
+                    lines.append(f"📃 {a['live']}▌")
+                if a.get("entities"):
+                    lines.append(f"🏢 {', '.join(a['entities'])}")
+                if a.get("opportunity"):
+                    lines.append(f"🚀 {a['opportunity']}")
+                if a.get("emails"):
+                    lines.append(f"📧 Drafts for {', '.join(a['emails'])}")
+                if a.get("live") and a.get("stage") == "email_started":
+                    lines.append(f"📧 {a['live']}▌")
+                st.markdown("  \n".join(lines))
+
+    if job["usage"] and job["usage"]["total_calls"]:
+        usage = job["usage"]
+        st.caption(
+            f"💰 ${usage['total_cost']:.4f} over {usage['total_calls']} model calls"
+        )
+    skipped = ((job["usage"] or {}).get("budget") or {}).get("skipped")
+    if skipped:
+        st.warning(
+            "💵 Budget reached, skipped: "
+            + ", ".join(f"{stage} ×{len(urls)}" for stage, urls in skipped.items())
+        )
+    if job["error"]:
+        st.error(f"❌ Error during analysis:\n\n`{job['error']}`")
+
+    if job["status"] in ("failed", "interrupted"):
+        if st.button(
+            "🔁 Resume",
+            key=f"resume_{job['id']}",
+            help="Continue the run from its checkpoint; completed articles and stages are not redone.",
+        ):
+            with st.spinner("Resuming analysis..."):
+                st.session_state.viewing_job = get_job_runner().resume(job["id"])
+            st.rerun()
+    elif job["status"] == "succeeded" and job["id"] != st.session_state.get(
+        "loaded_job"
+    ):
+        runner = loaded_job_runner()
+        if runner and runner.result(job["id"]) is not None:
+            if st.button("📄 View Results", key=f"view_{job['id']}"):
+                st.session_state.viewing_job = job["id"]
+                st.rerun()
+        elif job["run_id"]:
+            st.caption("Results are in the 📚 Analysis History tab.")
+
+
+@st.fragment(run_every=2)
+def jobs_panel(show_articles):
+    """Polls the job table; reruns the whole page when a viewed job finishes."""
+    jobs = get_job_store().list_jobs(limit=10)
+    if not jobs:
+        st.info("No analyses yet. Configure a run in the sidebar.")
+        return
+
+    for job in jobs:
+        with st.container(border=True):
+            render_job(job, show_articles)
+
+    runner = loaded_job_runner()
+    viewing = st.session_state.get("viewing_job")
+    if runner and viewing and viewing != st.session_state.get("loaded_job"):
+        # None once other jobs have pushed it out (it is in the history then)
+        output = runner.result(viewing)
+        if output is not None:
+            st.session_state.output = output
+            st.session_state.loaded_job = viewing
+            st.session_state.selected_article_index = 0
+            st.rerun(scope="app")
+
+    governor_stats = get_rate_governor().stats() if runner else None
+    if governor_stats:
+        with st.expander("⏱️ LLM Rate Governor (since startup)"):
+            st.table(governor_stats)
 
-# Load history on startup
-if not st.session_state.analysis_history:
-    st.session_state.analysis_history = load_analysis_history()
 
 # === Sidebar Controls ===
 with st.sidebar:
@@ -326,89 +518,153 @@ with st.sidebar:
     headless = st.checkbox("Headless Mode", value=True)
     st.session_state.headless = headless
 
-    run_analysis = st.button("🔍 Run Scraper & Analyze Articles")
-
-# === Run Analysis Button ===
-st.markdown("## 🚀 Run Scraper & Analyze Articles")
-if run_analysis:
-    logger.info("=" * 60)
-    logger.info(f"Analysis started for agency: {agency}")
-    logger.info(
-        f"Browser: {st.session_state.browser}, Headless: {st.session_state.headless}"
+    stream_live = st.checkbox(
+        "Stream Results Live",
+        value=True,
+        help="Show articles, relevance verdicts and email drafts of running analyses as they are produced.",
     )
 
-    with st.spinner("Fetching and analyzing articles..."):
-        scraped_path = Path("all_articles.json")
-        logger.info(f"Loading scraped articles from: {scraped_path.resolve()}")
+    with st.expander("🧭 Model Routing"):
+        model_names = list(MODEL_PRICING.keys())
+        st.session_state.cheap_model = st.selectbox(
+            "Relevance & link filter model",
+            model_names,
+            index=model_names.index("gpt-4.1-nano"),
+            help="Cheap first-pass model for classification stages.",
+        )
+        st.session_state.escalation_model = st.selectbox(
+            "Escalation model",
+            model_names,
+            index=model_names.index("gpt-4o-mini"),
+            help="Re-checks positive or low-confidence verdicts.",
+        )
+        st.session_state.escalation_threshold = st.slider(
+            "Escalate below confidence", 0.0, 1.0, 0.7, 0.05
+        )
+        st.session_state.default_model = st.selectbox(
+            "Summary, BEI, opportunity & email model",
+            model_names,
+            index=model_names.index("gpt-4o-mini"),
+        )
+        st.session_state.analysis_text = st.radio(
+            "BEI, opportunity & email read",
+            ["summary", "body"],
+            format_func=lambda x: "Summary" if x == "summary" else "Full article",
+            horizontal=True,
+        )
 
-        scraped_articles = (
-            json.loads(scraped_path.read_text(encoding="utf-8"))
-            if scraped_path.exists()
-            else {}
+    with st.expander("💵 Run Budget"):
+        st.caption(
+            "When a run nears its budget, email drafting and then opportunity "
+            "identification are skipped for the remaining articles. 0 uses "
+            "the SPICE_RUN_MAX_* defaults."
+        )
+        st.session_state.max_cost = st.number_input(
+            "Max cost ($)", min_value=0.0, value=0.0, step=0.05, format="%.2f"
+        )
+        st.session_state.max_calls = st.number_input(
+            "Max LLM calls", min_value=0, value=0, step=10
         )
-        logger.info(f"Loaded {len(scraped_articles)} previously scraped articles")
-
-        model = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        graph = build_graph().compile()
-        logger.info("Graph compiled successfully")
-
-        try:
-            inputs = {
-                "model": model,
-                "spice_context": SPICE_CONTEXT,
-                "websites": st.session_state.websites,
-                "website_selected": agency,
-                "max_results": 10,
-                "scraped_articles": scraped_articles,
-                "headless": st.session_state.headless,
-                "browser": st.session_state.browser,
-            }
-
-            logger.info("Invoking graph with inputs...")
-            result = graph.invoke(inputs)
-            logger.info("Graph execution completed")
-
-            st.session_state.output = result
-
-            # Save updated article state
-            scraped_path.write_text(
-                json.dumps(
-                    result.get("scraped_articles", scraped_articles),
-                    indent=2,
-                    ensure_ascii=False,
-                ),
-                encoding="utf-8",
+
+    fan_out = st.checkbox(
+        "Pipeline Articles in Parallel",
+        value=False,
+        help=(
+            "Run each article through relevance → summary → BEI → opportunity "
+            "→ email on its own instead of stage by stage."
+        ),
+    )
+
+    stream = st.checkbox(
+        "Analyze While Scraping",
+        value=False,
+        help=(
+            "Send each article to analysis as soon as its page is read, while "
+            "the rest of the listing is still being scraped."
+        ),
+    )
+
+    slim_state = st.checkbox(
+        "Slim Graph State",
+        value=True,
+        help=(
+            "Keep only article references in the run's state and checkpoints; "
+            "the viewer reads the articles from the analysis history."
+        ),
+    )
+
+    run_analysis = st.button("🔍 Run Scraper & Analyze Articles")
+
+    with st.expander("⏱️ Startup Profile"):
+        st.table(startup_profile.report())
+
+    monitor_stats = get_monitor_store().list_watches()
+    if monitor_stats:
+        with st.expander("📡 Listing Monitor"):
+            st.caption(
+                "Polls by `python -m agent.monitor`; skipped polls ran no analysis."
             )
-            logger.info(
-                f"Saved {len(result.get('scraped_articles', {}))} articles to {scraped_path}"
+            st.dataframe(
+                [
+                    {
+                        "Agency": w["agency"],
+                        "Every (s)": int(w["interval"]),
+                        "Polls": w["polls"],
+                        "Triggers": w["triggers"],
+                        "Errors": w["errors"],
+                        "Skipped": (
+                            f"{w['skip_ratio']:.0%}"
+                            if w["skip_ratio"] is not None
+                            else "-"
+                        ),
+                        "Last poll": (w["last_polled"] or "")[:19],
+                    }
+                    for w in monitor_stats
+                ],
+                hide_index=True,
             )
 
-            articles = result.get("articles", [])
-            if articles:
-                relevant_count = sum(1 for a in articles if a.relevance.is_relevant)
-                logger.info(
-                    f"Found {len(articles)} articles, {relevant_count} relevant"
-                )
-                st.success(f"✅ Found {len(articles)} relevant article(s).")
-                st.session_state.selected_article_index = 0
 
-                # Add to history
-                add_to_history(
-                    result, agency, st.session_state.browser, st.session_state.headless
-                )
-                logger.info("Analysis added to history")
-            else:
-                logger.warning("No articles found in result")
+# === Run Analysis Button ===
+st.markdown("## 🚀 Run Scraper & Analyze Articles")
+run_status = st.container()
 
-        except Exception as e:
-            logger.error(f"Error during analysis: {str(e)}", exc_info=True)
-            st.error(f"❌ Error during analysis:\n\n`{e}`")
+# === Tabbed Interface for Current Analysis and History ===
+tab1, tab2 = st.tabs(["📊 Current Analysis", "📚 Analysis History"])
+
+if run_analysis:
+    from agent.runner import AnalysisRequest
 
-    logger.info("Analysis completed")
     logger.info("=" * 60)
+    logger.info(f"Analysis submitted for agency: {agency}")
+    logger.info(
+        f"Browser: {st.session_state.browser}, Headless: {st.session_state.headless}"
+    )
+    request = AnalysisRequest(
+        agency=agency,
+        listing_url=st.session_state.websites[agency],
+        browser=st.session_state.browser,
+        headless=st.session_state.headless,
+        fan_out=fan_out,
+        stream=stream,
+        slim_state=slim_state,
+        default_model=st.session_state.default_model,
+        cheap_model=st.session_state.cheap_model,
+        escalation_model=st.session_state.escalation_model,
+        escalation_threshold=st.session_state.escalation_threshold,
+        analysis_text=st.session_state.analysis_text,
+        max_cost=st.session_state.max_cost or None,
+        max_calls=st.session_state.max_calls or None,
+    )
+    # Importing the pipeline on the first run can take a few seconds
+    with st.spinner("Starting analysis..."):
+        runner = get_job_runner()
+    st.session_state.viewing_job = runner.submit(request)
+    st.toast(f"🚀 Analysis of {agency} started")
+
+with run_status:
+    jobs_panel(stream_live)
 
-# === Tabbed Interface for Current Analysis and History ===
-tab1, tab2 = st.tabs(["📊 Current Analysis", "📚 Analysis History"])
 
 with tab1:
     # === Article Viewer (Current Analysis) ===
@@ -416,25 +672,20 @@ with tab1:
     if output:
         articles = output.get("articles", [])
         if articles:
+            from agent.templates import ArticleRef, NewsArticle
+
             logger.debug(f"Displaying {len(articles)} articles in viewer")
             st.markdown("## 📄 Article Review Panel")
+            # Positions are kept: slim runs are read back from the history
             articles_sorted = sorted(
-                articles, key=lambda a: not a.relevance.is_relevant
+                enumerate(articles), key=lambda item: not item[1].is_relevant
             )
 
-            # Helper to truncate titles
-            def truncate_title(title, max_length=100):
-                return (
-                    title
-                    if len(title) <= max_length
-                    else title[: max_length - 3] + "..."
-                )
-
             # Build labels showing truncated title + relevance in backticks
             labels = [
                 f"{i + 1}. {truncate_title(article.title)}  "
-                f"{'✅ Relevant' if article.relevance.is_relevant else '❌ Not Relevant'}"
-                for i, article in enumerate(articles_sorted)
+                f"{'✅ Relevant' if article.is_relevant else '❌ Not Relevant'}"
+                for i, (_, article) in enumerate(articles_sorted)
             ]
 
             # Streamlit selectbox
@@ -445,7 +696,12 @@ with tab1:
             )
 
             # Get the selected article
-            article = articles_sorted[selected_index]
+            position, article = articles_sorted[selected_index]
+            if isinstance(article, ArticleRef):
+                run_id = get_job_store().get(st.session_state.loaded_job)["run_id"]
+                article = NewsArticle.model_validate(
+                    load_history_article(get_history_store().path, run_id, position)
+                )
             logger.debug(f"User selected article: {article.title[:50]}...")
 
             # === Relevance
@@ -459,8 +715,14 @@ with tab1:
             st.markdown(
                 f"**🔗 URL:** [View Original]({article.url})", unsafe_allow_html=True
             )
-            st.markdown("**📃 Content:**")
-            st.write(article.body)
+            if article.summary:
+                st.markdown("**📝 Summary:**")
+                st.write(article.summary)
+                with st.expander("📃 Full Content"):
+                    st.write(article.body)
+            else:
+                st.markdown("**📃 Content:**")
+                st.write(article.body)
 
             # === Business Entities
             st.markdown("### 🏢 Detected Business Entities")
@@ -496,28 +758,58 @@ with tab2:
     # === Analysis History Viewer ===
     st.markdown("## 📚 Analysis History")
 
-    history = st.session_state.analysis_history
-    if history:
-        st.markdown(f"**Total historical analyses:** {len(history)}")
+    history_store = get_history_store()
+    history_db = history_store.path
+    history_version = history_store.version()
 
-        # Reverse to show most recent first
-        history_reversed = list(reversed(history))
+    # === Full-text search across past analyses ===
+    search_query = st.text_input(
+        "🔎 Search past analyses",
+        placeholder="Company, opportunity, keyword...",
+        help="Searches titles, article text, entities, opportunities and email drafts.",
+    )
+    if search_query.strip():
+        hits, elapsed_ms = search_history(
+            history_db, history_version, search_query.strip()
+        )
+        st.caption(f"{len(hits)} match(es) in {elapsed_ms:.1f} ms")
+        for hit in hits:
+            with st.container(border=True):
+                st.markdown(
+                    f"**{hit['title']}** {'✅' if hit['is_relevant'] else '❌'}  \n"
+                    f"{hit['agency']} · "
+                    f"{datetime.fromisoformat(hit['timestamp']).strftime('%Y-%m-%d %H:%M')}"
+                    f" · [View Original]({hit['url']})"
+                )
+                st.markdown(hit["snippet"])
+        st.markdown("---")
+
+    # Run metadata only, one page at a time; article payloads are loaded
+    # for the viewed article only
+    overview = load_history_overview(history_db, history_version)
+    if overview["runs"]:
+        st.markdown(f"**Total historical analyses:** {overview['runs']}")
+        blob_stats = overview["blobs"]
+        if blob_stats["blobs"]:
+            st.caption(
+                f"Article texts: {blob_stats['blobs']} unique, "
+                f"{blob_stats['bytes'] / 1024:.0f} KB stored as "
+                f"{blob_stats['stored_bytes'] / 1024:.0f} KB compressed"
+            )
 
-        # Create selection options
-        history_options = [
-            f"{i+1}. {datetime.fromisoformat(h['timestamp']).strftime('%Y-%m-%d %H:%M')} - "
-            f"{h['agency']} ({h['relevant_count']}/{h['articles_count']} relevant)"
-            for i, h in enumerate(history_reversed)
-        ]
+        history_page = page_selector(
+            overview["runs"], HISTORY_PAGE_SIZE, key="history_page"
+        )
+        history = load_history_page(history_db, history_version, history_page)
 
         selected_history_idx = st.selectbox(
             "Select a past analysis to view:",
-            options=range(len(history_options)),
-            format_func=lambda i: history_options[i],
+            options=range(len(history)),
+            format_func=lambda i: history[i]["label"],
         )
 
         if selected_history_idx is not None:
-            selected_history = history_reversed[selected_history_idx]
+            selected_history = history[selected_history_idx]
 
             # Display metadata
             col1, col2, col3, col4 = st.columns(4)
@@ -533,43 +825,42 @@ with tab2:
             st.markdown(
                 f"**Timestamp:** {datetime.fromisoformat(selected_history['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}"
             )
-            st.markdown(f"**Headless Mode:** {selected_history['headless']}")
+            st.markdown(f"**Headless Mode:** {bool(selected_history['headless'])}")
+
+            run_metrics = load_run_details(history_db, selected_history["id"])[
+                "metrics"
+            ]
+            if run_metrics:
+                render_run_metrics(selected_history, run_metrics)
 
             st.markdown("---")
 
-            # Display articles from history
-            hist_articles = selected_history.get("articles", [])
-            if hist_articles:
+            # Display articles from history (relevant first)
+            if selected_history["articles_count"]:
                 st.markdown("### Articles from this analysis")
 
-                # Sort by relevance
-                hist_articles_sorted = sorted(
-                    hist_articles,
-                    key=lambda a: not a.get("relevance", {}).get("is_relevant", False),
+                article_page = page_selector(
+                    selected_history["articles_count"],
+                    HISTORY_ARTICLE_PAGE_SIZE,
+                    key=f"history_article_page_{selected_history['id']}",
+                )
+                hist_articles = load_run_articles(
+                    history_db, selected_history["id"], article_page
                 )
-
-                def truncate_title_hist(title, max_length=100):
-                    return (
-                        title
-                        if len(title) <= max_length
-                        else title[: max_length - 3] + "..."
-                    )
-
-                hist_labels = [
-                    f"{i + 1}. {truncate_title_hist(a.get('title', 'Untitled'))}  "
-                    f"{'✅ Relevant' if a.get('relevance', {}).get('is_relevant', False) else '❌ Not Relevant'}"
-                    for i, a in enumerate(hist_articles_sorted)
-                ]
 
                 selected_hist_article_idx = st.selectbox(
                     "🗂️ Select Article from History",
-                    options=range(len(hist_articles_sorted)),
-                    format_func=lambda i: hist_labels[i],
+                    options=range(len(hist_articles)),
+                    format_func=lambda i: hist_articles[i]["label"],
                     key="history_article_select",
                 )
 
                 if selected_hist_article_idx is not None:
-                    hist_article = hist_articles_sorted[selected_hist_article_idx]
+                    hist_article = load_history_article(
+                        history_db,
+                        selected_history["id"],
+                        hist_articles[selected_hist_article_idx]["position"],
+                    )
 
                     # Display article details
                     st.markdown("### 🧠 Relevance Assessment")
@@ -588,8 +879,14 @@ with tab2:
                         f"**🔗 URL:** [View Original]({hist_article.get('url', '#')})",
                         unsafe_allow_html=True,
                     )
-                    st.markdown("**📃 Content:**")
-                    st.write(hist_article.get("body", "No content available"))
+                    if hist_article.get("summary"):
+                        st.markdown("**📝 Summary:**")
+                        st.write(hist_article["summary"])
+                        with st.expander("📃 Full Content"):
+                            st.write(hist_article.get("body", "No content available"))
+                    else:
+                        st.markdown("**📃 Content:**")
+                        st.write(hist_article.get("body", "No content available"))
 
                     st.markdown("### 🏢 Detected Business Entities")
                     entities = hist_article.get("business_entities", [])
@@ -0,0 +1,298 @@
+"""
+End-to-end benchmark: runs the analysis graph against a local fixture
+server (see fixture_server.py) with the offline, schema-valid chat model,
+and reports articles per minute, per-stage latency percentiles and peak RSS.
+
+    python -m benchmarks.e2e --articles 20 --iterations 3 --out bench.json
+    python -m benchmarks.e2e --fan-out --compare bench.json
+
+Results are written as JSON (with the git commit) so runs can be compared
+commit to commit. `--fetcher http` swaps Playwright for a plain HTTP
+stand-in, for machines without browsers; the default uses Playwright.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from benchmarks.fixture_server import FixtureSite, serve
+
+# Set up logger for this module
+logger = logging.getLogger("spice.benchmark")
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile of `values` (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(samples: Dict[str, List[float]]) -> Dict[str, dict]:
+    return {
+        name: {
+            "n": len(values),
+            **{f"p{p}": percentile(values, p) for p in PERCENTILES},
+            "max": max(values),
+        }
+        for name, values in sorted(samples.items())
+        if values
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its reaped children."""
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2**20,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        * unit
+        / 2**20,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# === Benchmark ===
+def run_benchmark(args) -> dict:
+    # Imported after the environment is set up in main()
+    from agent.llm.governor import RateGovernor
+    from agent.runner import AnalysisRequest, run_analysis
+
+    site = FixtureSite(
+        articles=args.articles,
+        paragraphs=args.paragraphs,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        seed=args.seed,
+    )
+    # Limits high enough that the governor never throttles the offline model
+    governor = RateGovernor(rpm=1_000_000, tpm=1_000_000_000)
+
+    stage_samples = defaultdict(list)
+    node_samples = defaultdict(list)
+    articles = calls = 0
+    iterations = []
+    with serve(site) as base:
+        for iteration in range(args.warmup + args.iterations):
+            warmup = iteration < args.warmup
+            requests = [
+                AnalysisRequest(
+                    agency=agency,
+                    listing_url=f"{base}/run-{iteration}/{agency.lower()}/news",
+                    browser=args.browser,
+                    fan_out=args.fan_out,
+                    stream=args.stream,
+                    max_results=args.articles,
+                )
+                for agency in args.agencies
+            ]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                outcomes = list(
+                    executor.map(lambda r: run_analysis(r, governor), requests)
+                )
+            seconds = time.perf_counter() - started
+
+            processed = sum(len(o["state"].get("articles", [])) for o in outcomes)
+            logger.info(
+                f"{'Warm-up' if warmup else 'Iteration'} {iteration + 1}: "
+                f"{processed} articles in {seconds:.2f}s"
+            )
+            if warmup:
+                continue
+            iterations.append({"articles": processed, "seconds": seconds})
+            articles += processed
+            for outcome in outcomes:
+                metrics = outcome["metrics"]
+                calls += metrics["calls"]
+                for name, node in metrics["nodes"].items():
+                    if node["runs"]:
+                        node_samples[name].append(node["seconds"] / node["runs"])
+                for article in metrics["articles"].values():
+                    for stage, stage_seconds in article["stages"].items():
+                        stage_samples[stage].append(stage_seconds)
+
+    seconds = sum(i["seconds"] for i in iterations)
+    return {
+        "articles": articles,
+        "seconds": seconds,
+        "articles_per_minute": articles / seconds * 60 if seconds else 0.0,
+        "llm_calls": calls,
+        "iterations": iterations,
+        "stages": latency_summary(stage_samples),
+        "nodes": latency_summary(node_samples),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# === Reporting ===
+def print_report(result: dict, baseline: Optional[dict] = None) -> None:
+    def delta(current: float, previous: Optional[float]) -> str:
+        if not previous:
+            return ""
+        return f" ({(current - previous) / previous:+.0%})"
+
+    base = (baseline or {}).get("results", {})
+    print(
+        f"\nArticles/min: {result['articles_per_minute']:.1f}"
+        f"{delta(result['articles_per_minute'], base.get('articles_per_minute'))}"
+        f"  ({result['articles']} articles in {result['seconds']:.1f}s, "
+        f"{result['llm_calls']} LLM calls)"
+    )
+    rss = result["peak_rss_mb"]
+    print(
+        f"Peak RSS: {rss['self']:.0f} MB"
+        f"{delta(rss['self'], base.get('peak_rss_mb', {}).get('self'))}"
+        f" (children {rss['children']:.0f} MB)"
+    )
+    for title, key in (("Per-article stage", "stages"), ("Per-node call", "nodes")):
+        print(
+            f"\n{title + ' latency (s)':<34} {'n':>5}"
+            + "".join(f" {f'p{p}':>14}" for p in PERCENTILES)
+        )
+        for name, stats in result[key].items():
+            previous = base.get(key, {}).get(name, {})
+            print(
+                f"{name:<34} {stats['n']:>5}"
+                + "".join(
+                    f" {stats[f'p{p}']:>7.3f}{delta(stats[f'p{p}'], previous.get(f'p{p}')):>7}"
+                    for p in PERCENTILES
+                )
+            )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.e2e",
+        description="End-to-end pipeline benchmark against local fixture sites.",
+    )
+    parser.add_argument("--agencies", nargs="+", default=["NEA", "PUB"])
+    parser.add_argument(
+        "--articles", type=int, default=10, help="Press releases per listing page"
+    )
+    parser.add_argument(
+        "--paragraphs", type=int, default=8, help="Paragraphs per press release"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=50.0, help="Fixture server latency"
+    )
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.2, help="Offline model latency (s)"
+    )
+    parser.add_argument("--llm-latency-jitter", type=float, default=0.0)
+    parser.add_argument("--iterations", type=int, default=2)
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed iterations run first"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Agencies run at the same time"
+    )
+    parser.add_argument("--fan-out", action="store_true")
+    parser.add_argument(
+        "--stream", action="store_true", help="Analyze articles as they are scraped"
+    )
+    parser.add_argument(
+        "--browser", choices=("firefox", "chromium", "webkit"), default="chromium"
+    )
+    parser.add_argument(
+        "--fetcher",
+        choices=("playwright", "http"),
+        default="playwright",
+        help="http: plain HTTP stand-in for Playwright (no browser costs)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", metavar="PATH", help="Write results as JSON")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="Show changes against earlier results"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("spice").setLevel(
+        logging.INFO if args.verbose else logging.WARNING
+    )
+    logger.setLevel(logging.INFO)
+
+    # Throwaway stores and the offline model, set before agent modules load
+    workdir = tempfile.mkdtemp(prefix="spice-bench-")
+    os.environ.update(
+        SPICE_DB=os.path.join(workdir, "spice.db"),
+        SPICE_CHECKPOINT_DB=os.path.join(workdir, "checkpoints.sqlite"),
+        SPICE_LLM_BACKEND="offline",
+        SPICE_LLM_FIXTURES=os.path.join(workdir, "no-fixtures.json"),
+        SPICE_OFFLINE_LATENCY=str(args.llm_latency),
+        SPICE_OFFLINE_LATENCY_JITTER=str(args.llm_latency_jitter),
+        SPICE_OFFLINE_FAILURE_RATE="0",
+        SPICE_OFFLINE_SEED=str(args.seed),
+    )
+    if args.fetcher == "http":
+        import agent.scraping.webscrape as webscrape
+        from benchmarks.http_browser import http_playwright
+
+        webscrape.async_playwright = http_playwright
+    else:
+        from agent.scraping.browsers import ensure_browser
+
+        ensure_browser(args.browser)
+
+    result = run_benchmark(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit')} ({args.compare})")
+    print_report(result, baseline)
+
+    if args.out:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "config": {
+                k: v for k, v in vars(args).items() if k not in ("out", "compare")
+            },
+            "results": result,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Local HTTP server with synthetic agency news sites, shaped like the NEA/PUB
+listing and press release pages the scraper targets.
+
+    /<run>/<agency>/news          listing page: navigation, pagination and
+                                  `articles` press release links, each with
+                                  `extra_links` tag/share/read-more links
+    /<run>/<agency>/news/<slug>   press release: nav, <article> body, footer
+
+`<run>` is any path segment; using a new one per benchmark iteration makes
+every link unseen, so each iteration scrapes and analyzes all articles.
+"""
+
+import html
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+WORDS = (
+    "agency announces pilot programme water energy carbon sensors robotics "
+    "digital platform industry partners innovation grant sustainability "
+    "infrastructure public transport waste recycling building construction "
+    "smart nation research centre enterprise trial deployment standards "
+    "companies collaboration technology data analytics climate resilience"
+).split()
+
+
+@dataclass
+class FixtureSite:
+    """Shape of the generated sites and the latency of every response."""
+
+    articles: int = 10
+    paragraphs: int = 8
+    words_per_paragraph: int = 80
+    latency_ms: float = 50.0
+    latency_jitter_ms: float = 0.0
+    seed: int = 0
+    # Off-prefix, query and duplicate links next to each press release link
+    extra_links: int = 0
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(":".join(map(str, (self.seed, *key))))
+
+    def title(self, agency: str, index: int) -> str:
+        rng = self._rng(agency, index, "title")
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12)))
+        return f"{agency.upper()} {words.capitalize()}"
+
+    def slug(self, agency: str, index: int) -> str:
+        return f"{index:04d}-" + "-".join(
+            self.title(agency, index).lower().split()[1:6]
+        )
+
+    def extras(self, base: str, agency: str, index: int) -> str:
+        url = f"{base}/{self.slug(agency, index)}"
+        kinds = (
+            lambda n: f'<a href="/tags/{WORDS[(index + n) % len(WORDS)]}">tag</a>',
+            lambda n: f'<a href="{url}?utm_source=share{n}">Share</a>',
+            lambda n: f'<a href="{url}">Read more</a>',
+        )
+        return " ".join(kinds[n % 3](n) for n in range(self.extra_links))
+
+    def listing_page(self, base: str, agency: str) -> str:
+        items = "\n".join(
+            f'<li><a href="{base}/{self.slug(agency, i)}">'
+            f"{html.escape(self.title(agency, i))}</a> "
+            f"{self.extras(base, agency, i)}</li>"
+            for i in range(self.articles)
+        )
+        return f"""<!doctype html>
+<html><head><title>{agency.upper()} News</title></head>
+<body>
+<nav><a href="/">Home</a> <a href="/about-us">About Us</a>
+<a href="/contact">Contact</a> <a href="https://www.gov.sg">gov.sg</a></nav>
+<h1>Media Releases</h1>
+<ul class="news-list">
+{items}
+</ul>
+<div class="pagination"><a href="{base}?page=2">Next</a>
+<a data-href="{base}?page=3">3</a></div>
+<footer><a href="/privacy-statement">Privacy</a> <a href="/terms-of-use">Terms</a></footer>
+</body></html>"""
+
+    def article_page(self, agency: str, index: int) -> str:
+        rng = self._rng(agency, index, "body")
+        paragraphs = "\n".join(
+            "<p>"
+            + " ".join(rng.choice(WORDS) for _ in range(self.words_per_paragraph))
+            + ".</p>"
+            for _ in range(self.paragraphs)
+        )
+        return f"""<!doctype html>
+<html><head><title>{html.escape(self.title(agency, index))}</title></head>
+<body>
+<nav><a href="/">Home</a> <a href="/about-us">About Us</a></nav>
+<main><article>
+<h1>{html.escape(self.title(agency, index))}</h1>
+{paragraphs}
+</article></main>
+<footer>Copyright {agency.upper()}</footer>
+</body></html>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    site: FixtureSite
+
+    def do_GET(self):
+        site = self.server.site
+        delay = site.latency_ms + random.uniform(0, site.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        parts = path.strip("/").split("/")
+        status, body = 404, "<html><body>Not found</body></html>"
+        if len(parts) == 3 and parts[2] == "news":
+            status, body = 200, site.listing_page(path, parts[1])
+        elif len(parts) == 4 and parts[2] == "news":
+            try:
+                index = int(parts[3].split("-", 1)[0])
+            except ValueError:
+                index = -1
+            if 0 <= index < site.articles:
+                status, body = 200, site.article_page(parts[1], index)
+        elif len(parts) <= 1:
+            status, body = 200, "<html><body><h1>Home</h1></body></html>"
+
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve(site: FixtureSite, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run the fixture server in a background thread; yields its base URL."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.site = site
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,157 @@
+"""
+Minimal stand-in for `playwright.async_api.async_playwright`, covering just
+the calls the scraper makes (launch, new_context, new_page, goto,
+wait_for_timeout, query_selector(_all), eval_on_selector_all with the link
+harvest script, get_attribute, inner_text, and start/stop/is_connected for
+the worker browser pool) over plain HTTP. Used by `--fetcher http` to
+benchmark the pipeline's own code on machines without Playwright browsers;
+page waits are kept, browser start-up and rendering costs are not.
+"""
+
+import asyncio
+import re
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# Elements whose text never renders
+HIDDEN_TAGS = {"script", "style", "head", "title"}
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr"}
+LINK_SELECTOR = "[href], [data-href]"
+
+
+class _Element:
+    def __init__(self, tag: str, attrs: Dict[str, str]):
+        self.tag = tag
+        self.attrs = attrs
+        self.text: List[str] = []
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return self.attrs.get(name)
+
+    async def inner_text(self) -> str:
+        return " ".join(" ".join(self.text).split())
+
+
+class _DocumentParser(HTMLParser):
+    """Collects every element with its attributes and (visible) text."""
+
+    def __init__(self):
+        super().__init__()
+        self.elements: List[_Element] = []
+        self._open: List[_Element] = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        element = _Element(tag, {k: v or "" for k, v in attrs})
+        self.elements.append(element)
+        self._open.append(element)
+        self._hidden += tag in HIDDEN_TAGS
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i].tag == tag:
+                for closed in self._open[i:]:
+                    self._hidden -= closed.tag in HIDDEN_TAGS
+                del self._open[i:]
+                return
+
+    def handle_data(self, data):
+        if not self._hidden:
+            for element in self._open:
+                element.text.append(data)
+
+
+class _Response:
+    def __init__(self, status: int, headers: Dict[str, str]):
+        self.status = status
+        self.headers = headers
+
+
+def _get(url: str, timeout: float) -> tuple:
+    request = urllib.request.Request(url, headers={"User-Agent": "spice-benchmark"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read().decode("utf-8", errors="replace")
+            return response.status, dict(response.headers), body
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read().decode("utf-8", errors="replace")
+
+
+class _Page:
+    def __init__(self):
+        self.elements: List[_Element] = []
+
+    async def goto(self, url: str, wait_until: str = "load", timeout: float = 30000):
+        status, headers, body = await asyncio.to_thread(_get, url, timeout / 1000)
+        parser = _DocumentParser()
+        parser.feed(body)
+        self.elements = parser.elements
+        return _Response(status, headers)
+
+    async def wait_for_timeout(self, timeout: float) -> None:
+        await asyncio.sleep(timeout / 1000)
+
+    async def query_selector_all(self, selector: str) -> List[_Element]:
+        if selector != LINK_SELECTOR:
+            raise NotImplementedError(f"Unsupported selector: {selector}")
+        return [e for e in self.elements if "href" in e.attrs or "data-href" in e.attrs]
+
+    async def eval_on_selector_all(self, selector: str, expression: str) -> list:
+        # Only the scraper's LINK_HARVEST_JS: [href or data-href, innerText]
+        if not re.search(r"getAttribute.*innerText", expression, re.S):
+            raise NotImplementedError("Unsupported expression")
+        return [
+            [e.attrs.get("href") or e.attrs.get("data-href"), await e.inner_text()]
+            for e in await self.query_selector_all(selector)
+        ]
+
+    async def query_selector(self, selector: str) -> Optional[_Element]:
+        return next((e for e in self.elements if e.tag == selector), None)
+
+
+class _Context:
+    async def new_page(self) -> _Page:
+        return _Page()
+
+    async def close(self) -> None:
+        pass
+
+
+class _Browser:
+    def is_connected(self) -> bool:
+        return True
+
+    async def new_context(self, **kwargs) -> _Context:
+        return _Context()
+
+    async def close(self) -> None:
+        pass
+
+
+class _BrowserType:
+    async def launch(self, headless: bool = True) -> _Browser:
+        return _Browser()
+
+
+class HTTPPlaywright:
+    chromium = firefox = webkit = _BrowserType()
+
+    async def __aenter__(self) -> "HTTPPlaywright":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def start(self) -> "HTTPPlaywright":
+        return self
+
+    async def stop(self) -> None:
+        pass
+
+
+def http_playwright() -> HTTPPlaywright:
+    return HTTPPlaywright()
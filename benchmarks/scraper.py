@@ -0,0 +1,351 @@
+"""
+Scraper micro-benchmarks: link harvesting from generated listing pages,
+prefix filtering, path normalization and batching at growing listing sizes,
+and the scraped-link dedup at growing history sizes.
+
+    python -m benchmarks.scraper --fetcher http
+    python -m benchmarks.scraper --links 100 20000 --history 10 1000000 --out s.json
+
+Each benchmark is timed at every size (best of `--repeat`) and a power law
+is fitted to the times: the exponent should be ~1 for work linear in the
+listing and ~0 for lookups that must not depend on how much history there
+is. An exponent more than `--tolerance` above the expected one is flagged
+and the run exits non-zero. Listing pages come from fixture_server.py with
+tag, share and read-more links next to every press release link, as on
+real listings; the scraper's fixed page settle wait is skipped.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.e2e import git_commit
+from benchmarks.fixture_server import FixtureSite, serve
+
+# Set up logger for this module
+logger = logging.getLogger("spice.benchmark")
+
+LISTING_SIZES = [100, 1_000, 5_000, 20_000]
+HISTORY_SIZES = [10, 1_000, 100_000, 1_000_000]
+HISTORY_LISTING = "https://www.nea.gov.sg/media/news"
+
+# Benchmark -> (what it scales with, expected exponent)
+BENCHMARKS = {
+    "harvest": ("links", 1.0),
+    "filter": ("links", 1.0),
+    "normalize": ("links", 1.0),
+    "chunk": ("links", 1.0),
+    "dedup": ("history", 0.0),
+}
+
+
+def fit_exponent(sizes: List[int], seconds: List[float]) -> float:
+    """Least-squares slope of log(seconds) against log(size)."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(s, 1e-9)) for s in seconds]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    """Best per-call time of `fn`, looping enough to time short calls."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def best_wall_time(fn: Callable[[], object], repeat: int) -> float:
+    """Best time of single calls of `fn`, for calls too slow to loop."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+# === Benchmarks ===
+def listing_benchmarks(args) -> Dict[str, Dict[int, float]]:
+    """Harvest, filter, normalize and chunk times by number of listing links."""
+    from agent.scraping import webscrape
+
+    results = {name: {} for name, (kind, _) in BENCHMARKS.items() if kind == "links"}
+    for links in args.links:
+        site = FixtureSite(
+            articles=max(1, links // (1 + args.extra_links)),
+            latency_ms=0,
+            extra_links=args.extra_links,
+            seed=args.seed,
+        )
+        with serve(site) as base:
+            listing_url = f"{base}/bench/nea/news"
+            anchors = asyncio.run(harvest_anchors(webscrape, listing_url, args))
+
+            def fetch():
+                return asyncio.run(
+                    webscrape.fetch_links_by_listing(
+                        listing_url, len(anchors), True, args.browser
+                    )
+                )
+
+            found = fetch()
+            if len(found) != site.articles:
+                raise RuntimeError(
+                    f"Expected {site.articles} article links, found {len(found)}"
+                )
+            results["harvest"][links] = best_wall_time(fetch, args.repeat)
+
+        paths = [href or "" for href, _ in anchors]
+        results["filter"][links] = best_time(
+            lambda: webscrape.filter_listing_links(listing_url, anchors, len(anchors)),
+            args.repeat,
+        )
+        results["normalize"][links] = best_time(
+            lambda: [webscrape.normalize_path(path) for path in paths], args.repeat
+        )
+        results["chunk"][links] = best_time(
+            lambda: list(webscrape.chunked(found, 10)), args.repeat
+        )
+        logger.info(
+            f"Listing of {len(anchors)} links ({len(found)} articles): "
+            f"harvest {results['harvest'][links] * 1000:.1f} ms"
+        )
+    return results
+
+
+async def harvest_anchors(webscrape, listing_url: str, args) -> list:
+    """The `[href, text]` pairs the scraper harvests from a listing page."""
+    async with webscrape.async_playwright() as p:
+        browser = await getattr(p, args.browser).launch(headless=True)
+        try:
+            page = await (await browser.new_context()).new_page()
+            await page.goto(listing_url, wait_until="domcontentloaded")
+            return await page.eval_on_selector_all(
+                "[href], [data-href]", webscrape.LINK_HARVEST_JS
+            )
+        finally:
+            await browser.close()
+
+
+def history_benchmarks(args, db_path: str) -> Dict[str, Dict[int, float]]:
+    """
+    The web scrape node's dedup of a listing's links, half of them already
+    scraped, by number of links in history.
+    """
+    from agent.storage.articles import ArticleStore
+
+    def link(i: int) -> Dict[str, str]:
+        return {"title": f"Release {i}", "url": f"{HISTORY_LISTING}/{i:08d}-release"}
+
+    store = ArticleStore(db_path)
+    results = {"dedup": {}}
+    recorded = 0
+    for size in sorted(args.history):
+        for start in range(recorded, size, 50_000):
+            store.record(
+                HISTORY_LISTING,
+                [link(i) for i in range(start, min(size, start + 50_000))],
+            )
+        recorded = max(recorded, size)
+
+        known = min(size, args.batch // 2)
+        step = max(1, size // known)
+        batch = [link(i * step) for i in range(known)] + [
+            link(recorded + i) for i in range(args.batch - known)
+        ]
+        new = store.new_links(HISTORY_LISTING, batch)
+        if len(new) != args.batch - known:
+            raise RuntimeError(
+                f"Expected {args.batch - known} new links, got {len(new)}"
+            )
+
+        results["dedup"][size] = best_time(
+            lambda: store.new_links(HISTORY_LISTING, batch), args.repeat
+        )
+        logger.info(
+            f"History of {size} links: dedup of {args.batch} "
+            f"{results['dedup'][size] * 1000:.2f} ms"
+        )
+    store.conn.close()
+    return results
+
+
+def analyze(times: Dict[str, Dict[int, float]], tolerance: float) -> Dict[str, dict]:
+    analysis = {}
+    for name, by_size in times.items():
+        kind, expected = BENCHMARKS[name]
+        sizes = sorted(by_size)
+        exponent = fit_exponent(sizes, [by_size[n] for n in sizes])
+        analysis[name] = {
+            "scales_with": kind,
+            "seconds": {str(n): by_size[n] for n in sizes},
+            "exponent": exponent,
+            "expected": expected,
+            "flagged": len(sizes) > 1 and exponent > expected + tolerance,
+        }
+    return analysis
+
+
+# === Reporting ===
+def print_report(results: Dict[str, dict], baseline: Optional[dict] = None) -> None:
+    base = (baseline or {}).get("results", {})
+    for kind in ("links", "history"):
+        rows = {n: r for n, r in results.items() if r["scales_with"] == kind}
+        if not rows:
+            continue
+        sizes = sorted({int(n) for r in rows.values() for n in r["seconds"]})
+        print(
+            f"\n{'Time (ms) by ' + kind:<20}"
+            + "".join(f" {n:>11,}" for n in sizes)
+            + f" {'Exponent':>9}"
+        )
+        for name, result in rows.items():
+            previous = base.get(name, {})
+            cells = []
+            for n in sizes:
+                seconds = result["seconds"].get(str(n))
+                before = previous.get("seconds", {}).get(str(n))
+                cell = f"{seconds * 1000:.3f}" if seconds is not None else "-"
+                if seconds is not None and before:
+                    cell += f" {(seconds - before) / before:+.0%}"
+                cells.append(f" {cell:>11}")
+            flag = "  flagged" if result["flagged"] else ""
+            print(
+                f"{name:<20}"
+                + "".join(cells)
+                + f" {result['exponent']:>5.2f}/{result['expected']:.0f}{flag}"
+            )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.scraper",
+        description="Micro-benchmarks of link harvesting, filtering and dedup.",
+    )
+    parser.add_argument(
+        "--links",
+        type=int,
+        nargs="+",
+        default=LISTING_SIZES,
+        help="Links per generated listing page",
+    )
+    parser.add_argument(
+        "--extra-links",
+        type=int,
+        default=3,
+        help="Tag, share and read-more links per press release link",
+    )
+    parser.add_argument(
+        "--history",
+        type=int,
+        nargs="+",
+        default=HISTORY_SIZES,
+        help="Scraped links in history for the dedup benchmarks",
+    )
+    parser.add_argument(
+        "--batch", type=int, default=1000, help="Listing links deduplicated per run"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Flag exponents this far above the expected one",
+    )
+    parser.add_argument(
+        "--only", choices=("links", "history"), help="Run one group of benchmarks"
+    )
+    parser.add_argument(
+        "--browser", choices=("firefox", "chromium", "webkit"), default="chromium"
+    )
+    parser.add_argument(
+        "--fetcher",
+        choices=("playwright", "http"),
+        default="playwright",
+        help="http: plain HTTP stand-in for Playwright (no browser costs)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", metavar="PATH", help="Write results as JSON")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="Show changes against earlier results"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("spice").setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    # Throwaway stores, set before agent modules load
+    workdir = tempfile.mkdtemp(prefix="spice-bench-")
+    os.environ.update(
+        SPICE_DB=os.path.join(workdir, "spice.db"),
+        SPICE_CHECKPOINT_DB=os.path.join(workdir, "checkpoints.sqlite"),
+    )
+    import agent.scraping.webscrape as webscrape
+
+    # A fixed sleep, not work: it would swamp the listing times
+    webscrape.LISTING_SETTLE_MS = 0
+    if args.fetcher == "http":
+        from benchmarks.http_browser import http_playwright
+
+        webscrape.async_playwright = http_playwright
+    elif args.only != "history":
+        from agent.scraping.browsers import ensure_browser
+
+        ensure_browser(args.browser)
+
+    times = {}
+    if args.only != "history":
+        times.update(listing_benchmarks(args))
+    if args.only != "links":
+        times.update(history_benchmarks(args, os.path.join(workdir, "history.db")))
+    results = analyze(times, args.tolerance)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit')} ({args.compare})")
+    print_report(results, baseline)
+
+    if args.out:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "config": {
+                k: v for k, v in vars(args).items() if k not in ("out", "compare")
+            },
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    flagged = [name for name, result in results.items() if result["flagged"]]
+    if flagged:
+        print(f"\nScaling worse than expected: {', '.join(flagged)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
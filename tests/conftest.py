@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+# Stores and the checkpointer read their paths at import time: keep test
+# runs away from the working directory's databases and the OpenAI API
+_scratch = tempfile.mkdtemp(prefix="spice-tests-")
+os.environ["SPICE_DB"] = os.path.join(_scratch, "spice.db")
+os.environ["SPICE_CHECKPOINT_DB"] = os.path.join(_scratch, "checkpoints.sqlite")
+os.environ["SPICE_LLM_BACKEND"] = "offline"
+for name in list(os.environ):
+    if name.startswith(("SPICE_RUN_MAX_", "SPICE_DAILY_MAX_")):
+        del os.environ[name]
+
+from langchain_core.messages import AIMessage  # noqa: E402
+import pytest  # noqa: E402
+
+
+class ScriptedModel:
+    """
+    Chat model stand-in that answers with the given responses in order:
+    strings as message content, pydantic objects as structured output.
+    """
+
+    def __init__(self, *responses, include_raw: bool = False):
+        self.responses = list(responses)
+        self.include_raw = include_raw
+        self.calls = 0
+
+    def invoke(self, messages, config=None, **kwargs):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, str):
+            return AIMessage(content=response)
+        if self.include_raw:
+            return {"raw": AIMessage(content=""), "parsed": response}
+        return response
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        derived = ScriptedModel(include_raw=include_raw)
+        # Shares the script, so calls through either consume it in order
+        derived.responses = self.responses
+        return derived
+
+
+@pytest.fixture
+def scripted():
+    return ScriptedModel
+
+
+def _misnested(tracer):
+    """Spans that overlap another span on their track without nesting in it."""
+    bad = []
+    stacks = {}
+    for event in sorted(tracer.events, key=lambda e: (e["tid"], e["ts"], -e["dur"])):
+        stack = stacks.setdefault(event["tid"], [])
+        end = event["ts"] + event["dur"]
+        while stack and stack[-1] <= event["ts"]:
+            stack.pop()
+        if stack and end > stack[-1]:
+            bad.append(event["name"])
+        stack.append(end)
+    return bad
+
+
+@pytest.fixture
+def misnested():
+    """Check that a `Tracer`'s spans nest on each track (names of those that don't)."""
+    return _misnested
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+import agent.monitor as monitor
+from agent.monitor import ListingMonitor
+from agent.runner import AnalysisRequest
+from agent.storage.articles import ArticleStore, canonical_url
+from agent.storage.monitor import MonitorStore
+
+LISTING = "https://agency.gov.sg/news"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / "articles.db"))
+
+
+def test_known_canonical_urls_matches_any_spelling(store):
+    store.record(LISTING, [{"url": "HTTPS://Agency.gov.sg:443/news/grant/"}])
+
+    known = store.known_canonical_urls(
+        LISTING,
+        [
+            canonical_url("https://agency.gov.sg/news/grant"),
+            canonical_url("https://agency.gov.sg/news/other"),
+        ],
+    )
+
+    assert known == {"https://agency.gov.sg/news/grant"}
+    assert store.known_canonical_urls("https://other.gov.sg/news", known) == set()
+
+
+def test_canonical_urls_are_backfilled_on_old_databases(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE scraped_links (
+                listing_url TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL DEFAULT '',
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (listing_url, url)
+            ) WITHOUT ROWID
+            """)
+        conn.execute(
+            "INSERT INTO scraped_links VALUES (?, ?, '', 'then', 'then')",
+            (LISTING, "https://agency.gov.sg/news/grant/"),
+        )
+
+    store = ArticleStore(path)
+
+    assert store.known_canonical_urls(
+        LISTING, ["https://agency.gov.sg/news/grant"]
+    ) == {"https://agency.gov.sg/news/grant"}
+    plan = store.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT canonical_url FROM scraped_links "
+        "WHERE listing_url = ? AND canonical_url IN (?)",
+        (LISTING, "x"),
+    ).fetchall()
+    assert "idx_scraped_links_canonical" in " ".join(row[-1] for row in plan)
+
+
+class FakeRunner:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, request):
+        self.submitted.append(request)
+        return f"job-{len(self.submitted)}"
+
+    def done(self, job_id):
+        return False
+
+
+def test_monitor_only_triggers_on_unknown_urls(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(monitor, "get_article_store", lambda: store)
+    store.record(LISTING, [{"url": "https://agency.gov.sg/news/grant"}])
+    links = [{"url": "https://agency.gov.sg/news/grant/", "title": "Grant"}]
+    runner = FakeRunner()
+    watcher = ListingMonitor(
+        runner,
+        {"NEA": AnalysisRequest(agency="NEA", listing_url=LISTING)},
+        {"NEA": 60},
+        store=MonitorStore(str(tmp_path / "monitor.db")),
+        fetch=lambda request: links,
+    )
+
+    assert watcher.poll("NEA") == "no_new"
+
+    links.append({"url": "https://agency.gov.sg/news/new", "title": "New"})
+    assert watcher.poll("NEA") == "triggered"
+    assert len(runner.submitted) == 1
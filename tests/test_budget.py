@@ -0,0 +1,227 @@
+import json
+
+import pytest
+
+from agent.llm import budget as budget_module
+from agent.llm.budget import BudgetExceeded, BudgetLimits, RunBudget, budgeted
+from agent.llm.usage import UsageLedger
+from agent.scoring.relevance import score_article
+from agent.scraping.webscrape import filter_links_batch, record_scraped_links
+from agent.storage.articles import ArticleStore
+from agent.templates import NewsArticle, RelevanceScore
+
+
+def links_response(*links):
+    return json.dumps(
+        {
+            "links": [
+                {"title": title, "url": url, "confidence": confidence}
+                for title, url, confidence in links
+            ]
+        }
+    )
+
+
+def metered(budget, model, name="gpt-4.1-nano"):
+    ledger = UsageLedger(budget)
+    return ledger.meter(model, name), ledger
+
+
+def spend(budget, calls):
+    for _ in range(calls):
+        budget.record(tokens=10, cost=0.001)
+
+
+# === Limits and degradation ===
+def test_optional_stages_stop_before_the_limit():
+    budget = RunBudget(BudgetLimits(calls=10), soft_limit=0.8)
+    assert budget.threshold("email_outreach") == pytest.approx(0.8)
+    assert budget.threshold("opportunity_identification") == pytest.approx(0.9)
+    assert budget.threshold("summary") == 1.0
+
+    spend(budget, 7)
+    assert budget.allows("email_outreach")
+    spend(budget, 1)
+    assert not budget.allows("email_outreach")
+    assert budget.allows("opportunity_identification")
+    spend(budget, 1)
+    assert not budget.allows("opportunity_identification")
+    assert budget.allows("summary")
+    budget.check()
+
+    spend(budget, 1)
+    assert not budget.allows("summary")
+    with pytest.raises(BudgetExceeded, match="run calls budget used up"):
+        budget.check()
+
+
+def test_binding_limit_is_the_most_used_one(tmp_path):
+    from agent.storage.usage import UsageStore
+
+    store = UsageStore(str(tmp_path / "usage.db"))
+    daily = BudgetLimits(calls=4)
+    first = RunBudget(BudgetLimits(tokens=100), daily, store=store)
+    second = RunBudget(BudgetLimits(tokens=100), daily, store=store)
+
+    spend(first, 1)
+    assert first.used() == (pytest.approx(0.25), "daily calls")
+    # Daily limits are shared by every run on the database
+    spend(second, 3)
+    with pytest.raises(BudgetExceeded, match="daily calls budget used up"):
+        first.check()
+    assert first.report()["spent"]["calls"] == 1
+
+
+def test_unlimited_budget_never_stops():
+    budget = RunBudget()
+    spend(budget, 100)
+    assert budget.used() == (0.0, None)
+    assert budget.allows("summary")
+    budget.check()
+
+
+# === Skipped stages ===
+def stage_helper(calls, stage="summary", relevant_only=False, raises=None):
+    @budgeted(stage, relevant_only=relevant_only)
+    def helper(state, article):
+        calls.append(article.url)
+        if raises:
+            raise raises
+        return "done"
+
+    return helper
+
+
+def article(url, relevant=True):
+    relevance = RelevanceScore(is_relevant=relevant, reason="r", confidence=0.9)
+    return NewsArticle(host="a", title="T", url=url, relevance=relevance)
+
+
+def test_budgeted_skips_and_records_once_budget_is_low():
+    budget = RunBudget(BudgetLimits(calls=10))
+    spend(budget, 8)
+    calls = []
+    summary = stage_helper(calls)
+    email = stage_helper(calls, "email_outreach")
+    state = {"budget": budget}
+
+    assert summary(state, article("https://a/1")) == "done"
+    assert email(state, article("https://a/1")) is None
+    assert email(state, article("https://a/2")) is None
+    assert calls == ["https://a/1"]
+    assert budget.report()["skipped"] == {
+        "email_outreach": ["https://a/1", "https://a/2"]
+    }
+
+
+def test_budgeted_records_skip_when_budget_runs_out_mid_call():
+    budget = RunBudget(BudgetLimits(calls=10))
+    calls = []
+    summary = stage_helper(calls, raises=BudgetExceeded("used up"))
+
+    assert summary({"budget": budget}, article("https://a/1")) is None
+    assert calls == ["https://a/1"]
+    assert budget.skipped["summary"] == ["https://a/1"]
+
+
+def test_budgeted_ignores_irrelevant_articles_with_relevant_only():
+    budget = RunBudget(BudgetLimits(calls=0))
+    calls = []
+    summary = stage_helper(calls, relevant_only=True)
+
+    summary({"budget": budget}, article("https://a/1", relevant=False))
+    summary({"budget": budget}, article("https://a/2"))
+
+    # The helper itself passes over irrelevant articles
+    assert calls == ["https://a/1"]
+    assert budget.skipped["summary"] == ["https://a/2"]
+
+
+def test_budgeted_applies_results_restored_from_checkpoint(monkeypatch):
+    monkeypatch.setattr(
+        budget_module,
+        "restore_article_stage",
+        lambda stage, article: article.url == "https://a/1",
+    )
+    budget = RunBudget(BudgetLimits(calls=0))
+    calls = []
+    summary = stage_helper(calls)
+
+    summary({"budget": budget}, article("https://a/1"))
+    summary({"budget": budget}, article("https://a/2"))
+
+    assert calls == ["https://a/1"]
+    assert budget.skipped["summary"] == ["https://a/2"]
+
+
+def test_budgeted_without_budget_runs_helper():
+    calls = []
+    assert stage_helper(calls)({}, article("https://a/1")) == "done"
+    assert calls == ["https://a/1"]
+
+
+# === Budget used up during escalation ===
+def test_link_filter_keeps_confident_links_when_recheck_is_over_budget(
+    scripted, tmp_path
+):
+    budget = RunBudget(BudgetLimits(calls=1))
+    batch = [
+        {"title": "Grant", "url": "https://agency.gov.sg/news/grant"},
+        {"title": "Maybe", "url": "https://agency.gov.sg/news/maybe/"},
+    ]
+    cheap, usage = metered(
+        budget,
+        scripted(
+            links_response(
+                ("Grant", "https://agency.gov.sg/news/grant", 0.95),
+                ("Maybe", "https://agency.gov.sg/news/maybe/", 0.3),
+            )
+        ),
+    )
+    strong, _ = metered(budget, scripted(links_response()), "gpt-4o-mini")
+
+    kept = filter_links_batch(
+        cheap, batch, 1, strong, threshold=0.7, usage=usage, budget=budget
+    )
+
+    assert [link["full_url"] for link in kept] == ["https://agency.gov.sg/news/grant"]
+    assert budget.skipped["link_filter"] == ["https://agency.gov.sg/news/maybe/"]
+
+    # The unsure link is left for the next run
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    listing = "https://agency.gov.sg/news"
+    record_scraped_links(store, listing, batch, budget)
+    assert [link["url"] for link in store.new_links(listing, batch)] == [
+        "https://agency.gov.sg/news/maybe/"
+    ]
+
+
+def test_link_filter_skips_batch_when_budget_is_used_up(scripted):
+    budget = RunBudget(BudgetLimits(calls=0))
+    batch = [{"title": "Grant", "url": "https://agency.gov.sg/news/grant"}]
+    cheap, _ = metered(budget, scripted())
+
+    assert filter_links_batch(cheap, batch, budget=budget) == []
+    assert budget.skipped["link_filter"] == ["https://agency.gov.sg/news/grant"]
+
+
+def test_relevance_escalation_over_budget_skips_article(scripted):
+    budget = RunBudget(BudgetLimits(calls=1))
+    cheap, usage = metered(
+        budget, scripted(RelevanceScore(is_relevant=True, reason="r", confidence=0.9))
+    )
+    strong, _ = metered(budget, scripted(), "gpt-4o-mini")
+    state = {
+        "model": cheap,
+        "stage_models": {"relevance": cheap, "relevance_escalation": strong},
+        "usage": usage,
+        "budget": budget,
+        "spice_context": "",
+        "escalation_threshold": 0.7,
+    }
+    article = NewsArticle(host="agency.gov.sg", title="T", url="https://a/1", body="b")
+
+    score_article(state, article)
+
+    assert article.relevance is None
+    assert budget.skipped["relevance_score"] == ["https://a/1"]
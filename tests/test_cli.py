@@ -0,0 +1,21 @@
+import agent.cli as cli
+import agent.runner as runner
+import agent.scraping.browsers as browsers
+import agent.scraping.webscrape as webscrape
+from benchmarks.http_browser import http_playwright
+
+
+def test_prepare_run_fails_when_browser_cannot_be_installed(monkeypatch):
+    monkeypatch.setattr(browsers, "ensure_browser", lambda browser: False)
+    assert cli.prepare_run("firefox") is False
+
+
+def test_unreachable_listing_fails_the_agency(monkeypatch, capsys):
+    # Log handlers would outlive pytest's captured stderr
+    monkeypatch.setattr(cli, "setup_logging", lambda verbose=False: None)
+    monkeypatch.setattr(cli, "prepare_run", lambda browser: True)
+    monkeypatch.setattr(runner, "ensure_browser", lambda browser: True)
+    monkeypatch.setattr(webscrape, "async_playwright", http_playwright)
+
+    assert cli.main(["DEAD=http://127.0.0.1:9/news"]) == 1
+    assert "DEAD         failed" in capsys.readouterr().out
@@ -0,0 +1,44 @@
+from dataclasses import asdict
+
+from agent.fleet import FleetWorker
+from agent.llm.governor import RateGovernor
+from agent.runner import AnalysisRequest
+from agent.storage.queue import TaskQueue
+
+
+def test_article_tasks_share_the_run_budget(tmp_path):
+    queue = TaskQueue(str(tmp_path / "queue.db"))
+    worker = FleetWorker(queue, RateGovernor(), threads=1)
+    worker._page = lambda request, action: "Grant call for AI startups"
+    request = AnalysisRequest(agency="A", listing_url="https://a/news", max_calls=6)
+    batch_id = queue.enqueue("A", asdict(request))
+
+    scrape = queue.lease(worker.name)
+    articles = [
+        (
+            "article",
+            {
+                "index": i,
+                "total": 4,
+                "title": f"T{i}",
+                "url": f"https://a/{i}",
+                "host": "a",
+            },
+        )
+        for i in range(4)
+    ]
+    queue.complete(scrape["id"], worker.name, {"links": []}, articles)
+    try:
+        while (task := queue.lease(worker.name))["kind"] == "article":
+            worker.work(task)
+    finally:
+        worker.pool.close()
+
+    results = [t["result"] for t in queue.tasks(batch_id) if t["kind"] == "article"]
+    assert sum(r["usage"]["total_calls"] for r in results) == 6
+    assert queue.get_batch(batch_id)["spent"]["calls"] == 6
+    # The last articles found the run's budget used up by the first ones
+    assert results[-1]["usage"]["total_calls"] == 0
+    assert results[-1]["usage"]["budget"]["skipped"] == {
+        "relevance_score": ["https://a/3"]
+    }
@@ -0,0 +1,74 @@
+import sqlite3
+
+from agent.storage.history import HistoryStore
+
+
+def run(agency, *bodies):
+    return {
+        "timestamp": "2026-01-01T00:00:00",
+        "agency": agency,
+        "articles_count": len(bodies),
+        "relevant_count": 0,
+        "articles": [
+            {"title": f"{agency} {i}", "url": f"https://{agency}/{i}", "body": body}
+            for i, body in enumerate(bodies)
+        ],
+    }
+
+
+def hits(store, query):
+    return [(hit["agency"], hit["position"]) for hit in store.search(query)]
+
+
+def test_search_hits_survive_vacuum(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    store.add_run(run("a", "robotics pilot", "energy grant", "digital twin"))
+    store.add_run(run("b", "robotics grant"))
+    # A gap in the ids, which VACUUM closes for implicit rowids
+    with store.conn:
+        store.conn.execute("DELETE FROM run_articles WHERE url = 'https://a/0'")
+    store.conn.execute("VACUUM")
+
+    store = HistoryStore(path)
+    assert sorted(hits(store, "grant")) == [("a", 1), ("b", 0)]
+    assert hits(store, "twin") == [("a", 2)]
+
+
+def test_articles_keyed_on_run_and_position_get_ids(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    store.add_run(run("a", "robotics pilot", "energy grant"))
+    store.add_run(run("b", "digital twin"))
+    store.conn.close()
+
+    # The layout before articles had ids, with the index on its rowids
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE old_articles (
+            run_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            is_relevant INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (run_id, position)
+        );
+        INSERT INTO old_articles (rowid, run_id, position, title, url, is_relevant, payload)
+            SELECT id, run_id, position, title, url, is_relevant, payload
+            FROM run_articles;
+        DROP TABLE run_articles;
+        ALTER TABLE old_articles RENAME TO run_articles;
+        """)
+    conn.close()
+
+    store = HistoryStore(path)
+    columns = [
+        row["name"] for row in store.conn.execute("PRAGMA table_info(run_articles)")
+    ]
+    assert columns[0] == "id"
+    assert hits(store, "twin") == [("b", 0)]
+    assert hits(store, "energy") == [("a", 1)]
+    assert store.get_article(1, 1)["body"] == "energy grant"
+    store.add_run(run("c", "twin engines"))
+    assert sorted(hits(store, "twin")) == [("b", 0), ("c", 0)]
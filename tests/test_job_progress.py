@@ -0,0 +1,106 @@
+from langchain_core.messages import AIMessageChunk
+
+from agent import runner as runner_module
+from agent.runner import AnalysisRequest, JobProgress, JobRunner
+from agent.storage.jobs import JobStore
+from agent.templates import NewsArticle
+
+
+class RecordingStore:
+    def __init__(self):
+        self.snapshots = []
+
+    def progress(self, job_id, nodes, articles):
+        self.snapshots.append({url: dict(entry) for url, entry in articles.items()})
+
+
+def token(text, node="summary"):
+    return ("messages", (AIMessageChunk(content=text), {"langgraph_node": node}))
+
+
+def test_summary_tokens_are_relayed_until_the_summary_is_done():
+    store = RecordingStore()
+    progress = JobProgress(store, "job", interval=0)
+    article = NewsArticle(host="a", title="Grant", url="https://a/1")
+
+    progress.on_event(
+        "custom", {"event": "summary_started", "url": article.url, "article": article}
+    )
+    for event in (token("Funding "), token("call"), token("ignored", "bei")):
+        progress.on_event(*event)
+    assert store.snapshots[-1][article.url]["live"] == "Funding call"
+
+    article.summary = "Funding call"
+    progress.on_event(
+        "custom", {"event": "summary", "url": article.url, "article": article}
+    )
+    assert "live" not in progress.articles[article.url]
+
+    # Tokens outside a summary or email draft have no article to go to
+    progress.on_event(*token("stray"))
+    assert "live" not in progress.articles[article.url]
+
+
+def test_email_tokens_are_relayed_per_draft():
+    progress = JobProgress(RecordingStore(), "job", interval=0)
+    url = "https://a/1"
+
+    progress.on_event(
+        "custom", {"event": "email_started", "url": url, "entity": "Acme"}
+    )
+    progress.on_event(*token("Dear Acme", "email_outreach"))
+    assert progress.articles[url]["live"] == "Dear Acme"
+
+    progress.on_event(
+        "custom",
+        {"event": "email_draft", "url": url, "entity": "Acme", "draft": "Dear Acme"},
+    )
+    assert progress.articles[url]["emails"] == ["Acme"]
+    assert "live" not in progress.articles[url]
+
+
+def run_jobs(runner, count):
+    jobs = [
+        runner.submit(AnalysisRequest(agency=f"A{i}", listing_url="https://a/news"))
+        for i in range(count)
+    ]
+    runner.executor.shutdown(wait=True)
+    return jobs
+
+
+def fake_analysis(monkeypatch):
+    monkeypatch.setattr(runner_module, "ensure_browser", lambda browser: True)
+    monkeypatch.setattr(
+        runner_module,
+        "run_analysis",
+        lambda request, governor, **kwargs: {
+            "state": {"agency": request.agency},
+            "run_id": 1,
+        },
+    )
+
+
+def test_job_runner_keeps_only_the_latest_results(tmp_path, monkeypatch):
+    fake_analysis(monkeypatch)
+    runner = JobRunner(
+        None, JobStore(str(tmp_path / "jobs.db")), max_workers=1, keep_results=2
+    )
+    first, second, third = run_jobs(runner, 3)
+
+    assert runner.result(first) is None
+    assert runner.result(second) == {"agency": "A1"}
+    assert runner.result(third) == {"agency": "A2"}
+    assert all(runner.status(job) == "succeeded" for job in (first, second, third))
+    assert all(runner.done(job) for job in (first, second, third))
+    assert not runner._futures
+
+
+def test_job_runner_can_keep_no_results(tmp_path, monkeypatch):
+    fake_analysis(monkeypatch)
+    runner = JobRunner(
+        None, JobStore(str(tmp_path / "jobs.db")), max_workers=1, keep_results=0
+    )
+    (job,) = run_jobs(runner, 1)
+
+    assert runner.result(job) is None
+    assert runner.status(job) == "succeeded"
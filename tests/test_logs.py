@@ -0,0 +1,46 @@
+import logging
+import queue
+
+from agent.logs import JsonFormatter, SamplingFilter, _DeferredQueueHandler
+
+
+class Rendered:
+    """Log argument that counts how often it is rendered."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "rendered"
+
+
+def record(msg, *args, level=logging.INFO):
+    return logging.LogRecord("spice.test", level, __file__, 1, msg, args, None)
+
+
+def test_queued_records_keep_their_arguments_as_logged():
+    records = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    links = ["https://a/1"]
+
+    handler.handle(record("Links: %s", links))
+    links.append("https://a/2")
+
+    queued = records.get_nowait()
+    assert queued.getMessage() == "Links: ['https://a/1']"
+    assert '"message": "Links: [\'https://a/1\']"' in JsonFormatter().format(queued)
+
+
+def test_sampled_out_records_are_never_rendered():
+    records = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    handler.addFilter(SamplingFilter({"spice.test": 0.0}))
+    argument = Rendered()
+
+    handler.handle(record("Dropped %s", argument))
+    handler.handle(record("Kept %s", argument, level=logging.WARNING))
+
+    assert records.get_nowait().getMessage() == "Kept rendered"
+    assert records.empty()
+    assert argument.count == 1
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from agent import pipeline
+from agent.scraping import webscrape
+from agent.templates import NewsArticle
+from agent.tracing import Tracer, span, tracing
+
+STATE = {"model": object(), "stage_models": {}, "browser": "firefox"}
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        raise AssertionError("article bodies are read by the fake scrape_article")
+
+    async def close(self):
+        self.closed = True
+
+
+class Stages:
+    """Fake filter, extraction and analysis stages that count what they do."""
+
+    def __init__(self, monkeypatch, filter_delay=0.0, analyze_delay=0.0):
+        self.browser = FakeBrowser()
+        self.filter_delay = filter_delay
+        self.analyze_delay = analyze_delay
+        self.fail_filter_batch = None
+        self.fail_analysis = False
+        self.filtered = 0
+        self.extracted = 0
+        self.analyzing = 0
+        self.analyzed = 0
+        self.max_waiting = 0
+        self._lock = threading.Lock()
+
+        @asynccontextmanager
+        async def async_playwright():
+            async def launch(headless):
+                return self.browser
+
+            yield SimpleNamespace(firefox=SimpleNamespace(launch=launch))
+
+        monkeypatch.setattr(webscrape, "async_playwright", async_playwright)
+        monkeypatch.setattr(webscrape, "filter_links_batch", self.filter_links_batch)
+        monkeypatch.setattr(webscrape, "scrape_article", self.scrape_article)
+        monkeypatch.setattr(pipeline, "analyze_article", self.analyze_article)
+
+    def filter_links_batch(self, model, batch, batch_num, *args):
+        time.sleep(self.filter_delay)
+        if batch_num == self.fail_filter_batch:
+            raise RuntimeError("filter failed")
+        self.filtered += 1
+        return [dict(link, full_url=link["url"]) for link in batch]
+
+    async def scrape_article(self, link, index, label, extract):
+        with self._lock:
+            self.extracted += 1
+            waiting = self.extracted - self.analyzed - self.analyzing
+            self.max_waiting = max(self.max_waiting, waiting)
+        with span("navigate", "browser", url=link["full_url"]):
+            await asyncio.sleep(0.001 * (index % 3))
+        return NewsArticle(host="a", title=link["title"], url=link["full_url"])
+
+    def analyze_article(self, task, article, index, label):
+        with self._lock:
+            self.analyzing += 1
+        try:
+            time.sleep(self.analyze_delay)
+            if self.fail_analysis:
+                raise RuntimeError("analysis failed")
+        finally:
+            with self._lock:
+                self.analyzing -= 1
+                self.analyzed += 1
+
+
+def links(count):
+    return [{"title": f"T{i}", "url": f"https://a/{i}"} for i in range(count)]
+
+
+def stream(count, **sizes):
+    async def run():
+        return await asyncio.wait_for(
+            pipeline.stream_articles(dict(STATE), links(count), **sizes), timeout=10
+        )
+
+    return asyncio.run(run())
+
+
+def test_articles_come_back_in_link_order(monkeypatch):
+    stages = Stages(monkeypatch)
+
+    articles = stream(25, pages=3, analyzers=4, buffer=2)
+
+    assert [article.url for article in articles] == [
+        f"https://a/{i}" for i in range(25)
+    ]
+    assert stages.browser.closed
+
+
+def test_extraction_pages_trace_on_their_own_tracks(monkeypatch, misnested):
+    Stages(monkeypatch)
+    tracer = Tracer()
+
+    with tracing(tracer):
+        stream(12, pages=3, analyzers=2, buffer=2)
+
+    assert len([e for e in tracer.events if e["name"] == "navigate"]) == 12
+    assert misnested(tracer) == []
+
+
+def test_slow_analysis_holds_back_extraction(monkeypatch):
+    stages = Stages(monkeypatch, analyze_delay=0.02)
+
+    articles = stream(30, pages=2, analyzers=1, buffer=2)
+
+    assert len(articles) == 30
+    # Extracted articles wait in the buffer or in a blocked extractor, never more
+    assert stages.max_waiting <= 2 + 2
+    assert stages.max_waiting >= 1
+
+
+def test_filter_failure_stops_the_run(monkeypatch):
+    stages = Stages(monkeypatch, analyze_delay=0.02)
+    stages.fail_filter_batch = 2
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="filter failed"):
+        stream(50, pages=2, analyzers=2, buffer=2)
+
+    assert time.monotonic() - started < 5
+    assert stages.filtered == 1
+    # Analyses under way have finished, and no more were started
+    assert stages.analyzing == 0
+    assert stages.analyzed <= 10
+    assert stages.browser.closed
+
+
+def test_analysis_failure_stops_the_filter(monkeypatch):
+    stages = Stages(monkeypatch, filter_delay=0.02)
+    stages.fail_analysis = True
+
+    with pytest.raises(RuntimeError, match="analysis failed"):
+        stream(100, pages=2, analyzers=2, buffer=2)
+
+    assert stages.filtered < 10
+    assert stages.analyzing == 0
+    assert stages.browser.closed
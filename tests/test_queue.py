@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from agent.storage.queue import TaskQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(str(tmp_path / "queue.db"))
+
+
+def task_of(queue, batch_id, kind):
+    return next(task for task in queue.tasks(batch_id) if task["kind"] == kind)
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue):
+    batch_id = queue.enqueue("A", {})
+    task = queue.lease("w1", lease_seconds=-1)
+    assert task["kind"] == "scrape"
+
+    reclaimed = queue.lease("w2")
+    assert reclaimed["id"] == task["id"]
+    assert reclaimed["lease_owner"] == "w2"
+    assert reclaimed["attempts"] == 2
+
+    # The first worker lost the task and can no longer settle it
+    assert not queue.heartbeat(task["id"], "w1")
+    assert not queue.complete(task["id"], "w1", {})
+    assert queue.fail(task["id"], "w1", "late") is None
+    assert queue.complete(task["id"], "w2", {"ok": True})
+    assert task_of(queue, batch_id, "scrape")["result"] == {"ok": True}
+
+
+def test_expired_lease_out_of_attempts_is_given_up(queue):
+    batch_id = queue.enqueue("A", {}, max_attempts=1)
+    scrape = queue.lease("w1")
+    assert queue.complete(scrape["id"], "w1", {})
+    collect = queue.lease("w1", lease_seconds=-1)
+    assert collect["kind"] == "collect"
+
+    assert queue.lease("w2") is None
+    assert task_of(queue, batch_id, "collect")["status"] == "failed"
+    batch = queue.get_batch(batch_id)
+    assert batch["status"] == "failed"
+    assert batch["error"] == "lease expired"
+    assert queue.idle()
+
+
+def test_heartbeat_extends_the_lease(queue):
+    queue.enqueue("A", {})
+    task = queue.lease("w1", lease_seconds=-1)
+    assert queue.heartbeat(task["id"], "w1", lease_seconds=60)
+
+    assert queue.lease("w2") is None
+    leased = next(t for t in queue.tasks(task["batch_id"]) if t["id"] == task["id"])
+    assert leased["lease_expires"] > time.time() + 50
+
+
+def test_failed_task_is_retried_with_backoff_then_given_up(queue):
+    batch_id = queue.enqueue("A", {}, max_attempts=3)
+
+    task = queue.lease("w1")
+    assert queue.fail(task["id"], "w1", "boom", retry_delay=0) == "retry"
+    task = queue.lease("w1")
+    assert task["attempts"] == 2
+    before = time.time()
+    assert queue.fail(task["id"], "w1", "boom", retry_delay=10) == "retry"
+
+    # Doubled for the second retry, and not handed out until then
+    queued = task_of(queue, batch_id, "scrape")
+    assert queued["status"] == "queued"
+    assert queued["available_at"] >= before + 20
+    assert queue.lease("w1") is None
+    assert not queue.idle()
+
+    with queue.conn:
+        queue.conn.execute("UPDATE task_queue SET available_at = 0")
+    task = queue.lease("w1")
+    assert task["attempts"] == 3
+    assert queue.fail(task["id"], "w1", "boom") == "failed"
+    failed = task_of(queue, batch_id, "scrape")
+    assert failed["status"] == "failed"
+    assert failed["error"] == "boom"
+    # Only a collect task fails its batch
+    assert queue.get_batch(batch_id)["status"] == "running"
+
+
+def test_collect_waits_for_the_rest_of_the_batch(queue):
+    batch_id = queue.enqueue("A", {}, max_attempts=1)
+    scrape = queue.lease("w1")
+    assert scrape["kind"] == "scrape"
+    assert queue.lease("w2") is None
+
+    follow_ups = [("article", {"index": i}) for i in range(2)]
+    assert queue.complete(scrape["id"], "w1", {}, follow_ups)
+    first = queue.lease("w1")
+    second = queue.lease("w2")
+    assert {first["kind"], second["kind"]} == {"article"}
+    assert queue.lease("w3") is None
+
+    assert queue.complete(first["id"], "w1", {})
+    assert queue.lease("w3") is None
+    # A given-up task counts as settled
+    assert queue.fail(second["id"], "w2", "boom") == "failed"
+    collect = queue.lease("w3")
+    assert collect["kind"] == "collect"
+    assert collect["batch_id"] == batch_id
+    assert queue.counts() == {
+        "scrape": {"done": 1},
+        "article": {"done": 1, "failed": 1},
+        "collect": {"leased": 1},
+    }
+
+
+def test_racing_workers_never_lease_the_same_task(tmp_path):
+    path = str(tmp_path / "queue.db")
+    producer = TaskQueue(path)
+    for i in range(40):
+        producer.enqueue(f"A{i}", {})
+
+    leased = {"w1": [], "w2": []}
+    start = threading.Barrier(2)
+
+    def work(worker):
+        # Separate connections, as separate worker processes would have
+        queue = TaskQueue(path)
+        start.wait()
+        while (task := queue.lease(worker)) is not None:
+            leased[worker].append(task["id"])
+
+    threads = [threading.Thread(target=work, args=(w,)) for w in leased]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = leased["w1"] + leased["w2"]
+    assert len(ids) == len(set(ids)) == 40
+    assert producer.counts() == {"scrape": {"leased": 40}, "collect": {"queued": 40}}
+
+
+def test_batch_adds_up_what_its_tasks_spent(queue):
+    batch_id = queue.enqueue("A", {})
+    task = queue.lease("w1")
+    assert task["spent"] == {"calls": 0, "tokens": 0, "cost": 0.0}
+    spent = {"calls": 2, "tokens": 300, "cost": 0.01}
+    assert queue.fail(task["id"], "w1", "boom", retry_delay=0, spent=spent)
+
+    task = queue.lease("w1")
+    assert task["spent"] == spent
+    # A worker that lost the lease still spent it
+    assert not queue.complete(task["id"], "w2", {}, spent=spent)
+    assert queue.complete(task["id"], "w1", {}, spent=spent)
+    assert queue.get_batch(batch_id)["spent"] == {
+        "calls": 6,
+        "tokens": 900,
+        "cost": pytest.approx(0.03),
+    }
+
+
+def test_spent_columns_are_added_to_old_queues(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE task_batches (id TEXT PRIMARY KEY, agency TEXT NOT NULL, "
+        "request TEXT NOT NULL, status TEXT NOT NULL, created_at TEXT NOT NULL, "
+        "finished_at TEXT, run_id INTEGER, summary TEXT, error TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO task_batches VALUES ('b', 'A', '{}', 'running', '', NULL, NULL, NULL, NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    queue = TaskQueue(path)
+    assert queue.get_batch("b")["spent"] == {"calls": 0, "tokens": 0, "cost": 0.0}
@@ -0,0 +1,35 @@
+import pytest
+
+from agent.llm.routing import (
+    DEFAULT_ESCALATION_THRESHOLD,
+    escalation_model_for,
+    escalation_threshold,
+    model_for,
+)
+
+
+def test_escalation_threshold_defaults_when_unset():
+    assert escalation_threshold({}) == DEFAULT_ESCALATION_THRESHOLD
+    assert escalation_threshold({"escalation_threshold": None}) == (
+        DEFAULT_ESCALATION_THRESHOLD
+    )
+
+
+def test_escalation_threshold_keeps_zero():
+    assert escalation_threshold({"escalation_threshold": 0.0}) == 0.0
+    assert escalation_threshold({"escalation_threshold": 0.9}) == 0.9
+
+
+def test_stage_models_fall_back_to_the_default_model():
+    state = {"model": "default", "stage_models": {"summary": "cheap"}}
+    assert model_for(state, "summary") == "cheap"
+    assert model_for(state, "bei") == "default"
+    assert escalation_model_for(state, "summary") is None
+
+
+def test_unknown_stages_are_rejected():
+    state = {"model": "default", "stage_models": {}}
+    with pytest.raises(ValueError, match="summaries"):
+        model_for(state, "summaries")
+    with pytest.raises(ValueError, match="relevance_score"):
+        escalation_model_for(state, "relevance_score")
@@ -0,0 +1,61 @@
+import pytest
+
+from agent import agent as graph_module
+from agent.checkpoint import get_checkpointer
+from agent.llm.governor import RateGovernor
+from agent.runner import AnalysisRequest, run_analysis
+from agent.storage.history import get_history_store
+from agent.templates import NewsArticle
+
+
+def checkpoint(thread_id):
+    return get_checkpointer().get_tuple({"configurable": {"thread_id": thread_id}})
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(monkeypatch):
+    scrapes = []
+
+    def web_scrape(state):
+        scrapes.append(state["website_selected"])
+        state["articles"] = [
+            NewsArticle(
+                host="agency.gov.sg",
+                title="AI grant call",
+                url="https://agency.gov.sg/news/grant",
+                body="SPICE funds robotics and AI pilots with industry partners.",
+            )
+        ]
+        return state
+
+    relevance = graph_module.relevance_scoring_node
+    attempts = []
+
+    def flaky_relevance(state):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("model down")
+        return relevance(state)
+
+    monkeypatch.setattr(graph_module, "web_scrape_node", web_scrape)
+    monkeypatch.setattr(graph_module, "relevance_scoring_node", flaky_relevance)
+    request = AnalysisRequest(
+        agency="Resume", listing_url="https://agency.gov.sg/news", thread_id="t-1"
+    )
+
+    with pytest.raises(RuntimeError, match="model down"):
+        run_analysis(request, RateGovernor())
+    assert checkpoint("t-1") is not None
+
+    outcome = run_analysis(request, RateGovernor(), resume=True)
+
+    # The listing is not scraped again
+    assert scrapes == ["Resume"]
+    assert len(attempts) == 2
+    assert [a.url for a in outcome["state"]["articles"]] == [
+        "https://agency.gov.sg/news/grant"
+    ]
+    assert outcome["run_id"] is not None
+    run = get_history_store().get_run(outcome["run_id"])
+    assert run["agency"] == "Resume"
+    # A completed run keeps no checkpoints
+    assert checkpoint("t-1") is None
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from agent.scraping import webscrape
+from agent.scraping.pool import BrowserPool
+from agent.tracing import Tracer, span, track, tracing
+
+
+async def page_actions(worker):
+    with span("navigate", "browser", worker=worker):
+        await asyncio.sleep(0.01 * (worker + 1))
+    with span("extract", "browser", worker=worker):
+        await asyncio.sleep(0.01)
+
+
+def test_concurrent_tasks_nest_on_their_own_tracks(misnested):
+    async def worker(n, own_track):
+        if own_track:
+            with track(f"worker {n}"):
+                await page_actions(n)
+        else:
+            await page_actions(n)
+
+    async def workers(own_track):
+        await asyncio.gather(*(worker(n, own_track) for n in range(3)))
+
+    def run(own_track):
+        tracer = Tracer()
+        with tracing(tracer):
+            asyncio.run(asyncio.wait_for(workers(own_track), 5))
+        return tracer
+
+    # On the event loop's thread alone, the tasks' spans overlap
+    assert misnested(run(own_track=False))
+
+    tracer = run(own_track=True)
+    assert misnested(tracer) == []
+    assert sorted(tracer.threads.values()) == ["worker 0", "worker 1", "worker 2"]
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        async def new_page():
+            return None
+
+        async def close():
+            pass
+
+        return SimpleNamespace(new_page=new_page, close=close)
+
+    async def close(self):
+        pass
+
+
+def test_browser_pool_pages_nest_on_their_own_tracks(monkeypatch, misnested):
+    async def launch(headless):
+        return FakeBrowser()
+
+    async def start():
+        async def stop():
+            pass
+
+        return SimpleNamespace(firefox=SimpleNamespace(launch=launch), stop=stop)
+
+    monkeypatch.setattr(
+        webscrape, "async_playwright", lambda: SimpleNamespace(start=start)
+    )
+    tracer = Tracer()
+    pool = BrowserPool(size=2)
+
+    def work(n):
+        async def action(page):
+            await page_actions(n)
+
+        with tracing(tracer):
+            pool.run(action)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert len([e for e in tracer.events if e["name"] == "navigate"]) == 6
+    assert misnested(tracer) == []
+    assert {"browser pool page 1", "browser pool page 2"} <= set(
+        tracer.threads.values()
+    )